@@ -0,0 +1,33 @@
+"""Rebuild the sales rollup tables from the order tables.
+
+Usage: python -m app.commands.backfill_rollups [--since YYYY-MM-DD]
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date
+
+from app.db import async_session, engine
+from app.services.rollup_service import RollupService
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill(since: date | None) -> None:
+  async with async_session() as session:
+    await RollupService.rebuild(session, since)
+    await session.commit()
+  await engine.dispose()
+  logger.info(f"Sales rollups rebuilt since {since or 'the beginning'}")
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description="Rebuild sales rollups")
+  parser.add_argument("--since", type=date.fromisoformat, default=None, help="first UTC day to rebuild")
+  args = parser.parse_args()
+  logging.basicConfig(level=logging.INFO, format="%(asctime)s:%(levelname)s:%(message)s")
+  asyncio.run(backfill(args.since))
+
+
+if __name__ == "__main__":
+  main()
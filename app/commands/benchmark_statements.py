@@ -0,0 +1,85 @@
+"""Micro-benchmark of statement construction for the hot queries.
+
+Every ``execute`` builds the statement and its cache key before it can reuse
+compiled SQL; a full compile only happens on a cache miss. This compares,
+per call, an inline ``select()`` with the cached ``lambda_stmt`` from
+``app.db.statements``, and shows what an uncached compile would cost.
+No database connection is needed.
+
+Usage: python -m app.commands.benchmark_statements [--iterations N]
+"""
+import argparse
+import time
+import uuid
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.orm import selectinload
+
+from app.db import statements
+from app.db.models import ProductVariant, User
+from app.db.models.cart_items import CartItemIngredient
+from app.db.statements import cart_item_union
+
+dialect = asyncpg.dialect()
+
+
+def inline_user(user_id):
+  return select(User).where(User.id == user_id)
+
+
+def inline_cart(user_id):
+  return (
+    select(cart_item_union)
+    .where(cart_item_union.user_id == user_id)
+    .options(
+      selectinload(cart_item_union.product_variant)
+      .selectinload(ProductVariant.product),
+      selectinload(cart_item_union.PizzaCartItem.custom_ingredients)
+      .selectinload(CartItemIngredient.ingredient)
+    )
+  )
+
+
+def inline_variants(variant_ids):
+  return select(ProductVariant).where(ProductVariant.id.in_(list(variant_ids))).options(selectinload(ProductVariant.product))
+
+
+CASES = [
+  ("user lookup", inline_user, statements.user_by_id, lambda: uuid.uuid4()),
+  ("cart load", inline_cart, statements.user_cart, lambda: uuid.uuid4()),
+  ("order variants", inline_variants, statements.variants_with_products, lambda: [uuid.uuid4() for _ in range(3)]),
+]
+
+
+def per_call_us(fn: Callable[[], object], iterations: int) -> float:
+  fn()  # warm the lambda and compiled caches
+  started = time.perf_counter()
+  for _ in range(iterations):
+    fn()
+  return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run(iterations: int) -> None:
+  print(f"{'query':<16}{'select() us':>14}{'lambda us':>12}{'saved us':>11}{'compile us':>13}")
+  total_saved = 0.0
+  for name, inline, cached, argument in CASES:
+    arg = argument()
+    inline_us = per_call_us(lambda: inline(arg)._generate_cache_key(), iterations)
+    cached_us = per_call_us(lambda: cached(arg)._generate_cache_key(), iterations)
+    compile_us = per_call_us(lambda: inline(arg).compile(dialect=dialect), max(iterations // 10, 1))
+    total_saved += inline_us - cached_us
+    print(f"{name:<16}{inline_us:>14.1f}{cached_us:>12.1f}{inline_us - cached_us:>11.1f}{compile_us:>13.1f}")
+  print(f"saved per request touching all three: {total_saved:.1f} us")
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description="Benchmark cached statements")
+  parser.add_argument("--iterations", type=int, default=5000)
+  args = parser.parse_args()
+  run(args.iterations)
+
+
+if __name__ == "__main__":
+  main()
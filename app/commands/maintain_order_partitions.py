@@ -0,0 +1,35 @@
+"""Create upcoming order partitions and archive old ones.
+
+Usage: python -m app.commands.maintain_order_partitions [--skip-archive]
+
+Meant to run daily from cron; both steps are idempotent.
+"""
+import argparse
+import asyncio
+import logging
+
+from app.db import async_session, engine
+from app.services.order_archive_service import OrderArchiveService
+
+logger = logging.getLogger(__name__)
+
+
+async def maintain(skip_archive: bool) -> None:
+  async with async_session() as session:
+    await OrderArchiveService.ensure_partitions(session)
+    if not skip_archive:
+      archived = await OrderArchiveService.archive_due(session)
+      logger.info(f"Archived {len(archived)} order partitions")
+  await engine.dispose()
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description="Maintain order partitions")
+  parser.add_argument("--skip-archive", action="store_true", help="only create upcoming partitions")
+  args = parser.parse_args()
+  logging.basicConfig(level=logging.INFO, format="%(asctime)s:%(levelname)s:%(message)s")
+  asyncio.run(maintain(args.skip_archive))
+
+
+if __name__ == "__main__":
+  main()
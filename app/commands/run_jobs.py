@@ -0,0 +1,47 @@
+"""Run background jobs outside the API processes.
+
+Usage: python -m app.commands.run_jobs [--concurrency N]
+
+Set ``JOB_WORKER_IN_PROCESS=false`` on the API when jobs run here instead.
+Stops on SIGINT/SIGTERM after the running jobs finish.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.db import engine
+from app.services.cache_service import redis_manager
+from app.services.http_client import http_manager
+from app.services.job_worker import JobWorker
+
+logger = logging.getLogger(__name__)
+
+
+async def run(concurrency: int) -> None:
+  worker = JobWorker(concurrency)
+  stop = asyncio.Event()
+  loop = asyncio.get_running_loop()
+  for sig in (signal.SIGINT, signal.SIGTERM):
+    loop.add_signal_handler(sig, stop.set)
+
+  worker.start()
+  await stop.wait()
+  await worker.stop(timeout=settings.JOB_TIMEOUT)
+  # handlers geocode over http_manager and purge catalog caches through redis_manager
+  await http_manager.close()
+  await redis_manager.close()
+  await engine.dispose()
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description="Run background jobs")
+  parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY)
+  args = parser.parse_args()
+  logging.basicConfig(level=logging.INFO, format="%(asctime)s:%(levelname)s:%(message)s")
+  asyncio.run(run(args.concurrency))
+
+
+if __name__ == "__main__":
+  main()
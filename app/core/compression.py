@@ -0,0 +1,212 @@
+import asyncio
+import gzip
+import zlib
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.http_cache import is_error_body
+from app.services.catalog_events import CatalogEvents
+from app.utils.cache import TTLCache
+
+try:
+  import brotli
+except ImportError:  # brotli is optional, gzip is always available
+  brotli = None
+
+COMPRESSIBLE_TYPES = (
+  "application/json",
+  "application/geo+json",
+  "application/x-ndjson",
+  "application/javascript",
+  "image/svg+xml",
+  "text/",
+)
+
+# precompressed bodies of versioned catalog responses, keyed by (etag, encoding)
+response_cache = TTLCache(
+  max_size=settings.COMPRESSION_CACHE_SIZE,
+  ttl=settings.COMPRESSION_CACHE_TTL,
+)
+CatalogEvents.subscribe(lambda change: response_cache.clear())
+
+
+def available_encodings() -> List[str]:
+  return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+  """Best supported encoding of an ``Accept-Encoding`` header, brotli first on ties."""
+  weights = {}
+  for item in accept_encoding.split(","):
+    name, _, params = item.strip().partition(";")
+    name = name.strip().lower()
+    if not name:
+      continue
+    quality = 1.0
+    params = params.strip()
+    if params.startswith("q="):
+      try:
+        quality = float(params[2:])
+      except ValueError:
+        quality = 0.0
+    weights[name] = quality
+
+  best, best_quality = None, 0.0
+  for encoding in available_encodings():
+    quality = weights.get(encoding, weights.get("*", 0.0))
+    if quality > best_quality:
+      best, best_quality = encoding, quality
+  return best
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+  if encoding == "br":
+    quality = settings.COMPRESSION_CACHED_BROTLI_QUALITY if cached else settings.COMPRESSION_BROTLI_QUALITY
+    return brotli.compress(body, quality=quality)
+  level = settings.COMPRESSION_CACHED_GZIP_LEVEL if cached else settings.COMPRESSION_GZIP_LEVEL
+  return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class _StreamCompressor:
+  def __init__(self, encoding: str):
+    if encoding == "br":
+      self._brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+      self._zlib = None
+    else:
+      self._brotli = None
+      # wbits=31 writes a gzip header and trailer
+      self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+  def chunk(self, data: bytes) -> bytes:
+    # flushed per chunk so that streamed responses keep arriving incrementally
+    if self._brotli is not None:
+      return self._brotli.process(data) + self._brotli.flush()
+    return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+  def finish(self, data: bytes) -> bytes:
+    if self._brotli is not None:
+      return self._brotli.process(data) + self._brotli.finish()
+    return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+  """Negotiated gzip/brotli compression of API responses.
+
+  Bodies smaller than ``COMPRESSION_MIN_SIZE``, non-text content and
+  responses that already carry a ``Content-Encoding`` are passed through.
+  Streamed responses are compressed chunk by chunk. Levels are kept low for
+  per-request work; large bodies are compressed in a worker thread.
+
+  Versioned catalog responses (``HTTPCacheMiddleware`` puts their ETag in
+  the request state) are compressed once at a higher level and kept in
+  ``response_cache``; repeated requests for the same catalog version are
+  answered from there without running the route.
+  """
+
+  def __init__(self, app: ASGIApp):
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if not settings.COMPRESSION_ENABLED or scope["type"] != "http" or scope["method"] != "GET":
+      await self.app(scope, receive, send)
+      return
+    encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+    if encoding is None:
+      await self.app(scope, receive, send)
+      return
+
+    etag = scope.get("state", {}).get("catalog_etag")
+    if etag is not None:
+      cached = response_cache.get((etag, encoding))
+      if cached is not None:
+        headers, body = cached
+        await send({"type": "http.response.start", "status": 200, "headers": list(headers)})
+        await send({"type": "http.response.body", "body": body})
+        return
+
+    await self.app(scope, receive, _Responder(send, encoding, etag).send)
+
+
+class _Responder:
+  def __init__(self, send: Send, encoding: str, etag: Optional[str]):
+    self._send = send
+    self.encoding = encoding
+    self.etag = etag
+    self.start: Optional[Message] = None
+    self.mode: Optional[str] = None  # "identity", "buffer" or "stream"
+    self.compressor: Optional[_StreamCompressor] = None
+
+  @staticmethod
+  def _compressible_type(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+  def _choose_mode(self, headers: Headers, body: bytes, more_body: bool) -> str:
+    if self.start["status"] in (204, 304) or "content-encoding" in headers:
+      return "identity"
+    if not self._compressible_type(headers):
+      return "identity"
+    if more_body:
+      return "stream"
+    return "buffer" if len(body) >= settings.COMPRESSION_MIN_SIZE else "identity"
+
+  def _encoded_headers(self) -> MutableHeaders:
+    headers = MutableHeaders(scope=self.start)
+    headers["Content-Encoding"] = self.encoding
+    headers.add_vary_header("Accept-Encoding")
+    return headers
+
+  async def send(self, message: Message) -> None:
+    if message["type"] == "http.response.start":
+      # held back until the first body chunk decides how to encode
+      self.start = message
+      return
+    if message["type"] != "http.response.body":
+      await self._send(message)
+      return
+
+    body = message.get("body", b"")
+    more_body = message.get("more_body", False)
+    if self.mode is None:
+      headers = Headers(raw=self.start["headers"])
+      self.mode = self._choose_mode(headers, body, more_body)
+      if self.mode == "identity":
+        if self._compressible_type(headers):
+          MutableHeaders(scope=self.start).add_vary_header("Accept-Encoding")
+        await self._send(self.start)
+        await self._send(message)
+        return
+      if self.mode == "stream":
+        self.compressor = _StreamCompressor(self.encoding)
+        headers = self._encoded_headers()
+        del headers["Content-Length"]
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": self.compressor.chunk(body), "more_body": True})
+        return
+      await self._send_buffered(body)
+      return
+
+    if self.mode == "identity":
+      await self._send(message)
+    elif more_body:
+      await self._send({"type": "http.response.body", "body": self.compressor.chunk(body), "more_body": True})
+    else:
+      await self._send({"type": "http.response.body", "body": self.compressor.finish(body)})
+
+  async def _send_buffered(self, body: bytes) -> None:
+    cacheable = self.etag is not None and self.start["status"] == 200 and not is_error_body(body)
+    if len(body) >= settings.COMPRESSION_THREAD_THRESHOLD:
+      compressed = await asyncio.to_thread(compress, body, self.encoding, cacheable)
+    else:
+      compressed = compress(body, self.encoding, cacheable)
+
+    headers = self._encoded_headers()
+    headers["Content-Length"] = str(len(compressed))
+    if cacheable:
+      cached_headers: Tuple = tuple(self.start["headers"])
+      response_cache.set((self.etag, self.encoding), (cached_headers, compressed))
+    await self._send(self.start)
+    await self._send({"type": "http.response.body", "body": compressed})
@@ -9,12 +9,96 @@ class Settings(BaseSettings):
     DATABASE_URL_LOCAL: str | None = None
     DATABASE_URL_HOST: str | None = None
     DATABASE_URL: str | None = None
+    # comma separated; empty means every query goes to the primary
+    DATABASE_REPLICA_URLS: str | None = None
+    REPLICA_MAX_LAG_SECONDS: float = Field(default=5.0)
+    REPLICA_LAG_CHECK_INTERVAL: float = Field(default=5.0)
+    READ_YOUR_WRITES_SECONDS: int = Field(default=10)
 
     SMS_API_KEY: str
     SMS_API_URL: str
     JWT_SECRET_KEY: str
     ADMIN_PHONE: str
 
+    SERVER_HOST: str = Field(default="127.0.0.1")
+    SERVER_PORT: int = Field(default=8000)
+    WEB_CONCURRENCY: int | None = None
+    SERVER_BACKLOG: int = Field(default=2048)
+    SERVER_KEEP_ALIVE: int = Field(default=5)
+    SERVER_GRACEFUL_TIMEOUT: int = Field(default=30)
+    SERVER_MAX_REQUESTS: int = Field(default=20000)
+    SERVER_FORWARDED_ALLOW_IPS: str = Field(default="127.0.0.1")
+
+    TOKEN_BLACKLIST_TTL: int = Field(default=86400)
+
+    DB_ECHO: bool = Field(default=False)
+    DB_COMPILED_CACHE_SIZE: int = Field(default=1200)
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=500)
+    DB_PGBOUNCER: bool = Field(default=False)
+    DB_WARMUP_CONNECTIONS: int = Field(default=5)
+    # read-only requests return their connection to the pool after each statement
+    DB_RELEASE_AFTER_QUERY: bool = Field(default=True)
+    # schedule indexes and compressed store catalogs, built before the worker serves
+    STARTUP_PREBUILD_CACHES: bool = Field(default=False)
+
+    HTTP_CLIENT_TIMEOUT: float = Field(default=10.0)
+    HTTP_CLIENT_MAX_CONNECTIONS: int = Field(default=20)
+
+    REDIS_URL: str = Field(default="redis://127.0.0.1:6379/0")
+    REDIS_KEY_PREFIX: str = Field(default="yummy")
+    REDIS_MAX_CONNECTIONS: int = Field(default=50)
+    REDIS_POOL_TIMEOUT: float = Field(default=5.0)
+    REDIS_SOCKET_TIMEOUT: float = Field(default=2.0)
+    REDIS_HEALTH_CHECK_INTERVAL: int = Field(default=30)
+
+    SEARCH_AUTOCOMPLETE_TTL: float = Field(default=30.0)
+    SEARCH_AUTOCOMPLETE_CACHE_SIZE: int = Field(default=2048)
+
+    HTTP_CACHE_ENABLED: bool = Field(default=True)
+    HTTP_CACHE_MAX_AGE: int = Field(default=30)
+    HTTP_CACHE_STALE_WHILE_REVALIDATE: int = Field(default=300)
+
+    COMPRESSION_ENABLED: bool = Field(default=True)
+    COMPRESSION_MIN_SIZE: int = Field(default=1024)
+    COMPRESSION_GZIP_LEVEL: int = Field(default=5)
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=4)
+    COMPRESSION_CACHED_GZIP_LEVEL: int = Field(default=9)
+    COMPRESSION_CACHED_BROTLI_QUALITY: int = Field(default=9)
+    COMPRESSION_THREAD_THRESHOLD: int = Field(default=262144)
+    COMPRESSION_CACHE_SIZE: int = Field(default=256)
+    COMPRESSION_CACHE_TTL: float = Field(default=300.0)
+
+    ZONE_ZOOM_LEVELS: list[int] = Field(default=[8, 10, 12, 14, 16])
+    ZONE_CACHE_TTL: int = Field(default=86400)
+
+    # "postgis" (KNN on the GiST indexes) or "memory" (per-worker KD-tree)
+    NEAREST_BACKEND: str = Field(default="postgis")
+    NEAREST_MAX_RESULTS: int = Field(default=20)
+    NEAREST_INDEX_TTL: float = Field(default=300.0)
+
+    JOB_WORKER_IN_PROCESS: bool = Field(default=True)
+    JOB_WORKER_CONCURRENCY: int = Field(default=2)
+    JOB_POLL_INTERVAL: float = Field(default=1.0)
+    JOB_MAX_ATTEMPTS: int = Field(default=5)
+    JOB_RETRY_BASE_DELAY: float = Field(default=10.0)
+    JOB_RETRY_MAX_DELAY: float = Field(default=3600.0)
+    JOB_TIMEOUT: int = Field(default=300)
+    # extra seconds past JOB_TIMEOUT before a running job counts as abandoned
+    JOB_STALE_MARGIN: int = Field(default=60)
+    JOB_RETENTION_DAYS: int = Field(default=7)
+    JOB_MAINTENANCE_INTERVAL: float = Field(default=60.0)
+
+    DEFAULT_TIMEZONE: str = Field(default="Europe/Moscow")
+    SCHEDULE_INDEX_TTL: float = Field(default=300.0)
+
+    IDEMPOTENCY_TTL: int = Field(default=86400)
+    IDEMPOTENCY_LOCK_TTL: int = Field(default=30)
+    IDEMPOTENCY_WAIT_TIMEOUT: float = Field(default=10.0)
+
+    ORDER_PARTITIONS_AHEAD: int = Field(default=3)
+    ORDER_ARCHIVE_AFTER_MONTHS: int = Field(default=12)
+    ORDER_ARCHIVE_DIR: str = Field(default="archive/orders")
+
     @field_validator("DATABASE_URL", mode="before")
     @classmethod
     def pick_db_url(cls, v, info):
@@ -25,6 +109,10 @@ class Settings(BaseSettings):
             return info.data.get("DATABASE_URL_HOST")
         return info.data.get("DATABASE_URL_LOCAL")
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in (self.DATABASE_REPLICA_URLS or "").split(",") if url.strip()]
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
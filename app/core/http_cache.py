@@ -0,0 +1,213 @@
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.services.cache_service import redis_manager
+from app.services.catalog_events import CatalogEvents
+
+logger = logging.getLogger(__name__)
+
+UUID_PATTERN = r"[0-9a-fA-F-]{36}"
+# compressed representations carry the encoding in their ETag: "v123-br"
+ENCODING_SUFFIX = re.compile(r'-(?:gzip|br)"$')
+# ResponseUtils.error payload as rendered by ORJSONResponse; routes return it with status 200
+ERROR_BODY_PREFIX = b'{"result":false'
+
+
+def is_error_body(body: bytes) -> bool:
+  """Whether a 200 body is a ``ResponseUtils.error`` result, which must not be cached.
+
+  Error payloads are far below ``COMPRESSION_MIN_SIZE``, so they always
+  arrive here uncompressed.
+  """
+  return body.startswith(ERROR_BODY_PREFIX)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+  """Caching rule for one public catalog route.
+
+  ``store_scoped`` routes take the store id from the ``store_id`` group of
+  ``pattern`` and are validated against that store's catalog version, so a
+  write to one store does not invalidate the others.
+  """
+  pattern: re.Pattern
+  max_age: int
+  stale_while_revalidate: int
+  store_scoped: bool = False
+
+  @property
+  def cache_control(self) -> str:
+    return f"public, max-age={self.max_age}, stale-while-revalidate={self.stale_while_revalidate}"
+
+
+def _policy(path: str, max_age: Optional[int] = None, store_scoped: bool = False) -> CachePolicy:
+  return CachePolicy(
+    pattern=re.compile(f"^{path}/?$"),
+    max_age=settings.HTTP_CACHE_MAX_AGE if max_age is None else max_age,
+    stale_while_revalidate=settings.HTTP_CACHE_STALE_WHILE_REVALIDATE,
+    store_scoped=store_scoped,
+  )
+
+
+POLICIES: List[CachePolicy] = [
+  _policy("/city/all-cities", max_age=300),
+  _policy(f"/city/{UUID_PATTERN}"),
+  _policy("/store/all-stores"),
+  _policy(f"/store/get-stores-by-city/{UUID_PATTERN}"),
+  _policy(f"/store/zones/{UUID_PATTERN}", max_age=300),
+  _policy(f"/store/get-store/(?P<store_id>{UUID_PATTERN})", store_scoped=True),
+  _policy(f"/store/catalog/(?P<store_id>{UUID_PATTERN})", store_scoped=True),
+  _policy(f"/category/get-category-by-store/(?P<store_id>{UUID_PATTERN})", store_scoped=True),
+  _policy(f"/category/get-category/{UUID_PATTERN}"),
+  _policy(f"/product/by-store/(?P<store_id>{UUID_PATTERN})", store_scoped=True),
+  _policy(f"/product/by-category/{UUID_PATTERN}"),
+  _policy("/ingredient", max_age=300),
+]
+
+
+def _match(path: str) -> Tuple[Optional[CachePolicy], Optional[re.Match]]:
+  for policy in POLICIES:
+    match = policy.pattern.match(path)
+    if match is not None:
+      return policy, match
+  return None, None
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+  if not if_none_match:
+    return False
+  if if_none_match.strip() == "*":
+    return True
+  # weak comparison, as RFC 9110 requires for If-None-Match
+  candidates = {ENCODING_SUFFIX.sub('"', tag.strip().removeprefix("W/")) for tag in if_none_match.split(",")}
+  return etag in candidates
+
+
+def _representation_etag(etag: str, headers: MutableHeaders) -> str:
+  encoding = headers.get("content-encoding")
+  return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+class HTTPCacheMiddleware:
+  """Conditional GET and ``Cache-Control`` for the public catalog routes.
+
+  The strong ETag of a response is derived from the request URL and the
+  catalog version counters kept by ``CatalogEvents``: the global version for
+  catalog-wide listings, the epoch plus the store version for store-scoped
+  ones. A matching ``If-None-Match`` is answered with 304 before the route
+  runs, so no database work is done. When Redis is unavailable the ETag
+  falls back to a hash of the response body, which still saves the transfer.
+  The version ETag is also left in ``scope["state"]["catalog_etag"]`` for
+  ``CompressionMiddleware``, which keys its precompressed bodies on it.
+
+  Catalog writes invalidate every ETag through ``CatalogEvents.purge``.
+  """
+
+  def __init__(self, app: ASGIApp):
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if not settings.HTTP_CACHE_ENABLED or scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+      await self.app(scope, receive, send)
+      return
+    policy, match = _match(scope["path"])
+    if policy is None:
+      await self.app(scope, receive, send)
+      return
+
+    if_none_match = Headers(scope=scope).get("if-none-match")
+    etag = await self._version_etag(scope, policy, match)
+    if etag is None:
+      await self._body_etag(scope, receive, send, policy, if_none_match)
+      return
+    if _etag_matches(if_none_match, etag):
+      await self._not_modified(send, policy, etag)
+      return
+    scope.setdefault("state", {})["catalog_etag"] = etag
+    start: Optional[Message] = None
+
+    async def send_with_headers(message: Message) -> None:
+      nonlocal start
+      if message["type"] == "http.response.start" and message["status"] == 200:
+        # held back until the first body chunk shows whether the route returned an error
+        start = message
+        return
+      if start is not None and message["type"] == "http.response.body":
+        if not is_error_body(message.get("body", b"")):
+          headers = MutableHeaders(scope=start)
+          headers["ETag"] = _representation_etag(etag, headers)
+          headers["Cache-Control"] = policy.cache_control
+        await send(start)
+        start = None
+      await send(message)
+
+    await self.app(scope, receive, send_with_headers)
+
+  @staticmethod
+  async def _version_etag(scope: Scope, policy: CachePolicy, match: re.Match) -> Optional[str]:
+    if policy.store_scoped:
+      keys = [CatalogEvents.epoch_key(), CatalogEvents.version_key(match.group("store_id").lower())]
+    else:
+      keys = [CatalogEvents.version_key()]
+    try:
+      async with redis_manager.timed("http_cache_versions") as client:
+        versions = await client.mget(keys)
+    except RedisError as e:
+      logger.warning(f"Catalog versions unavailable, hashing response bodies: {e}")
+      return None
+    source = "|".join([scope["path"], scope["query_string"].decode("latin-1"), *(v or "0" for v in versions)])
+    return '"v' + hashlib.sha1(source.encode()).hexdigest()[:24] + '"'
+
+  @staticmethod
+  async def _not_modified(send: Send, policy: CachePolicy, etag: str) -> None:
+    await send({
+      "type": "http.response.start",
+      "status": 304,
+      "headers": [
+        (b"etag", etag.encode()),
+        (b"cache-control", policy.cache_control.encode()),
+      ],
+    })
+    await send({"type": "http.response.body", "body": b""})
+
+  async def _body_etag(
+      self, scope: Scope, receive: Receive, send: Send, policy: CachePolicy, if_none_match: Optional[str]
+  ) -> None:
+    start: Optional[Message] = None
+    chunks: List[bytes] = []
+
+    async def buffer(message: Message) -> None:
+      nonlocal start
+      if message["type"] == "http.response.start":
+        start = message
+        return
+      if message["type"] == "http.response.body":
+        chunks.append(message.get("body", b""))
+        if message.get("more_body", False):
+          return
+        body = b"".join(chunks)
+        if start["status"] != 200 or is_error_body(body):
+          await send(start)
+          await send({"type": "http.response.body", "body": body})
+          return
+        etag = '"b' + hashlib.sha1(body).hexdigest()[:24] + '"'
+        if _etag_matches(if_none_match, etag):
+          await self._not_modified(send, policy, etag)
+          return
+        headers = MutableHeaders(scope=start)
+        headers["ETag"] = etag
+        headers["Cache-Control"] = policy.cache_control
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
+        return
+      await send(message)
+
+    await self.app(scope, receive, buffer)
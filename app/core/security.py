@@ -1,4 +1,7 @@
-from typing import Union
+import hashlib
+import logging
+import time
+from typing import Optional, Union
 
 import jwt
 from datetime import datetime, timedelta, UTC
@@ -6,15 +9,16 @@ from uuid import UUID as UUID_PY
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
+from app.db import get_db, statements
 from app.db.models.users import User, Roles
 from fastapi import APIRouter, Header, Depends, HTTPException
-from sqlalchemy import select
+from redis.exceptions import RedisError
 
 from app.core.config import settings
+from app.services.cache_service import redis_manager
 from app.services.response_utils import ResponseUtils
 
-TOKEN_BLACKLIST = set()
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -29,6 +33,63 @@ async def get_current_user(
     raise HTTPException(status_code=401, detail=user_or_error)
   return user_or_error
 
+class TokenBlacklist:
+  """Revoked tokens, shared by all workers through Redis.
+
+  Entries expire together with the token. The revoking worker also keeps
+  its own revocations in memory, so it still rejects them while Redis is
+  unreachable; other workers fail open in that case.
+  """
+
+  _local: dict[str, float] = {}
+
+  @staticmethod
+  def _key(digest: str) -> str:
+    return redis_manager.key("token_blacklist", digest)
+
+  @staticmethod
+  def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+  @staticmethod
+  def _expires_at(token: str) -> float:
+    try:
+      exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+      exp = None
+    return float(exp) if isinstance(exp, (int, float)) else time.time() + settings.TOKEN_BLACKLIST_TTL
+
+  @staticmethod
+  async def revoke(token: str) -> None:
+    digest = TokenBlacklist._digest(token)
+    expires_at = TokenBlacklist._expires_at(token)
+    now = time.time()
+    for stale in [d for d, exp in TokenBlacklist._local.items() if exp <= now]:
+      del TokenBlacklist._local[stale]
+    TokenBlacklist._local[digest] = expires_at
+
+    ttl = int(expires_at - now) + 1
+    if ttl <= 0:
+      return
+    try:
+      async with redis_manager.timed("token_revoke") as client:
+        await client.set(TokenBlacklist._key(digest), 1, ex=ttl)
+    except RedisError as e:
+      logger.error(f"Failed to share token revocation: {e}")
+
+  @staticmethod
+  async def is_revoked(token: str) -> bool:
+    digest = TokenBlacklist._digest(token)
+    if digest in TokenBlacklist._local:
+      return True
+    try:
+      async with redis_manager.timed("token_blacklist") as client:
+        return bool(await client.exists(TokenBlacklist._key(digest)))
+    except RedisError as e:
+      logger.error(f"Token blacklist unavailable: {e}")
+      return False
+
+
 class SecurityMiddleware:
   @staticmethod
   def generate_jwt_token(user_id: str):
@@ -40,9 +101,6 @@ class SecurityMiddleware:
 
   @staticmethod
   async def get_user_or_error_dict(token: str, db: AsyncSession) -> Union[User, dict]:
-    if token in TOKEN_BLACKLIST:
-      return ResponseUtils.error(message="Токен отозван")
-
     try:
       payload = jwt.decode(
         token,
@@ -52,6 +110,10 @@ class SecurityMiddleware:
     except jwt.PyJWTError:
       return ResponseUtils.error(message="Недействительный токен")
 
+    # checked after the signature so that garbage tokens cost no Redis round trip
+    if await TokenBlacklist.is_revoked(token):
+      return ResponseUtils.error(message="Токен отозван")
+
     user_id_str = payload.get("user_id")
     if not isinstance(user_id_str, str):
       return ResponseUtils.error(message="Недействительный токен")
@@ -61,8 +123,7 @@ class SecurityMiddleware:
     except ValueError:
       return ResponseUtils.error(message="Недействительный токен")
 
-    stmt = select(User).where(User.id == user_uuid)
-    result = await db.execute(stmt)
+    result = await db.execute(statements.user_by_id(user_uuid))
     user = result.scalar_one_or_none()
     if user is None:
       return ResponseUtils.error(message="Пользователь не найден")
@@ -71,7 +132,7 @@ class SecurityMiddleware:
 
   @staticmethod
   async def logout(token: str):
-    TOKEN_BLACKLIST.add(token)
+    await TokenBlacklist.revoke(token)
     return ResponseUtils.success(message="Токен успешно отозван")
 
   @staticmethod
@@ -0,0 +1,73 @@
+"""Uvicorn launcher used by ``python main.py``.
+
+``ENV=production`` starts ``WEB_CONCURRENCY`` worker processes (one per CPU
+by default) with uvloop and httptools, listen backlog and keep-alive tuning,
+and recycles each worker after ``SERVER_MAX_REQUESTS`` requests (0 turns
+this off): the worker finishes its in-flight requests within
+``SERVER_GRACEFUL_TIMEOUT`` and uvicorn's supervisor starts a replacement.
+Any other ``ENV`` runs a single process with the file-watching reloader.
+
+State and workers
+-----------------
+Shared by every worker (Redis or PostgreSQL):
+  catalog versions and HTTP ETags, idempotency keys, the token blacklist,
+  OTP codes, order data and rollups, background jobs (each worker runs a
+  job pool unless JOB_WORKER_IN_PROCESS is off; SKIP LOCKED keeps them
+  from taking the same job).
+Per worker (in process memory, rebuilt after a restart):
+  the DB and Redis connection pools, the HTTP client, search autocomplete
+  cache, precompressed response cache, schedule indexes, the startup report
+  and Redis latency stats. The local caches are dropped by catalog events
+  emitted in the same worker and otherwise expire by TTL.
+"""
+import importlib.util
+import logging
+import os
+
+import uvicorn
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP = "main:app"
+
+
+def _available(module: str) -> bool:
+  return importlib.util.find_spec(module) is not None
+
+
+def production_options() -> dict:
+  workers = settings.WEB_CONCURRENCY or os.cpu_count() or 1
+  return {
+    "host": settings.SERVER_HOST,
+    "port": settings.SERVER_PORT,
+    "workers": workers,
+    "loop": "uvloop" if _available("uvloop") else "asyncio",
+    "http": "httptools" if _available("httptools") else "h11",
+    "backlog": settings.SERVER_BACKLOG,
+    "timeout_keep_alive": settings.SERVER_KEEP_ALIVE,
+    "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT,
+    "limit_max_requests": settings.SERVER_MAX_REQUESTS or None,
+    "proxy_headers": True,
+    "forwarded_allow_ips": settings.SERVER_FORWARDED_ALLOW_IPS,
+    # access logging is left to the reverse proxy in production
+    "access_log": False,
+    "log_level": "info",
+  }
+
+
+def development_options() -> dict:
+  return {
+    "host": settings.SERVER_HOST,
+    "port": settings.SERVER_PORT,
+    "reload": True,
+    "log_level": "info",
+  }
+
+
+def run() -> None:
+  production = settings.ENV.lower() == "production"
+  options = production_options() if production else development_options()
+  logger.info(f"Starting {APP} in {settings.ENV} mode: {options}")
+  uvicorn.run(APP, **options)
@@ -0,0 +1,60 @@
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+  """Cold-start timings of one worker: import groups and lifespan phases.
+
+  Imported first by ``main`` and kept free of application imports, so the
+  import timings cover everything loaded after it.
+  """
+
+  HEAVY_MODULES = ("numpy", "shapely", "geoalchemy2", "httpx", "brotli", "asyncpg", "redis")
+
+  def __init__(self):
+    self.created = time.perf_counter()
+    self.imports: Dict[str, float] = {}
+    self.phases: Dict[str, float] = {}
+    self.ready_after: Optional[float] = None
+
+  @staticmethod
+  @contextmanager
+  def _timed(target: Dict[str, float], name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+      yield
+    finally:
+      target[name] = target.get(name, 0.0) + time.perf_counter() - started
+
+  def importing(self, name: str):
+    return self._timed(self.imports, name)
+
+  def phase(self, name: str):
+    return self._timed(self.phases, name)
+
+  def mark_ready(self) -> None:
+    self.ready_after = time.perf_counter() - self.created
+    logger.info(f"Worker {os.getpid()} ready: {self.as_dict()}")
+
+  def as_dict(self) -> dict:
+    def ms(value: float) -> float:
+      return round(value * 1000, 1)
+
+    return {
+      "pid": os.getpid(),
+      "imports_ms": {name: ms(value) for name, value in self.imports.items()},
+      "import_total_ms": ms(sum(self.imports.values())),
+      "phases_ms": {name: ms(value) for name, value in self.phases.items()},
+      "ready_after_ms": None if self.ready_after is None else ms(self.ready_after),
+      "modules_loaded": len(sys.modules),
+      "heavy_modules_loaded": [name for name in self.HEAVY_MODULES if name in sys.modules],
+    }
+
+
+startup_report = StartupReport()
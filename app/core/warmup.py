@@ -0,0 +1,37 @@
+import logging
+
+from sqlalchemy import select
+from starlette.types import ASGIApp
+
+from app.core.compression import available_encodings
+from app.db import async_session
+from app.db.models import Store
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_store_catalogs(app: ASGIApp) -> int:
+  """Request every store's catalog through the middleware stack, once per encoding.
+
+  ``HTTPCacheMiddleware`` tags each response with the current catalog
+  version and ``CompressionMiddleware`` keeps its compressed body in
+  ``response_cache``, so the first clients after startup are answered from
+  there. Without Redis there is no version ETag and nothing is kept.
+  """
+  import httpx
+
+  async with async_session() as session:
+    store_ids = (await session.execute(select(Store.id))).scalars().all()
+
+  warmed = 0
+  transport = httpx.ASGITransport(app=app)
+  async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+    for store_id in store_ids:
+      for encoding in available_encodings():
+        response = await client.get(f"/store/catalog/{store_id}/", headers={"Accept-Encoding": encoding})
+        if response.status_code != 200:
+          logger.warning(f"Catalog warm-up of store {store_id} got {response.status_code}")
+          break
+      else:
+        warmed += 1
+  return warmed
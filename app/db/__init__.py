@@ -1,19 +1,86 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from starlette.requests import Request
+
 from app.core.config import settings
+from app.db.lazy import LazySession, autocommit, connection_stats
+from app.db.options import engine_options
+from app.db.replicas import READ_METHODS, replica_router
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+@event.listens_for(Base, "init", propagate=True)
+def _null_unset_columns(target, args, kwargs):
+    # without a refresh after INSERT, columns the constructor left out would never
+    # be loaded; start them as None so responses keep their keys
+    for key in _nullable_keys(type(target)):
+        if key not in kwargs:
+            setattr(target, key, None)
+
+def _nullable_keys(model) -> tuple:
+    keys = model.__dict__.get("_nullable_keys")
+    if keys is None:
+        keys = tuple(
+            prop.key for prop in inspect(model).column_attrs
+            if len(prop.columns) == 1
+            and prop.columns[0].nullable
+            and prop.columns[0].default is None
+            and prop.columns[0].server_default is None
+            and not prop.columns[0].primary_key
+        )
+        model._nullable_keys = keys
+    return keys
+
+engine = create_async_engine(settings.DATABASE_URL, **engine_options())
 
 async_session = async_sessionmaker(
     bind=engine,
-    class_=AsyncSession,
+    class_=LazySession,
     expire_on_commit=False
 )
 
-async def get_db():
-    async with async_session() as session:
+async def warm_up(connections: int) -> int:
+    """Open pooled connections up front so the first requests do not pay for connecting."""
+    connections = max(0, min(connections, engine.pool.size()))
+
+    async def touch():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(touch() for _ in range(connections)))
+    return connections
+
+def _route_name(request: Request) -> str:
+    route = request.scope.get("route")
+    return f"{request.method} {route.path if route is not None else request.url.path}"
+
+def _open(sessionmaker: async_sessionmaker, request: Request) -> LazySession:
+    # safe reads hand the connection back after every statement; writes keep one transaction
+    read_only = settings.DB_RELEASE_AFTER_QUERY and request.method in READ_METHODS
+    if not read_only:
+        return sessionmaker()
+    session = sessionmaker(bind=autocommit(sessionmaker.kw["bind"]))
+    session.release_after_query = True
+    return session
+
+async def get_db(request: Request):
+    """Session for a route: a read replica for safe reads, the primary otherwise."""
+    sessionmaker = await replica_router.sessionmaker_for(request) or async_session
+    async with _open(sessionmaker, request) as session:
+        try:
+          yield session
+        finally:
+          await session.close()
+          connection_stats.record(_route_name(request), session)
+
+async def get_primary_db(request: Request):
+    """Session on the primary, for reads that must see the latest writes."""
+    async with _open(async_session, request) as session:
         try:
           yield session
         finally:
-          await session.close()
\ No newline at end of file
+          await session.close()
+          connection_stats.record(_route_name(request), session)
\ No newline at end of file
@@ -0,0 +1,34 @@
+from typing import Any, Iterable
+
+from sqlalchemy import Table, column, update, values
+from sqlalchemy.sql.dml import Update
+from sqlalchemy.types import TypeEngine
+
+
+def update_from_values(
+    table: Table,
+    key: str,
+    rows: Iterable[dict[str, Any]],
+    *where: Any,
+) -> Update:
+  """Build ``UPDATE table SET ... FROM (VALUES ...) WHERE table.key = v.key``.
+
+  Every row must carry the same keys; all of them except ``key`` are
+  written. Column types are taken from ``table`` so asyncpg receives
+  typed parameters. Extra ``where`` clauses scope the update.
+  """
+  rows = list(rows)
+  if not rows:
+    raise ValueError("update_from_values requires at least one row")
+
+  names = list(rows[0].keys())
+  columns: list[tuple[str, TypeEngine]] = [(name, table.c[name].type) for name in names]
+  source = (
+    values(*(column(name, type_) for name, type_ in columns), name="v")
+    .data([tuple(row[name] for name in names) for row in rows])
+  )
+  return (
+    update(table)
+    .where(table.c[key] == source.c[key], *where)
+    .values({name: source.c[name] for name in names if name != key})
+  )
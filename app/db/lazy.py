@@ -0,0 +1,141 @@
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+_autocommit_engines: Dict[int, AsyncEngine] = {}
+
+
+def autocommit(engine: AsyncEngine) -> AsyncEngine:
+  """``engine`` on the same pool, but without BEGIN/COMMIT around statements."""
+  key = id(engine)
+  if key not in _autocommit_engines:
+    _autocommit_engines[key] = engine.execution_options(isolation_level="AUTOCOMMIT")
+  return _autocommit_engines[key]
+
+
+class TrackedSession(Session):
+  """Sync session that counts its statements and how long it holds a pooled connection."""
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.statements = 0
+    self.checkouts = 0
+    self.held = 0.0
+    self._acquired_at = None
+
+
+@event.listens_for(TrackedSession, "after_begin")
+def _connection_acquired(session, transaction, connection):
+  if session._acquired_at is None:
+    session._acquired_at = time.perf_counter()
+    session.checkouts += 1
+
+
+@event.listens_for(TrackedSession, "after_transaction_end")
+def _connection_released(session, transaction):
+  if transaction.parent is None and session._acquired_at is not None:
+    session.held += time.perf_counter() - session._acquired_at
+    session._acquired_at = None
+
+
+@event.listens_for(TrackedSession, "do_orm_execute")
+def _statement(orm_execute_state):
+  orm_execute_state.session.statements += 1
+
+
+class LazySession(AsyncSession):
+  """Session that holds a pooled connection only while it needs one.
+
+  Like any ``AsyncSession`` it checks a connection out on the first
+  statement, so a route that returns from a cache or fails auth never
+  touches the pool. With ``release_after_query`` (set by ``get_db`` for
+  read-only requests, together with an autocommit bind) the connection goes
+  back to the pool as soon as each statement's buffered result is in, instead
+  of staying checked out while the route serializes, calls Redis or waits on
+  other I/O. Nothing is released while ORM changes are pending.
+  """
+  sync_session_class = TrackedSession
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.release_after_query = False
+    self.opened_at = time.perf_counter()
+
+  async def _release(self) -> None:
+    if not self.release_after_query or not self.in_transaction():
+      return
+    if self.new or self.dirty or self.deleted:
+      return
+    # under autocommit this only returns the connection, no COMMIT is sent
+    await self.commit()
+
+  async def execute(self, *args, **kwargs):
+    result = await super().execute(*args, **kwargs)
+    await self._release()
+    return result
+
+  async def scalar(self, *args, **kwargs):
+    result = await super().scalar(*args, **kwargs)
+    await self._release()
+    return result
+
+  async def scalars(self, *args, **kwargs):
+    result = await super().scalars(*args, **kwargs)
+    await self._release()
+    return result
+
+  async def get(self, *args, **kwargs):
+    result = await super().get(*args, **kwargs)
+    await self._release()
+    return result
+
+  async def refresh(self, *args, **kwargs):
+    await super().refresh(*args, **kwargs)
+    await self._release()
+
+
+class ConnectionStats:
+  """Per-route connection usage of request sessions in this worker."""
+
+  def __init__(self):
+    self.routes: Dict[str, Dict[str, float]] = {}
+
+  def record(self, route: str, session: LazySession) -> None:
+    tracked = session.sync_session
+    lifetime = time.perf_counter() - session.opened_at
+    counter = self.routes.setdefault(route, {
+      "requests": 0, "without_sql": 0, "statements": 0, "checkouts": 0,
+      "held_ms": 0.0, "max_held_ms": 0.0, "lifetime_ms": 0.0,
+    })
+    held_ms = tracked.held * 1000
+    counter["requests"] += 1
+    counter["statements"] += tracked.statements
+    counter["checkouts"] += tracked.checkouts
+    counter["held_ms"] += held_ms
+    counter["max_held_ms"] = max(counter["max_held_ms"], held_ms)
+    counter["lifetime_ms"] += lifetime * 1000
+    if not tracked.statements:
+      counter["without_sql"] += 1
+
+  def report(self) -> dict:
+    """Routes by total connection hold time, longest first."""
+    ordered = sorted(self.routes.items(), key=lambda item: item[1]["held_ms"], reverse=True)
+    return {
+      route: {
+        "requests": int(c["requests"]),
+        "without_sql": int(c["without_sql"]),
+        "statements_per_request": round(c["statements"] / c["requests"], 2),
+        "checkouts_per_request": round(c["checkouts"] / c["requests"], 2),
+        "avg_held_ms": round(c["held_ms"] / c["requests"], 3),
+        "max_held_ms": round(c["max_held_ms"], 3),
+        # share of the session's life spent holding a connection
+        "held_ratio": round(c["held_ms"] / c["lifetime_ms"], 3) if c["lifetime_ms"] else 0.0,
+      }
+      for route, c in ordered
+    }
+
+
+connection_stats = ConnectionStats()
@@ -5,4 +5,6 @@ from app.db.models.categories import Category
 from app.db.models.products import Product, Pizza, ProductVariant, ReplacementGroup, ReplacementItem, ProductReplacement
 from app.db.models.ingredients import Ingredient
 from app.db.models.cart_items import CartItem, CartItemIngredient, PizzaCartItem
-from app.db.models.orders import Order, OrderStatus, OrderItem, OrderAddress
\ No newline at end of file
+from app.db.models.orders import Order, OrderStatus, ORDER_STATUS_TRANSITIONS, OrderItem, OrderAddress, OrderArchive, OrderArchiveUser
+from app.db.models.reports import SalesDailyRollup, SalesHourlyRollup
+from app.db.models.jobs import Job, JobStatus
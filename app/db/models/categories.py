@@ -25,5 +25,5 @@ class Category(Base):
     back_populates="category"
   )
   __table_args__ = (
-    UniqueConstraint("store_id", "position", name="uix_store_position"),
+    UniqueConstraint("store_id", "position", name="uix_store_position", deferrable=True, initially="IMMEDIATE"),
   )
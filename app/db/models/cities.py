@@ -3,7 +3,7 @@ import uuid
 from geoalchemy2 import Geometry
 from uuid import UUID
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String, func
 from sqlalchemy.orm import relationship
 
 from app.db import Base
@@ -14,4 +14,11 @@ class City(Base):
     id = Column(PGUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     point = Column(Geometry('POINT'), nullable=False)
+    # IANA name; store hours of the city are local to it
+    timezone = Column(String(64), nullable=False, default="Europe/Moscow", server_default="Europe/Moscow")
     stores = relationship("Store", back_populates="city")
+
+    __table_args__ = (
+        # KNN (<->) lookups of the nearest city order by this expression
+        Index("ix_cities_point_geography", func.geography(func.ST_SetSRID(point, 4326)), postgresql_using="gist"),
+    )
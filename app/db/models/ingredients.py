@@ -1,6 +1,6 @@
 import uuid
 from uuid import UUID as UUID_PY
-from sqlalchemy import String, UUID, Integer
+from sqlalchemy import String, UUID, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db import Base
@@ -19,3 +19,7 @@ class Ingredient(Base):
   overlay_image: Mapped[str] = mapped_column(String)
   price: Mapped[int] = mapped_column(Integer)
   pizza_ingredients = relationship("PizzaIngredient", back_populates="ingredient",cascade="all, delete-orphan", passive_deletes=True)
+
+  __table_args__ = (
+    Index("ix_ingredients_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+  )
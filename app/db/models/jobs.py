@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import DateTime, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class JobStatus(str, Enum):
+  QUEUED = "queued"
+  RUNNING = "running"
+  DONE = "done"
+  FAILED = "failed"
+
+
+class Job(Base):
+  """A unit of background work, claimed by workers with ``FOR UPDATE SKIP LOCKED``.
+
+  ``run_at`` is when the job becomes due: now for plain jobs, later for
+  delayed ones and retries. ``locked_at`` tells a running job from one whose
+  worker died, which is put back in the queue after ``JOB_TIMEOUT``.
+  """
+  __tablename__ = "jobs"
+  __table_args__ = (
+    # only due jobs are polled, so the index covers just the queue
+    Index("ix_jobs_queued_run_at", "run_at", postgresql_where=text("status = 'queued'")),
+    Index("ix_jobs_status_finished", "status", "finished_at"),
+  )
+
+  id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+  kind: Mapped[str] = mapped_column(String(100), nullable=False)
+  payload: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+  status: Mapped[str] = mapped_column(String(16), nullable=False, default=JobStatus.QUEUED.value)
+  attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+  run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+  locked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+  locked_by: Mapped[str | None] = mapped_column(String(100), nullable=True)
+  finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+  last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -1,9 +1,9 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from enum import IntEnum
-from sqlalchemy import Enum as PgEnum, Numeric
-from sqlalchemy import Float, UUID, DateTime, Boolean, ForeignKey, String, Integer
+from sqlalchemy import Enum as PgEnum, Numeric, ForeignKeyConstraint, Index
+from sqlalchemy import Float, UUID, Date, DateTime, Boolean, ForeignKey, String, Integer
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, relationship, mapped_column
 
@@ -16,15 +16,28 @@ class OrderStatus(IntEnum):
   COMPLETED = 2
   CANCELLED = 3
 
+# status -> statuses it may move to; completed and cancelled orders are final
+ORDER_STATUS_TRANSITIONS = {
+  OrderStatus.PENDING: {OrderStatus.IN_PROGRESS, OrderStatus.CANCELLED},
+  OrderStatus.IN_PROGRESS: {OrderStatus.COMPLETED, OrderStatus.CANCELLED},
+  OrderStatus.COMPLETED: set(),
+  OrderStatus.CANCELLED: set(),
+}
+
 class PaymentMethod(IntEnum):
   CASH = 0
   ELECTRONIC = 1
 
 class OrderAddress(Base):
   __tablename__ = "order_addresses"
+  __table_args__ = (
+    ForeignKeyConstraint(["order_id", "created_at"], ["orders.id", "orders.created_at"]),
+  )
 
   id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-  order_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("orders.id"))
+  order_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), index=True)
+  # copy of orders.created_at, needed to reference the partitioned orders table
+  created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
   street: Mapped[str] = mapped_column(String)
   house: Mapped[str] = mapped_column(String)
   apartment: Mapped[str | None] = mapped_column(String, nullable=True)
@@ -33,25 +46,51 @@ class OrderAddress(Base):
   order = relationship("Order", back_populates="address")
 
 class Order(Base):
+  """Orders are range partitioned by month on ``created_at``.
+
+  The physical primary key is ``(id, created_at)`` because Postgres requires
+  the partition key in it; the ORM still identifies orders by ``id`` alone.
+  Items and their ingredients carry the order's ``created_at`` so they land
+  in the partition of the same month.
+  """
   __tablename__ = "orders"
+  __table_args__ = (
+    Index("ix_orders_user_created", "user_id", "created_at"),
+    Index("ix_orders_store_created", "store_id", "created_at"),
+    {"postgresql_partition_by": "RANGE (created_at)"},
+  )
   id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
   user_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("users.id"))
   total_price: Mapped[float] = mapped_column(Float, default=0.0)
   is_pickup: Mapped[bool] = mapped_column(Boolean, default=False)
   store_id: Mapped[uuid.UUID | None] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("stores.id"), nullable=True)
-  created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+  created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow)
   status: Mapped[OrderStatus] = mapped_column(PgEnum(OrderStatus), default=OrderStatus.PENDING)
   payment_method: Mapped[PaymentMethod] = mapped_column(PgEnum(PaymentMethod, name="payment_method_enum"), nullable=False)
+  # bumped on every status change; clients send it back for compare-and-set updates
+  version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
 
   user = relationship("User", back_populates="orders")
   address = relationship("OrderAddress", uselist=False, back_populates="order")
   items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+  __mapper_args__ = {"primary_key": [id]}
+
+  @staticmethod
+  def can_transition(current: OrderStatus, target: OrderStatus) -> bool:
+    return target in ORDER_STATUS_TRANSITIONS[OrderStatus(current)]
+
 
 class OrderItem(Base):
   __tablename__ = "order_items"
+  __table_args__ = (
+    ForeignKeyConstraint(["order_id", "created_at"], ["orders.id", "orders.created_at"]),
+    Index("ix_order_items_order", "order_id", "created_at"),
+    {"postgresql_partition_by": "RANGE (created_at)"},
+  )
   id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-  order_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("orders.id"))
+  order_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True))
+  created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
 
   product_variant_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("product_variants.id"))
   quantity: Mapped[int] = mapped_column(Integer)
@@ -69,15 +108,44 @@ class OrderItem(Base):
     cascade="all, delete-orphan"
   )
 
+  __mapper_args__ = {"primary_key": [id]}
+
 
 class OrderItemIngredient(Base):
   __tablename__ = "order_item_ingredients"
+  __table_args__ = (
+    ForeignKeyConstraint(
+      ["order_item_id", "created_at"], ["order_items.id", "order_items.created_at"], ondelete="CASCADE"
+    ),
+    Index("ix_order_item_ingredients_item", "order_item_id", "created_at"),
+    {"postgresql_partition_by": "RANGE (created_at)"},
+  )
   id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-  order_item_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True),
-                                                   ForeignKey("order_items.id", ondelete="CASCADE"))
+  order_item_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True))
+  created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
   ingredient_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("ingredients.id"))
   quantity: Mapped[int] = mapped_column(Integer, default=1)
   is_removed: Mapped[bool] = mapped_column(Boolean, default=False)
 
   order_item = relationship("OrderItem", back_populates="custom_ingredients")
-  ingredient = relationship("Ingredient")
\ No newline at end of file
+  ingredient = relationship("Ingredient")
+
+  __mapper_args__ = {"primary_key": [id]}
+
+
+class OrderArchive(Base):
+  """A monthly order partition exported to ``path`` and dropped from the database."""
+  __tablename__ = "order_archives"
+
+  period: Mapped[date] = mapped_column(Date, primary_key=True)
+  path: Mapped[str] = mapped_column(String, nullable=False)
+  order_count: Mapped[int] = mapped_column(Integer, nullable=False)
+  archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class OrderArchiveUser(Base):
+  """Which archived months hold orders of a user, so reads open only those files."""
+  __tablename__ = "order_archive_users"
+
+  user_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+  period: Mapped[date] = mapped_column(Date, ForeignKey("order_archives.period", ondelete="CASCADE"), primary_key=True)
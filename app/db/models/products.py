@@ -1,4 +1,4 @@
-from sqlalchemy import String, Float, ForeignKey, Boolean, Integer, Enum as PGEnum
+from sqlalchemy import String, Float, ForeignKey, Boolean, Integer, Enum as PGEnum, UniqueConstraint, Index
 from uuid import UUID
 from sqlalchemy.dialects.postgresql import ENUM, UUID as PGUUID
 from sqlalchemy.orm import relationship, Mapped, mapped_column
@@ -51,6 +51,12 @@ class Product(Base, BaseProductMixin):
     "ProductReplacement", back_populates="product", cascade="all, delete-orphan"
   )
 
+  __table_args__ = (
+    UniqueConstraint("category_id", "position", name="uix_category_position", deferrable=True, initially="IMMEDIATE"),
+    Index("ix_products_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    Index("ix_products_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+  )
+
   __mapper_args__ = {
     'polymorphic_identity': Type.GROUP,
     'polymorphic_on': BaseProductMixin.type,
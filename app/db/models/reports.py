@@ -0,0 +1,46 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class SalesDailyRollup(Base):
+  """Sales per store, UTC day and product variant.
+
+  Unprefixed counters cover every placed order; ``completed_*`` and
+  ``cancelled_*`` follow the order status. Orders without a store are not
+  rolled up.
+  """
+  __tablename__ = "sales_daily_rollups"
+
+  store_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+  day: Mapped[date] = mapped_column(Date, primary_key=True)
+  product_variant_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+
+  quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+  order_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  completed_quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  completed_revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+  cancelled_quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  cancelled_revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+
+
+class SalesHourlyRollup(Base):
+  """Order count and revenue per store and UTC hour."""
+  __tablename__ = "sales_hourly_rollups"
+
+  store_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+  hour: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+
+  orders: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+  completed_orders: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  completed_revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+  cancelled_orders: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  cancelled_revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Time, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Time, Integer, ForeignKey, Index, func
 import uuid
 from datetime import datetime, timezone
 from sqlalchemy.orm import relationship
@@ -24,3 +24,8 @@ class Store(Base):
   city_id = Column(PGUUID(as_uuid=True), ForeignKey('cities.id'), nullable=False)
   city = relationship("City", back_populates="stores")
   categories = relationship("Category", back_populates="store", cascade="all, delete-orphan")
+
+  __table_args__ = (
+    # KNN (<->) lookups of the nearest store order by this expression
+    Index("ix_stores_point_geography", func.geography(func.ST_SetSRID(point, 4326)), postgresql_using="gist"),
+  )
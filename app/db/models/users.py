@@ -1,6 +1,6 @@
 from typing import List
 
-from sqlalchemy import Column, String, DateTime, Integer, func, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, func, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import ENUM, UUID as PGUUID
 import uuid
 from enum import IntEnum
@@ -35,6 +35,13 @@ class User(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # admin directory: phone prefix search, role filter with keyset order, name prefix search
+        Index("ix_users_phone_pattern", "phone_number", postgresql_ops={"phone_number": "text_pattern_ops"}),
+        Index("ix_users_role_phone", "role", "phone_number"),
+        Index("ix_users_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
 class UserAddress(Base):
     __tablename__ = "user_addresses"
 
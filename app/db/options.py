@@ -0,0 +1,28 @@
+from uuid import uuid4
+
+from app.core.config import settings
+
+
+def engine_options() -> dict:
+  """``create_async_engine`` arguments shared by the primary and the replicas.
+
+  SQLAlchemy keeps compiled SQL per engine (``DB_COMPILED_CACHE_SIZE``) and
+  the asyncpg driver keeps server-side prepared statements per connection
+  (``DB_STATEMENT_CACHE_SIZE``). Behind PgBouncer in transaction mode a
+  connection may change server between statements, so ``DB_PGBOUNCER``
+  turns the prepared statement caches off and gives every statement a
+  unique name.
+  """
+  if settings.DB_PGBOUNCER:
+    connect_args = {
+      "statement_cache_size": 0,
+      "prepared_statement_cache_size": 0,
+      "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+  else:
+    connect_args = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+  return {
+    "echo": settings.DB_ECHO,
+    "query_cache_size": settings.DB_COMPILED_CACHE_SIZE,
+    "connect_args": connect_args,
+  }
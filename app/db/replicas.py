@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import itertools
+import logging
+import time
+from typing import List, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.db.lazy import LazySession
+from app.db.options import engine_options
+from app.services.cache_service import redis_manager
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = ("GET", "HEAD")
+
+# replay delay of a standby; 0 while it has applied everything it received
+LAG_SQL = text("""
+  SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+  END
+""")
+
+
+class Replica:
+  def __init__(self, url: str):
+    self.url = url
+    self.engine: AsyncEngine = create_async_engine(
+      url, pool_pre_ping=True, execution_options={"postgresql_readonly": True}, **engine_options(),
+    )
+    self.sessionmaker = async_sessionmaker(bind=self.engine, class_=LazySession, expire_on_commit=False)
+    self.lag: Optional[float] = None
+    # unknown until the first probe; reads stay on the primary meanwhile
+    self.healthy = False
+    self.checked_at = 0.0
+
+  async def probe(self) -> None:
+    try:
+      async with self.engine.connect() as conn:
+        self.lag = float((await conn.execute(LAG_SQL)).scalar_one())
+      self.healthy = self.lag <= settings.REPLICA_MAX_LAG_SECONDS
+      if not self.healthy:
+        logger.warning(f"Replica {self.engine.url.host} is {self.lag:.1f}s behind, reading from the primary")
+    except Exception as e:
+      logger.error(f"Replica {self.engine.url.host} is unreachable: {e}")
+      self.lag = None
+      self.healthy = False
+    finally:
+      self.checked_at = time.monotonic()
+
+  def report(self) -> dict:
+    return {"host": self.engine.url.host, "healthy": self.healthy, "lag_seconds": self.lag}
+
+
+class ReplicaRouter:
+  """Sends safe reads to read replicas and everything else to the primary.
+
+  ``GET``/``HEAD`` requests get a replica session, picked round robin among
+  replicas whose lag is within ``REPLICA_MAX_LAG_SECONDS``. Lag is probed in
+  the background at most every ``REPLICA_LAG_CHECK_INTERVAL`` seconds. A
+  client that made a write (any other method) is pinned to the primary for
+  ``READ_YOUR_WRITES_SECONDS``; the pin is stored in Redis under the token
+  hash, so every worker honours it.
+  """
+
+  def __init__(self, urls: List[str]):
+    self.replicas = [Replica(url) for url in urls]
+    self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+    self._probing: Optional[asyncio.Task] = None
+
+  @property
+  def enabled(self) -> bool:
+    return bool(self.replicas)
+
+  @staticmethod
+  def _sticky_key(token: str) -> str:
+    return redis_manager.key("db_sticky", hashlib.sha256(token.encode()).hexdigest())
+
+  @staticmethod
+  async def pin_to_primary(token: str) -> None:
+    try:
+      async with redis_manager.timed("db_sticky_set") as client:
+        await client.set(ReplicaRouter._sticky_key(token), 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+    except RedisError as e:
+      logger.error(f"Failed to pin client to the primary: {e}")
+
+  @staticmethod
+  async def is_pinned(token: str) -> bool:
+    try:
+      async with redis_manager.timed("db_sticky_get") as client:
+        return bool(await client.exists(ReplicaRouter._sticky_key(token)))
+    except RedisError as e:
+      # without the pin a client might not see its own write, so stay on the primary
+      logger.error(f"Failed to read primary pin: {e}")
+      return True
+
+  def _probe_if_due(self) -> None:
+    if self._probing is not None and not self._probing.done():
+      return
+    now = time.monotonic()
+    due = [r for r in self.replicas if now - r.checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL]
+    if due:
+      self._probing = asyncio.ensure_future(asyncio.gather(*(r.probe() for r in due)))
+
+  def _pick(self) -> Optional[Replica]:
+    for _ in range(len(self.replicas)):
+      replica = next(self._cycle)
+      if replica.healthy:
+        return replica
+    return None
+
+  async def sessionmaker_for(self, request: Request) -> Optional[async_sessionmaker]:
+    """Replica sessionmaker for this request, or ``None`` for the primary."""
+    if not self.enabled:
+      return None
+    token = request.headers.get("token")
+    if request.method not in READ_METHODS:
+      if token:
+        await self.pin_to_primary(token)
+      return None
+
+    self._probe_if_due()
+    replica = self._pick()
+    if replica is None:
+      return None
+    if token and await self.is_pinned(token):
+      return None
+    return replica.sessionmaker
+
+  def report(self) -> List[dict]:
+    return [replica.report() for replica in self.replicas]
+
+  async def dispose(self) -> None:
+    if self._probing is not None:
+      self._probing.cancel()
+    for replica in self.replicas:
+      await replica.engine.dispose()
+
+
+replica_router = ReplicaRouter(settings.replica_urls)
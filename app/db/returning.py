@@ -0,0 +1,32 @@
+"""Write helpers that get the written row back in the same round trip.
+
+Inserts need no helper: with ``expire_on_commit=False`` the ORM keeps every
+attribute it sent, and on asyncpg its ``eager_defaults="auto"`` already
+adds ``RETURNING`` for server-generated columns (``added_at``, ``created_at``)
+to the INSERT. Nullable columns the constructor left out start as ``None``
+(see ``app.db``), so they are loaded too. Calling ``refresh`` after such a
+commit only repeats a SELECT. Updates of rows that are not loaded yet use ``update_returning``.
+"""
+from typing import Any, Optional, Type, TypeVar
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+
+async def update_returning(db: AsyncSession, model: Type[T], *where: Any, **values: Any) -> Optional[T]:
+  """``UPDATE ... RETURNING`` into an ORM object, or ``None`` when no row matched.
+
+  Replaces select, assign, commit, refresh with a single statement; the
+  identity map copy, if any, is overwritten with the returned row. Only for
+  single-table models and ``where`` clauses matching at most one row.
+  """
+  stmt = (
+    update(model)
+    .where(*where)
+    .values(**values)
+    .returning(model)
+    .execution_options(populate_existing=True, synchronize_session=False)
+  )
+  return (await db.scalars(stmt)).one_or_none()
@@ -1,9 +1,4 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+# kept for older imports; the application has a single engine in app.db
+from app.db import engine, async_session as SessionLocal
 
-from app.core.config import settings
-
-DATABASE_URL = settings.DATABASE_URL
-
-engine = create_async_engine(DATABASE_URL, future=True, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+__all__ = ["engine", "SessionLocal"]
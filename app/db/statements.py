@@ -0,0 +1,43 @@
+"""Cached statements for the hottest queries.
+
+Each builder returns a ``lambda_stmt``: the select and its cache key are
+built once per call site, later calls only pull the bound values out of the
+closure and go straight to the compiled SQL cache. Compare with
+``python -m app.commands.benchmark_statements``.
+"""
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import StatementLambdaElement, lambda_stmt, select
+from sqlalchemy.orm import selectinload, with_polymorphic
+
+from app.db.models import CartItem, ProductVariant, User
+from app.db.models.cart_items import CartItemIngredient, PizzaCartItem
+
+cart_item_union = with_polymorphic(CartItem, [PizzaCartItem])
+
+
+def user_by_id(user_id: UUID) -> StatementLambdaElement:
+  return lambda_stmt(lambda: select(User).where(User.id == user_id))
+
+
+def user_cart(user_id: UUID) -> StatementLambdaElement:
+  return lambda_stmt(lambda: (
+    select(cart_item_union)
+    .where(cart_item_union.user_id == user_id)
+    .options(
+      selectinload(cart_item_union.product_variant)
+      .selectinload(ProductVariant.product),
+      selectinload(cart_item_union.PizzaCartItem.custom_ingredients)
+      .selectinload(CartItemIngredient.ingredient)
+    )
+  ))
+
+
+def variants_with_products(variant_ids: Iterable[UUID]) -> StatementLambdaElement:
+  ids = list(variant_ids)
+  return lambda_stmt(lambda: (
+    select(ProductVariant)
+    .where(ProductVariant.id.in_(ids))
+    .options(selectinload(ProductVariant.product))
+  ))
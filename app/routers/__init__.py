@@ -7,6 +7,9 @@ from app.routers.product import router as product_router
 from app.routers.ingredient import router as ingredient_router
 from app.routers.cart_item import router as cart_item_router
 from app.routers.order import router as order_router
+from app.routers.catalog import router as catalog_router
+from app.routers.report import router as report_router
+from app.routers.system import router as system_router
 main_router = APIRouter()
 main_router.include_router(user_router, prefix="/user", tags=["User"])
 main_router.include_router(cart_item_router, prefix="/cart-item", tags=["Cart_Item"])
@@ -15,4 +18,7 @@ main_router.include_router(store_router, prefix="/store", tags=["Store"])
 main_router.include_router(category_router, prefix="/category", tags=["Category"])
 main_router.include_router(product_router, prefix="/product", tags=["Product"])
 main_router.include_router(ingredient_router, prefix="/ingredient", tags=["Ingredient"])
-main_router.include_router(order_router, prefix="/order", tags=["Order"])
\ No newline at end of file
+main_router.include_router(order_router, prefix="/order", tags=["Order"])
+main_router.include_router(catalog_router, prefix="/catalog", tags=["Catalog"])
+main_router.include_router(report_router, prefix="/report", tags=["Report"])
+main_router.include_router(system_router, prefix="/system", tags=["System"])
\ No newline at end of file
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends
 from fastapi.params import Header
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -6,6 +8,7 @@ from app.db import get_db
 from app.db.models import User
 from app.schemas.cart_item import CartItemCreate
 from app.services.cart_item_service import CartItemService
+from app.services.idempotency_service import IdempotencyService
 from app.services.response_utils import ResponseUtils
 
 router = APIRouter()
@@ -40,14 +43,18 @@ async def get_preview_price(
 async def add_to_cart_item(
     data: CartItemCreate,
     db: AsyncSession = Depends(get_db),
-    token: str = Header(..., alias="token")
+    token: str = Header(..., alias="token"),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
     user_or_error = await SecurityMiddleware.get_user_or_error_dict(token, db)
     if isinstance(user_or_error, dict):
         return user_or_error
     user: User = user_or_error
 
-    result = await CartItemService.add_or_update_item(data, db, user)
-    if result is None:
-        return ResponseUtils.success(message="Успешно удален")
-    return ResponseUtils.success(cart_item=result)
+    async def add() -> dict:
+        result = await CartItemService.add_or_update_item(data, db, user)
+        if result is None:
+            return ResponseUtils.success(message="Успешно удален")
+        return ResponseUtils.success(cart_item=result)
+
+    return await IdempotencyService.run(idempotency_key, "cart:add", user.id, add, data)
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import SecurityMiddleware
+from app.db import get_db
+from app.schemas.catalog import CatalogBulkUpdate
+from app.services.catalog_service import CatalogService
+from app.services.response_utils import ResponseUtils
+
+router = APIRouter()
+
+@router.post("/bulk-update/")
+async def bulk_update_catalog(
+    data: CatalogBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    token: str = Header(None)
+):
+  if token is None:
+    return ResponseUtils.error(message="Токен не предоставлен")
+  auth = await SecurityMiddleware.is_admin_or_manager(token, db)
+  if isinstance(auth, dict):
+    return auth
+
+  result = await CatalogService.apply_bulk(db, data)
+  return ResponseUtils.success(message="Изменения применены", changes=result)
@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends
@@ -7,8 +8,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import SecurityMiddleware
 from app.db import get_db
-from app.schemas.category import SwapCategory, CreateCategory, UpdateCategory
+from app.schemas.category import SwapCategory, CreateCategory, UpdateCategory, ReorderCategories
 from app.services.category_service import CategoryService
+from app.services.idempotency_service import IdempotencyService
 from app.services.response_utils import ResponseUtils
 
 router = APIRouter()
@@ -44,17 +46,42 @@ async def swap_categories_endpoint(
   await CategoryService.swap_categories_by_ids(db, swap_data.first_category, swap_data.second_category)
   return ResponseUtils.success(message="Позиции поменялись")
 
+@router.post("/reorder/")
+async def reorder_categories_endpoint(
+    reorder_data: ReorderCategories,
+    db: AsyncSession = Depends(get_db),
+    token: str = Header(None)
+):
+  if token is None:
+    return ResponseUtils.error(message="Токен не предоставлен")
+  auth = await SecurityMiddleware.is_admin_or_manager(token, db)
+  if isinstance(auth, dict):
+    return auth
+
+  try:
+    await CategoryService.reorder_categories(db, reorder_data.store_id, reorder_data.category_ids)
+  except ValueError as e:
+    return ResponseUtils.error(str(e))
+  return ResponseUtils.success(message="Порядок категорий обновлён")
+
 @router.post('/create-category/')
 async def create_category_endpoint(
   category_data: CreateCategory,
   db: AsyncSession = Depends(get_db),
-  token: str = Header(None)
+  token: str = Header(None),
+  idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
   if token is None:
     return ResponseUtils.error(message="Токен не предоставлен")
-  await SecurityMiddleware.is_admin_or_manager(token, db)
-  new_category = await CategoryService.create_category(db, category_data)
-  return ResponseUtils.success(category=new_category)
+  auth = await SecurityMiddleware.is_admin_or_manager(token, db)
+  if isinstance(auth, dict):
+    return auth
+
+  async def create() -> dict:
+    new_category = await CategoryService.create_category(db, category_data)
+    return ResponseUtils.success(category=new_category)
+
+  return await IdempotencyService.run(idempotency_key, "category:create", auth.id, create, category_data)
 
 @router.put("/{category_id}")
 async def update_category_endpoint(
@@ -1,6 +1,7 @@
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.params import Depends, Header
 from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
@@ -14,19 +15,28 @@ from app.db.models.products import PizzaIngredient, Pizza, Product
 from app.schemas.city import City as CitySchema, CreateCity, UpdateCity, City
 from app.services.response_utils import ResponseUtils
 from app.services.city_service import CityService
+from app.services.idempotency_service import IdempotencyService
+from app.services.nearest_service import NearestService
 router = APIRouter()
 @router.get("/all-cities/")
 async def get_all_city_endpoint(db: AsyncSession = Depends(get_db)):
-  cities = await CityService.get_all_cities(db)
-  for city in cities:
-    await CityService.convert_geometry(city)
+  cities = await CityService.list_city_responses(db)
+  return ResponseUtils.success(cities=cities)
+
+@router.get("/nearest/")
+async def get_nearest_cities_endpoint(
+  lon: float = Query(..., ge=-180, le=180),
+  lat: float = Query(..., ge=-90, le=90),
+  k: int = Query(1, ge=1, description="Сколько ближайших городов вернуть"),
+  db: AsyncSession = Depends(get_db)
+):
+  cities = await NearestService.nearest_cities(db, lon, lat, k)
   return ResponseUtils.success(cities=cities)
 
 @router.get("/{city_id}")
 async def get_city(city_id: UUID, db: AsyncSession = Depends(get_db)):
   try:
-    city = await CityService.get_city_by_id(db, city_id)
-    await CityService.convert_geometry(city)
+    city = await CityService.get_city_response(db, city_id)
     return ResponseUtils.success(city=city)
   except NoResultFound:
     return ResponseUtils.error(message=f"Нет найденного города с id {city_id}")
@@ -65,17 +75,24 @@ async def get_city_with_all( city_id: UUID, db: AsyncSession = Depends(get_db)):
 async def create_city(
   city_data: CreateCity,
   db: AsyncSession = Depends(get_db),
-  token: str = Header(None)
+  token: str = Header(None),
+  idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
   if token is None:
     return ResponseUtils.error(message="Токен не предоставлен")
-  await SecurityMiddleware.is_admin(token, db)
-  try:
-    new_city = await CityService.create_city(db, city_data)
-    await CityService.convert_geometry(new_city)
-    return ResponseUtils.success(city=new_city, message="Город создан")
-  except Exception as e:
-    return ResponseUtils.error(message=str(e))
+  auth = await SecurityMiddleware.is_admin(token, db)
+  if isinstance(auth, dict):
+    return auth
+
+  async def create() -> dict:
+    try:
+      new_city = await CityService.create_city(db, city_data)
+      city = await CityService.get_city_response(db, new_city.id)
+      return ResponseUtils.success(city=city, message="Город создан")
+    except Exception as e:
+      return ResponseUtils.error(message=str(e))
+
+  return await IdempotencyService.run(idempotency_key, "city:create", auth.id, create, city_data)
 
 @router.put("/")
 async def update_city(
@@ -88,8 +105,8 @@ async def update_city(
   await SecurityMiddleware.is_admin(token, db)
   try:
     updated_city = await CityService.update_city(db, category_data)
-    await CityService.convert_geometry(updated_city)
-    return ResponseUtils.success(city=updated_city, message="Город успешно изменен")
+    city = await CityService.get_city_response(db, updated_city.id)
+    return ResponseUtils.success(city=city, message="Город успешно изменен")
   except Exception as e:
     return ResponseUtils.error(message=str(e))
 
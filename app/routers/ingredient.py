@@ -8,6 +8,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Ingredient
+from app.services.idempotency_service import IdempotencyService
 from app.services.ingredient_service import IngredientService
 from uuid import UUID
 from app.db import get_db
@@ -28,41 +29,47 @@ async def get_ingredient(ingredient_id: UUID, db: AsyncSession = Depends(get_db)
   return ResponseUtils.success(ingredients = ingredient)
 
 @router.post("/")
-async def create_ingredient(ingredient_data_json: str = Form(...), images: Optional[List[UploadFile]] | None = File(None), db: AsyncSession = Depends(get_db), token: str = Header(None)):
+async def create_ingredient(ingredient_data_json: str = Form(...), images: Optional[List[UploadFile]] | None = File(None), db: AsyncSession = Depends(get_db), token: str = Header(None), idempotency_key: Optional[str] = Header(None, max_length=255)):
   if token is None:
     return ResponseUtils.error(message="Токен не предоставлен")
-  await SecurityMiddleware.is_admin_or_manager(token, db)
-
-  data = json.loads(ingredient_data_json)
-  name = data.get("name")
-  price = data.get("price")
+  auth = await SecurityMiddleware.is_admin_or_manager(token, db)
+  if isinstance(auth, dict):
+    return auth
 
-  image_path: Optional[str] = None
-  overlay_path: Optional[str] = None
+  async def create() -> dict:
+    data = json.loads(ingredient_data_json)
+    name = data.get("name")
+    price = data.get("price")
 
-  if images:
-    os.makedirs("media/ingredients", exist_ok=True)
-    os.makedirs("media/ingredients/overlays", exist_ok=True)
-    if len(images) >= 1:
-      main_file = images[0]
-      main_location = os.path.join("media", "ingredients", main_file.filename)
-      with open(main_location, "wb") as f:
-        f.write(await main_file.read())
-      image_path = f"/{main_location.replace(os.sep, '/')}"
+    image_path: Optional[str] = None
+    overlay_path: Optional[str] = None
 
-    if len(images) >= 2:
-      overlay_file = images[1]
-      overlay_location = os.path.join("media", "ingredients", "overlays", overlay_file.filename)
-      with open(overlay_location, "wb") as f:
-        f.write(await overlay_file.read())
-      overlay_path = f"/{overlay_location.replace(os.sep, '/')}"
-  ingredient_dict = {
-    "name": name,
-    "image": image_path,
-    "overlay_image": overlay_path,
-    "price": price,
-  }
-  return ResponseUtils.success(ingredients = await IngredientService.create(ingredient_dict, db))
+    if images:
+      os.makedirs("media/ingredients", exist_ok=True)
+      os.makedirs("media/ingredients/overlays", exist_ok=True)
+      if len(images) >= 1:
+        main_file = images[0]
+        main_location = os.path.join("media", "ingredients", main_file.filename)
+        with open(main_location, "wb") as f:
+          f.write(await main_file.read())
+        image_path = f"/{main_location.replace(os.sep, '/')}"
+
+      if len(images) >= 2:
+        overlay_file = images[1]
+        overlay_location = os.path.join("media", "ingredients", "overlays", overlay_file.filename)
+        with open(overlay_location, "wb") as f:
+          f.write(await overlay_file.read())
+        overlay_path = f"/{overlay_location.replace(os.sep, '/')}"
+    ingredient_dict = {
+      "name": name,
+      "image": image_path,
+      "overlay_image": overlay_path,
+      "price": price,
+    }
+    return ResponseUtils.success(ingredients = await IngredientService.create(ingredient_dict, db))
+
+  payload = {"data": ingredient_data_json, "images": [image.filename for image in images or []]}
+  return await IdempotencyService.run(idempotency_key, "ingredient:create", auth.id, create, payload)
 
 @router.put("/{ingredient_id}")
 async def update_ingredient(ingredient_id: UUID, ingredient_data_json: str = Form(...), images: Optional[List[UploadFile]] = File(None), db: AsyncSession = Depends(get_db), token: str = Header(None)):
@@ -1,4 +1,5 @@
-from typing import List, Any, Coroutine
+from datetime import datetime
+from typing import List, Any, Coroutine, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, status, Query
@@ -8,7 +9,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.security import SecurityMiddleware
 from app.db import get_db
 from app.db.models import User, Order
-from app.schemas.order import OrderCreate, OrderRead, OrderStatusUpdate, OrderStatus
+from app.schemas.order import OrderCreate, OrderCheckout, OrderRead, OrderStatusUpdate, OrderStatusBulkUpdate, OrderStatus
+from app.services.idempotency_service import IdempotencyService
+from app.services.order_archive_service import OrderArchiveService
 from app.services.order_service import OrderService
 from app.services.response_utils import ResponseUtils
 
@@ -17,6 +20,8 @@ router = APIRouter()
   "/me",
 )
 async def get_my_orders(
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
     db: AsyncSession = Depends(get_db),
     token: str = Header(None),
 ):
@@ -24,7 +29,21 @@ async def get_my_orders(
   if isinstance(user_or_error, dict):
     return user_or_error
   user: User = user_or_error
-  orders = await OrderService.list_orders_by_user(db, user.id)
+  orders = await OrderService.list_orders_by_user(db, user.id, date_from, date_to)
+  return ResponseUtils.success(orders=orders)
+
+@router.get(
+  "/archive/me",
+)
+async def get_my_archived_orders(
+    db: AsyncSession = Depends(get_db),
+    token: str = Header(None),
+):
+  user_or_error = await SecurityMiddleware.get_user_or_error_dict(token, db)
+  if isinstance(user_or_error, dict):
+    return user_or_error
+  user: User = user_or_error
+  orders = await OrderArchiveService.list_user_orders(db, user.id)
   return ResponseUtils.success(orders=orders)
 
 @router.get(
@@ -32,6 +51,8 @@ async def get_my_orders(
 )
 async def get_store_orders(
   store_id: UUID,
+  date_from: Optional[datetime] = Query(None),
+  date_to: Optional[datetime] = Query(None),
   db: AsyncSession = Depends(get_db),
   token: str = Header(None),
 )->dict:
@@ -39,7 +60,7 @@ async def get_store_orders(
     return ResponseUtils.error(message="Токен не предоставлен")
   await SecurityMiddleware.is_admin_or_manager(token, db)
 
-  return ResponseUtils.success(orders=await OrderService.list_orders_by_store(db, store_id))
+  return ResponseUtils.success(orders=await OrderService.list_orders_by_store(db, store_id, date_from, date_to))
 
 @router.get(
     "/store/{store_id}/filter",
@@ -55,6 +76,8 @@ async def get_store_orders_filtered(
       "отрицательные для исключения (e.g. -1 — исключить статус 1)"
     )
   ),
+  date_from: Optional[datetime] = Query(None),
+  date_to: Optional[datetime] = Query(None),
   db: AsyncSession = Depends(get_db),
   token: str = Header(None),
 ) -> dict:
@@ -66,7 +89,7 @@ async def get_store_orders_filtered(
     return auth
 
   orders = await OrderService.list_orders_by_store_filter_statuses(
-    db, store_id, statuses or []
+    db, store_id, statuses or [], date_from, date_to
   )
   return ResponseUtils.success(orders=orders)
 @router.post("/")
@@ -74,13 +97,36 @@ async def place_order(
     payload: OrderCreate,
     db: AsyncSession = Depends(get_db),
     token: str = Header(None),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 )->dict:
   user_or_error = await SecurityMiddleware.get_user_or_error_dict(token, db)
   if isinstance(user_or_error, dict):
     return user_or_error
   user: User = user_or_error
-  order = await OrderService.create_order(db, payload,user)
-  return ResponseUtils.success(order=order)
+
+  async def place() -> dict:
+    order = await OrderService.create_order(db, payload,user)
+    return ResponseUtils.success(order=order)
+
+  return await IdempotencyService.run(idempotency_key, "order:create", user.id, place, payload)
+
+@router.post("/checkout")
+async def checkout(
+    payload: OrderCheckout,
+    db: AsyncSession = Depends(get_db),
+    token: str = Header(None),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+)->dict:
+  user_or_error = await SecurityMiddleware.get_user_or_error_dict(token, db)
+  if isinstance(user_or_error, dict):
+    return user_or_error
+  user: User = user_or_error
+
+  async def place() -> dict:
+    order = await OrderService.checkout(db, payload, user)
+    return ResponseUtils.success(order=order)
+
+  return await IdempotencyService.run(idempotency_key, "order:checkout", user.id, place, payload)
 
 @router.put("/update_order_status")
 async def update_order_status(
@@ -96,3 +142,16 @@ async def update_order_status(
     return ResponseUtils.success(order=res)
   return ResponseUtils.error(message='Ошибка')
 
+@router.put("/statuses")
+async def update_order_statuses(
+  data: OrderStatusBulkUpdate,
+  db: AsyncSession = Depends(get_db),
+  token: str = Header(None),
+) -> dict:
+  if token is None:
+    return ResponseUtils.error(message="Токен не предоставлен")
+  auth = await SecurityMiddleware.is_not_user(token, db)
+  if isinstance(auth, dict):
+    return auth
+  result = await OrderService.transition_statuses(db, data.orders)
+  return ResponseUtils.success(updated=result.updated, rejected=result.rejected)
@@ -1,15 +1,18 @@
 import os
+from typing import List, Optional
 from uuid import UUID
 import json
-from fastapi import Form, File, Depends, UploadFile, APIRouter, Header
+from fastapi import Form, File, Depends, UploadFile, APIRouter, Header, Query
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import SecurityMiddleware
 from app.db import get_db
-from app.schemas.product import ProductCreate, ProductUpdate, PizzaUpdate, TypeProduct, PizzaCreate
+from app.schemas.product import ProductCreate, ProductUpdate, PizzaUpdate, TypeProduct, PizzaCreate, ReorderProducts
+from app.services.idempotency_service import IdempotencyService
 from app.services.product_service import ProductService
 from app.services.response_utils import ResponseUtils
+from app.services.search_service import SearchService
 
 router = APIRouter()
 @router.get("/by-category/{category_id}")
@@ -17,6 +20,47 @@ async def get_products_by_category(category_id: UUID, db: AsyncSession = Depends
     products = await ProductService.get_products_by_category(db, category_id)
     return ResponseUtils.success(products=products)
 
+@router.get("/search")
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    store_id: Optional[UUID] = None,
+    city_id: Optional[UUID] = None,
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        result = await SearchService.search(db, q, store_id, city_id, limit)
+    except ValueError as e:
+        return ResponseUtils.error(str(e))
+    return ResponseUtils.success(**result)
+
+@router.get("/autocomplete")
+async def autocomplete_products(
+    q: str = Query(..., min_length=1, max_length=50),
+    store_id: Optional[UUID] = None,
+    city_id: Optional[UUID] = None,
+    limit: int = Query(10, ge=1, le=20),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        suggestions = await SearchService.autocomplete(db, q, store_id, city_id, limit)
+    except ValueError as e:
+        return ResponseUtils.error(str(e))
+    return ResponseUtils.success(suggestions=suggestions)
+
+@router.get("/by-ingredients")
+async def get_pizzas_by_ingredients(
+    ingredient_ids: List[UUID] = Query(..., alias="ingredient_id"),
+    store_id: Optional[UUID] = None,
+    city_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        pizzas = await SearchService.pizzas_by_ingredients(db, ingredient_ids, store_id, city_id)
+    except ValueError as e:
+        return ResponseUtils.error(str(e))
+    return ResponseUtils.success(products=pizzas)
+
 @router.get("/{product_id}")
 async def get_product_by_id(product_id: UUID, db: AsyncSession = Depends(get_db)):
     product = await ProductService.get_product_by_id(db, product_id)
@@ -34,47 +78,72 @@ async def create_product(
     product_data_json: str = Form(...),
     images: list[UploadFile] = File(...),
     db: AsyncSession = Depends(get_db),
-    token: str = Header(None)
+    token: str = Header(None),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
   if token is None:
     return ResponseUtils.error(message="Токен не предоставлен")
-  await SecurityMiddleware.is_admin_or_manager(token, db)
+  auth = await SecurityMiddleware.is_admin_or_manager(token, db)
+  if isinstance(auth, dict):
+    return auth
 
-  try:
-    parsed_data = json.loads(product_data_json)
-    variants_data = parsed_data.get("variants", [])
-  except json.JSONDecodeError:
-    return ResponseUtils.error("Некорректный формат JSON данных")
+  async def create() -> dict:
+    try:
+      parsed_data = json.loads(product_data_json)
+      variants_data = parsed_data.get("variants", [])
+    except json.JSONDecodeError:
+      return ResponseUtils.error("Некорректный формат JSON данных")
 
-  try:
-    if len(images) != len(variants_data):
-      return ResponseUtils.error("Количество изображений должно соответствовать количеству вариантов")
+    try:
+      if len(images) != len(variants_data):
+        return ResponseUtils.error("Количество изображений должно соответствовать количеству вариантов")
 
-    for i, image in enumerate(images):
-      if not image.filename.lower().endswith((".jpg", ".jpeg", ".png")):
-        return ResponseUtils.error(f"Недопустимый формат изображения: {image.filename}")
+      for i, image in enumerate(images):
+        if not image.filename.lower().endswith((".jpg", ".jpeg", ".png")):
+          return ResponseUtils.error(f"Недопустимый формат изображения: {image.filename}")
 
-      save_path = f"media/products/{image.filename}"
-      os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        save_path = f"media/products/{image.filename}"
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
 
-      with open(save_path, "wb") as f:
-        f.write(await image.read())
+        with open(save_path, "wb") as f:
+          f.write(await image.read())
 
-      variants_data[i]["image"] = f"/media/products/{image.filename}"
+        variants_data[i]["image"] = f"/media/products/{image.filename}"
 
-    parsed_data["variants"] = variants_data
-    product_type = parsed_data.get("type")
+      parsed_data["variants"] = variants_data
+      product_type = parsed_data.get("type")
 
-    if product_type == TypeProduct.PIZZA:
-      product_data = PizzaCreate(**parsed_data)
-    else:
-      product_data = ProductCreate(**parsed_data)
+      if product_type == TypeProduct.PIZZA:
+        product_data = PizzaCreate(**parsed_data)
+      else:
+        product_data = ProductCreate(**parsed_data)
+
+    except Exception as e:
+      return ResponseUtils.error(f"Ошибка валидации: {str(e)}")
+
+    product = await ProductService.create_product(db, product_data)
+    return ResponseUtils.success(product=product)
 
-  except Exception as e:
-    return ResponseUtils.error(f"Ошибка валидации: {str(e)}")
+  payload = {"data": product_data_json, "images": [image.filename for image in images]}
+  return await IdempotencyService.run(idempotency_key, "product:create", auth.id, create, payload)
 
-  product = await ProductService.create_product(db, product_data)
-  return ResponseUtils.success(product=product)
+@router.post("/reorder")
+async def reorder_products(
+    reorder_data: ReorderProducts,
+    db: AsyncSession = Depends(get_db),
+    token: str = Header(None)
+):
+  if token is None:
+    return ResponseUtils.error(message="Токен не предоставлен")
+  auth = await SecurityMiddleware.is_admin_or_manager(token, db)
+  if isinstance(auth, dict):
+    return auth
+
+  try:
+    await ProductService.reorder_products(db, reorder_data.category_id, reorder_data.product_ids)
+  except ValueError as e:
+    return ResponseUtils.error(str(e))
+  return ResponseUtils.success(message="Порядок продуктов обновлён")
 
 @router.put("/update/{product_id}")
 async def update_product(
@@ -130,11 +199,11 @@ async def update_product(
   except ValidationError:
     product_data = ProductUpdate(**parsed_data)
   try:
-    product = await ProductService.update_product(db, product_id, product_data)
+    product, changes = await ProductService.update_product(db, product_id, product_data)
   except ValueError as e:
     return ResponseUtils.error(str(e))
 
-  return ResponseUtils.success(product=product)
+  return ResponseUtils.success(product=product, changes=changes)
 
 @router.delete("/delete/{product_id}")
 async def delete_product(
@@ -0,0 +1,60 @@
+from datetime import date
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import SecurityMiddleware
+from app.db import get_db
+from app.services.report_service import ReportService
+from app.services.response_utils import ResponseUtils
+
+router = APIRouter()
+
+async def _authorize(token: str | None, db: AsyncSession):
+  if token is None:
+    return ResponseUtils.error(message="Токен не предоставлен")
+  auth = await SecurityMiddleware.is_admin_or_manager(token, db)
+  if isinstance(auth, dict):
+    return auth
+  return None
+
+@router.get("/store/{store_id}/daily")
+async def get_daily_report(
+  store_id: UUID,
+  date_from: date = Query(...),
+  date_to: date = Query(...),
+  db: AsyncSession = Depends(get_db),
+  token: str = Header(None),
+):
+  error = await _authorize(token, db)
+  if error:
+    return error
+  return ResponseUtils.success(days=await ReportService.daily(db, store_id, date_from, date_to))
+
+@router.get("/store/{store_id}/hourly")
+async def get_hourly_report(
+  store_id: UUID,
+  date_from: date = Query(...),
+  date_to: date = Query(...),
+  db: AsyncSession = Depends(get_db),
+  token: str = Header(None),
+):
+  error = await _authorize(token, db)
+  if error:
+    return error
+  return ResponseUtils.success(hours=await ReportService.hourly(db, store_id, date_from, date_to))
+
+@router.get("/store/{store_id}/variants")
+async def get_variants_report(
+  store_id: UUID,
+  date_from: date = Query(...),
+  date_to: date = Query(...),
+  limit: int = Query(50, ge=1, le=500),
+  db: AsyncSession = Depends(get_db),
+  token: str = Header(None),
+):
+  error = await _authorize(token, db)
+  if error:
+    return error
+  return ResponseUtils.success(variants=await ReportService.top_variants(db, store_id, date_from, date_to, limit))
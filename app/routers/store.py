@@ -1,4 +1,7 @@
-from fastapi import Depends, APIRouter
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Depends, APIRouter, Query, Response
 from fastapi.params import Header
 from sqlalchemy.exc import NoResultFound, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -6,37 +9,74 @@ from uuid import UUID
 
 from app.core.security import SecurityMiddleware
 from app.db import get_db
+from app.services.idempotency_service import IdempotencyService
+from app.services.nearest_service import NearestService
 from app.services.response_utils import ResponseUtils
 from app.schemas.store import UpdateStore, CreateStore, StoreResponse
+from app.services.product_service import ProductService
+from app.services.schedule_service import ScheduleService
 from app.services.store_service import StoreService
+from app.services.zone_service import ZoneService
 router = APIRouter()
 
 @router.get("/get-store/{store_id}/")
 async def get_store_endpoint(store_id: UUID, db: AsyncSession = Depends(get_db)):
   try:
-    store = await StoreService.get_store_by_id(db, store_id)
-    await StoreService.convert_geometry(store)
+    store = await StoreService.get_store_response(db, store_id)
     response_data = StoreResponse.model_validate(store)
     return ResponseUtils.success(store=response_data.model_dump())
   except NoResultFound:
     return ResponseUtils.error(message="Нет найденного магазина")
 
+@router.get("/nearest/")
+async def get_nearest_stores_endpoint(
+  lon: float = Query(..., ge=-180, le=180),
+  lat: float = Query(..., ge=-90, le=90),
+  k: int = Query(3, ge=1, description="Сколько ближайших магазинов вернуть"),
+  city_id: Optional[UUID] = Query(None),
+  db: AsyncSession = Depends(get_db)
+):
+  stores = await NearestService.nearest_stores(db, lon, lat, k, city_id)
+  return ResponseUtils.success(stores=stores)
+
+@router.get("/catalog/{store_id}/")
+async def get_store_catalog_endpoint(store_id: UUID, db: AsyncSession = Depends(get_db)):
+  categories = await ProductService.get_store_catalog(db, store_id)
+  return ResponseUtils.success(categories=categories)
+
+@router.get("/schedule/{city_id}/")
+async def get_city_schedule_endpoint(
+  city_id: UUID,
+  at: Optional[datetime] = Query(None, description="Момент времени; без часового пояса считается местным временем города"),
+  db: AsyncSession = Depends(get_db)
+):
+  index = await ScheduleService.get_index(db, city_id)
+  if index is None:
+    return ResponseUtils.error(message="Город не найден")
+  return ResponseUtils.success(schedule=index.snapshot(at))
+
+@router.get("/zones/{city_id}/")
+async def get_city_zones_endpoint(
+  city_id: UUID,
+  zoom: int = Query(12, ge=0, le=22, description="Масштаб карты; округляется вниз до ближайшего подготовленного"),
+  db: AsyncSession = Depends(get_db)
+):
+  # a bare FeatureCollection, so map libraries can load the URL directly
+  collection = await ZoneService.city_zones(db, city_id, zoom)
+  return Response(content=collection, media_type="application/geo+json")
+
 @router.get("/get-stores-by-city/{city_id}/")
 async def get_stores_by_city_endpoint(
   city_id: UUID,
   db: AsyncSession = Depends(get_db)
 ):
-  stores = await StoreService.get_stores_by_city(db, city_id)
-  for store in stores:
-    await StoreService.convert_geometry(store)
+  stores = await StoreService.list_store_responses(db, city_id)
   response_data = [StoreResponse.model_validate(store).model_dump() for store in stores]
   return ResponseUtils.success(stores=response_data)
 
 @router.get("/all-stores/")
 async def get_all_stores_endpoint(db: AsyncSession = Depends(get_db)):
-  stores = await StoreService.get_all_stores(db)
-  for store in stores:
-    await StoreService.convert_geometry(store)
+  stores = await StoreService.list_store_responses(db)
   response_data = [StoreResponse.model_validate(store).model_dump() for store in stores]
   return ResponseUtils.success(stores=response_data)
 
@@ -44,21 +84,27 @@ async def get_all_stores_endpoint(db: AsyncSession = Depends(get_db)):
 async def create_store_endpoint(
   store_data: CreateStore,
   db: AsyncSession = Depends(get_db),
-  token: str = Header(None)
+  token: str = Header(None),
+  idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
-  await SecurityMiddleware.is_admin(token, db)
+  auth = await SecurityMiddleware.is_admin(token, db)
+  if isinstance(auth, dict):
+    return auth
 
-  try:
-    new_store = await StoreService.create_store(db, store_data)
-    await StoreService.convert_geometry(new_store)
-    return ResponseUtils.success(store=StoreResponse.model_validate(new_store).model_dump())
+  async def create() -> dict:
+    try:
+      new_store = await StoreService.create_store(db, store_data)
+      store = await StoreService.get_store_response(db, new_store.id)
+      return ResponseUtils.success(store=StoreResponse.model_validate(store).model_dump())
 
-  except IntegrityError as e:
-    if "stores_phone_number_key" in str(e.orig):
-      return ResponseUtils.error(message="Магазин с таким номером телефона уже существует.")
-    return ResponseUtils.error(message="Произошла ошибка при создании магазина.")
-  except Exception as e:
-    return ResponseUtils.error(message=str(e))
+    except IntegrityError as e:
+      if "stores_phone_number_key" in str(e.orig):
+        return ResponseUtils.error(message="Магазин с таким номером телефона уже существует.")
+      return ResponseUtils.error(message="Произошла ошибка при создании магазина.")
+    except Exception as e:
+      return ResponseUtils.error(message=str(e))
+
+  return await IdempotencyService.run(idempotency_key, "store:create", auth.id, create, store_data)
 
 @router.put("/{store_id}/")
 async def update_store_endpoint(
@@ -70,8 +116,8 @@ async def update_store_endpoint(
 
   try:
     updated_store = await StoreService.update_store(db, store_data)
-    await StoreService.convert_geometry(updated_store)
-    response_data = StoreResponse.model_validate(updated_store)
+    store = await StoreService.get_store_response(db, updated_store.id)
+    response_data = StoreResponse.model_validate(store)
     return ResponseUtils.success(store=response_data.model_dump())
 
   except NoResultFound:
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import SecurityMiddleware
+from app.core.startup import startup_report
+from app.db import connection_stats, get_db, get_primary_db, replica_router
+from app.services.cache_service import redis_manager
+from app.services.job_service import JobService
+from app.services.response_utils import ResponseUtils
+
+router = APIRouter()
+
+@router.get("/redis")
+async def redis_status(db: AsyncSession = Depends(get_db), token: str = Header(None)):
+  if token is None:
+    return ResponseUtils.error(message="Токен не предоставлен")
+  auth = await SecurityMiddleware.is_admin(token, db)
+  if isinstance(auth, dict):
+    return auth
+
+  return ResponseUtils.success(health=await redis_manager.health(), latency=redis_manager.latency_report())
+
+@router.get("/startup")
+async def startup_status(db: AsyncSession = Depends(get_db), token: str = Header(None)):
+  if token is None:
+    return ResponseUtils.error(message="Токен не предоставлен")
+  auth = await SecurityMiddleware.is_admin(token, db)
+  if isinstance(auth, dict):
+    return auth
+
+  return ResponseUtils.success(report=startup_report.as_dict())
+
+@router.get("/replicas")
+async def replicas_status(db: AsyncSession = Depends(get_primary_db), token: str = Header(None)):
+  if token is None:
+    return ResponseUtils.error(message="Токен не предоставлен")
+  auth = await SecurityMiddleware.is_admin(token, db)
+  if isinstance(auth, dict):
+    return auth
+
+  return ResponseUtils.success(enabled=replica_router.enabled, replicas=replica_router.report())
+
+@router.get("/jobs")
+async def jobs_status(db: AsyncSession = Depends(get_primary_db), token: str = Header(None)):
+  if token is None:
+    return ResponseUtils.error(message="Токен не предоставлен")
+  auth = await SecurityMiddleware.is_admin(token, db)
+  if isinstance(auth, dict):
+    return auth
+
+  return ResponseUtils.success(jobs=await JobService.stats(db))
+
+@router.get("/db-sessions")
+async def db_sessions_status(db: AsyncSession = Depends(get_db), token: str = Header(None)):
+  if token is None:
+    return ResponseUtils.error(message="Токен не предоставлен")
+  auth = await SecurityMiddleware.is_admin(token, db)
+  if isinstance(auth, dict):
+    return auth
+
+  return ResponseUtils.success(routes=connection_stats.report())
@@ -8,6 +8,7 @@ from fastapi.params import File, Path
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.models.users import Roles
 from app.schemas.user import UpdateUserForm, UserPayload, UserPayloadWithId
 from app.services.cache_service import ConnectRedis
 from app.services.response_utils import ResponseUtils
@@ -15,7 +16,7 @@ from app.services.sms_service import SmsService
 from app.services.user_service import UserService
 from app.core.security import SecurityMiddleware
 from pydantic import BaseModel
-from app.db import get_db
+from app.db import get_db, replica_router
 
 sms_service = SmsService()
 router = APIRouter()
@@ -47,7 +48,7 @@ async def verify_code(request: VerifyCodeRequest, db: AsyncSession = Depends(get
   if stored_code:
 
     existing_user = await UserService.get_user_by_phone(db, request.phone_number)
-    await connect.delete_data(request.phone_number)
+    await connect.delete_sms_code(request.phone_number)
 
     if existing_user:
       token = SecurityMiddleware.generate_jwt_token(str(existing_user.id))
@@ -58,6 +59,9 @@ async def verify_code(request: VerifyCodeRequest, db: AsyncSession = Depends(get
     else:
       new_user = await UserService.create_new_user(db, request.phone_number)
       token = SecurityMiddleware.generate_jwt_token(str(new_user.id))
+      # the user row was just written on the primary; a lagging replica would not find it yet
+      if replica_router.enabled:
+        await replica_router.pin_to_primary(token)
 
       return ResponseUtils.success(
         token=token,
@@ -66,7 +70,26 @@ async def verify_code(request: VerifyCodeRequest, db: AsyncSession = Depends(get
   else:
     return ResponseUtils.error(message="Неверный код или срок действия кода истёк")
 
-@router.get("/get-all-users/")
+@router.get("/directory/")
+async def get_user_directory(
+  limit: int = Query(50, ge=1, le=200),
+  after: Optional[str] = Query(None, max_length=15, description="next_cursor предыдущей страницы"),
+  role: Optional[Roles] = None,
+  phone: Optional[str] = Query(None, max_length=20, description="Начало номера телефона"),
+  name: Optional[str] = Query(None, max_length=255, description="Начало имени"),
+  token: str = Header(None),
+  db: AsyncSession = Depends(get_db)
+):
+  if token is None:
+    return ResponseUtils.error(message="Токен не предоставлен")
+  auth = await SecurityMiddleware.is_admin(token, db)
+  if isinstance(auth, dict):
+    return auth
+
+  page = await UserService.directory(db, limit, after, role, phone, name)
+  return ResponseUtils.success(**page)
+
+@router.get("/get-all-users/", deprecated=True)
 async def get_all_users(token: str = Header(alias="token"), db: AsyncSession = Depends(get_db)):
   if token is None:
     return ResponseUtils.error(message="Токен не предоставлен")
@@ -0,0 +1,44 @@
+from typing import List
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class AvailabilityChange(BaseModel):
+  id: UUID
+  is_available: bool
+
+class VariantPriceChange(BaseModel):
+  id: UUID
+  price: float = Field(..., ge=0)
+
+class IngredientPriceChange(BaseModel):
+  id: UUID
+  price: int = Field(..., ge=0)
+
+class IngredientStopList(BaseModel):
+  ingredient_id: UUID
+  is_available: bool = Field(False, description="Доступность всех пицц, содержащих ингредиент")
+
+class CatalogBulkUpdate(BaseModel):
+  categories: List[AvailabilityChange] = []
+  products: List[AvailabilityChange] = []
+  variants: List[AvailabilityChange] = []
+  variant_prices: List[VariantPriceChange] = []
+  ingredient_prices: List[IngredientPriceChange] = []
+  pizzas_by_ingredient: List[IngredientStopList] = []
+
+  model_config = {"extra": "forbid"}
+
+  @model_validator(mode="after")
+  def check_not_empty(self) -> "CatalogBulkUpdate":
+    if not any((self.categories, self.products, self.variants, self.variant_prices,
+                self.ingredient_prices, self.pizzas_by_ingredient)):
+      raise ValueError("Нет изменений для применения")
+    return self
+
+class CatalogBulkResult(BaseModel):
+  category_ids: List[UUID] = []
+  product_ids: List[UUID] = []
+  variant_ids: List[UUID] = []
+  ingredient_ids: List[UUID] = []
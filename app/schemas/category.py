@@ -28,4 +28,15 @@ class UpdateCategory(Category):
 
 class SwapCategory(BaseModel):
   first_category: UUID
-  second_category: UUID
\ No newline at end of file
+  second_category: UUID
+
+class ReorderCategories(BaseModel):
+  store_id: UUID
+  category_ids: List[UUID] = Field(..., description="Все категории магазина в новом порядке")
+
+class CatalogCategory(BaseModel):
+  id: UUID
+  name: str
+  type: TypeCategory
+  position: int
+  products: List[ProductResponse] = []
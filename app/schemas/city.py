@@ -1,7 +1,9 @@
 from enum import IntEnum
+from typing import Optional
 from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 
 from app.schemas.product import IngredientResponse
 
@@ -79,8 +81,19 @@ class PizzaIngredient(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 class CreateCity(City):
-  pass
-
-class UpdateCity(City):
+  timezone: Optional[str] = Field(None, description="Часовой пояс IANA, например Europe/Moscow")
+
+  @field_validator("timezone")
+  @classmethod
+  def validate_timezone(cls, value: Optional[str]) -> Optional[str]:
+    if value is None:
+      return value
+    try:
+      ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+      raise ValueError("Неизвестный часовой пояс")
+    return value
+
+class UpdateCity(CreateCity):
   id: UUID = Field(..., description="Уникальный идентификатор города")
   pass
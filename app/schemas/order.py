@@ -40,6 +40,12 @@ class OrderCreate(BaseModel):
     address: Optional[OrderAddressCreate]
     items: List[OrderItemCreate]
 
+class OrderCheckout(BaseModel):
+    is_pickup: bool
+    store_id: Optional[UUID] = None
+    payment_method: PaymentMethod
+    address: Optional[OrderAddressCreate] = None
+
 class OrderAddressRead(OrderAddressCreate):
     pass
 class OrderItemIngredientRead(OrderItemIngredientCreate):
@@ -48,6 +54,26 @@ class OrderItemIngredientRead(OrderItemIngredientCreate):
 class OrderStatusUpdate(BaseModel):
     id_order: UUID
     status: OrderStatus
+    version: Optional[int] = Field(None, description="Версия заказа; если указана, статус меняется только при совпадении")
+
+class OrderStatusBulkUpdate(BaseModel):
+    orders: List[OrderStatusUpdate] = Field(..., min_length=1, max_length=500)
+
+class OrderStatusChange(BaseModel):
+    id: UUID
+    previous_status: int
+    status: int
+    version: int
+
+class OrderStatusRejection(BaseModel):
+    id: UUID
+    reason: Literal["not_found", "version_conflict", "invalid_transition"]
+    status: Optional[int] = None
+    version: Optional[int] = None
+
+class OrderStatusBulkResult(BaseModel):
+    updated: List[OrderStatusChange] = []
+    rejected: List[OrderStatusRejection] = []
 
 class OrderItemRead(BaseModel):
     product_variant_id: UUID
@@ -68,6 +94,7 @@ class OrderRead(BaseModel):
     store_id: Optional[UUID]
     payment_method: PaymentMethod
     status: int
+    version: int = 1
     created_at: datetime
     address: Optional[OrderAddressRead]
     items: List[OrderItemRead]
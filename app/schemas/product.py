@@ -42,6 +42,7 @@ class ProductResponse(BaseModel):
   position: int
   type: TypeProduct
   is_available: bool
+  dough: Optional[Dough] = None
 
   variants: List[ProductVariantResponse] = []
   ingredients: List[IngredientResponse] = []
@@ -59,6 +60,15 @@ class ProductVariantCreate(BaseModel):
     is_available: bool = True
     image: Optional[str] = None
 
+class ProductVariantUpdate(ProductVariantCreate):
+    id: Optional[UUID] = None
+
+class ProductChanges(BaseModel):
+    created_variant_ids: List[UUID] = []
+    updated_variant_ids: List[UUID] = []
+    deleted_variant_ids: List[UUID] = []
+    ingredients_changed: bool = False
+
 class ProductVariantOut(BaseModel):
     id: UUID
     size: str
@@ -110,7 +120,12 @@ class ProductCreate(ProductBase):
 
 class PizzaUpdate(PizzaCreate):
   id: UUID
+  variants: List[ProductVariantUpdate]
 
 class ProductUpdate(ProductCreate):
   id: UUID
+  variants: List[ProductVariantUpdate]
 
+class ReorderProducts(BaseModel):
+  category_id: UUID
+  product_ids: List[UUID]
@@ -1,34 +1,162 @@
-import os
-from datetime import timedelta
 import hashlib
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator, Optional
+
 import redis.asyncio as aioredis
-import httpx
+from redis.exceptions import RedisError
 
-class ConnectRedis:
-  API_URL = os.getenv("SMS_API_URL")
-  API_KEY = os.getenv("SMS_API_KEY")
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisManager:
+  """Single Redis pool shared by every Redis user of the process.
+
+  The pool is created lazily on first use and closed by the application
+  shutdown hook, so importing modules never opens connections.
+  """
 
   def __init__(self):
-    self.client = httpx.AsyncClient(headers={"Authorization": f"Bearer {self.API_KEY}"})
-    self.redis_client = aioredis.from_url("redis://127.0.0.1:6379/0", decode_responses=True)
+    self._pool: Optional[aioredis.BlockingConnectionPool] = None
+    self._client: Optional[aioredis.Redis] = None
+    self.stats: dict[str, dict[str, float]] = {}
+
+  @property
+  def client(self) -> aioredis.Redis:
+    if self._client is None:
+      self._pool = aioredis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        decode_responses=True,
+      )
+      self._client = aioredis.Redis(connection_pool=self._pool)
+    return self._client
+
+  async def close(self) -> None:
+    if self._client is not None:
+      await self._client.aclose()
+      await self._pool.disconnect()
+      self._client = None
+      self._pool = None
+
+  @staticmethod
+  def key(namespace: str, *parts: object) -> str:
+    return ":".join([settings.REDIS_KEY_PREFIX, namespace, *(str(p) for p in parts)])
+
+  def _record(self, operation: str, started: float, failed: bool) -> None:
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    counter = self.stats.setdefault(operation, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+    counter["calls"] += 1
+    counter["total_ms"] += elapsed_ms
+    counter["max_ms"] = max(counter["max_ms"], elapsed_ms)
+    if failed:
+      counter["errors"] += 1
+
+  @asynccontextmanager
+  async def timed(self, operation: str) -> AsyncIterator[aioredis.Redis]:
+    started = time.perf_counter()
+    failed = False
+    try:
+      yield self.client
+    except RedisError:
+      failed = True
+      raise
+    finally:
+      self._record(operation, started, failed)
+
+  @asynccontextmanager
+  async def pipeline(self, operation: str = "pipeline", transaction: bool = False) -> AsyncIterator[aioredis.client.Pipeline]:
+    """Buffer several commands and send them in one round trip.
+
+    With ``transaction=True`` the commands are wrapped in MULTI/EXEC.
+    The pipeline is executed when the block exits without an error;
+    results are available through ``pipe.results``.
+    """
+    started = time.perf_counter()
+    failed = False
+    async with self.client.pipeline(transaction=transaction) as pipe:
+      try:
+        yield pipe
+        pipe.results = await pipe.execute()
+      except RedisError:
+        failed = True
+        raise
+      finally:
+        self._record(operation, started, failed)
+
+  async def health(self) -> dict:
+    started = time.perf_counter()
+    try:
+      await self.client.ping()
+      ok = True
+    except RedisError as e:
+      logger.error(f"Redis health check failed: {e}")
+      ok = False
+    latency_ms = round((time.perf_counter() - started) * 1000, 3)
+    pool = {}
+    if self._pool is not None:
+      pool = {
+        "max_connections": self._pool.max_connections,
+        "in_use": len(self._pool._in_use_connections),
+        "available": len(self._pool._available_connections),
+      }
+    return {"ok": ok, "latency_ms": latency_ms, "pool": pool}
+
+  def latency_report(self) -> dict:
+    return {
+      op: {
+        "calls": int(c["calls"]),
+        "errors": int(c["errors"]),
+        "avg_ms": round(c["total_ms"] / c["calls"], 3) if c["calls"] else 0.0,
+        "max_ms": round(c["max_ms"], 3),
+      }
+      for op, c in self.stats.items()
+    }
+
+
+redis_manager = RedisManager()
+
+
+class ConnectRedis:
+  OTP_NAMESPACE = "otp"
+
+  def __init__(self, manager: RedisManager = redis_manager):
+    self.manager = manager
+
+  @staticmethod
+  def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
 
   async def set_data_with_expiry(self, key: str, value: str, expiry_minutes: int) -> bool:
-    hashed_value = hashlib.sha256(value.encode()).hexdigest()
-    delta = timedelta(minutes=expiry_minutes)
-    success = await self.redis_client.setex(key, delta, hashed_value)
+    async with self.manager.timed("setex") as client:
+      success = await client.setex(key, timedelta(minutes=expiry_minutes), self._hash(value))
     return bool(success)
 
   async def delete_data(self, key: str) -> bool:
-    deleted_count = await self.redis_client.delete(key)
+    async with self.manager.timed("delete") as client:
+      deleted_count = await client.delete(key)
     return bool(deleted_count)
 
+  async def get_value_by_key(self, key: str) -> str:
+    async with self.manager.timed("get") as client:
+      return await client.get(key)
+
+  async def store_sms_code(self, phone_number: str, code: str, expiry_minutes: int) -> bool:
+    return await self.set_data_with_expiry(self.manager.key(self.OTP_NAMESPACE, phone_number), code, expiry_minutes)
+
   async def verify_sms_code(self, phone_number: str, code: str) -> bool:
-    stored_code = await self.redis_client.get(phone_number)
-    hashed_input = hashlib.sha256(code.encode()).hexdigest()
+    stored_code = await self.get_value_by_key(self.manager.key(self.OTP_NAMESPACE, phone_number))
     if stored_code:
-      return stored_code == hashed_input
+      return stored_code == self._hash(code)
     return False
 
-  async def get_value_by_key(self, key: str) -> str:
-    value = await self.redis_client.get(key)
-    return value
\ No newline at end of file
+  async def delete_sms_code(self, phone_number: str) -> bool:
+    return await self.delete_data(self.manager.key(self.OTP_NAMESPACE, phone_number))
@@ -3,11 +3,12 @@ from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload, with_polymorphic
+from sqlalchemy.orm import selectinload
 
 from app.db.models import CartItem as CartItemModel, PizzaCartItem as PizzaCartItemModel, CartItemIngredient,\
   PizzaCartItem, CartItem, ProductVariant, Ingredient
 from app.db.models import User
+from app.db import statements
 
 from app.schemas.cart_item import (
   CartItemCreate,
@@ -24,18 +25,7 @@ class CartItemService:
       db: AsyncSession,
       user: User
   ) -> list[Union[SimpleCartItemOut, PizzaCartItemOut]]:
-    pizza_union = with_polymorphic(CartItem, [PizzaCartItem])
-    stmt = (
-      select(pizza_union)
-      .where(pizza_union.user_id == user.id)
-      .options(
-        selectinload(pizza_union.product_variant)
-        .selectinload(ProductVariant.product),
-        selectinload(pizza_union.PizzaCartItem.custom_ingredients)
-        .selectinload(CartItemIngredient.ingredient)
-      )
-    )
-    items = (await db.execute(stmt)).scalars().all()
+    items = (await db.execute(statements.user_cart(user.id))).scalars().all()
 
     result: list[Union[SimpleCartItemOut, PizzaCartItemOut]] = []
     for item in items:
@@ -102,7 +92,6 @@ class CartItemService:
 
         existing_simple.quantity = new_qty
         await db.commit()
-        await db.refresh(existing_simple)
         return existing_simple
 
       return await CartItemService.add_simple_item(simple, db, user)
@@ -134,7 +123,6 @@ class CartItemService:
 
         existing_pizza.quantity = new_qty
         await db.commit()
-        await db.refresh(existing_pizza)
         return existing_pizza
 
       return await CartItemService.add_pizza_item(pizza_data, db, user)
@@ -154,7 +142,6 @@ class CartItemService:
     )
     db.add(item)
     await db.commit()
-    await db.refresh(item)
     return item
 
   @staticmethod
@@ -213,7 +200,6 @@ class CartItemService:
 
     pizza.price = total_price
     await db.commit()
-    await db.refresh(pizza)
     return pizza
 
   @staticmethod
@@ -0,0 +1,116 @@
+import asyncio
+import inspect
+import logging
+from typing import Awaitable, Callable, Iterable, List, Optional, Set, Union
+from uuid import UUID
+
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.db.replicas import replica_router
+from app.services.cache_service import redis_manager
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogChange(BaseModel):
+  reason: str
+  store_ids: Optional[List[UUID]] = None
+  category_ids: List[UUID] = []
+  product_ids: List[UUID] = []
+  variant_ids: List[UUID] = []
+  ingredient_ids: List[UUID] = []
+
+  @property
+  def is_global(self) -> bool:
+    return self.store_ids is None
+
+
+Listener = Callable[[CatalogChange], Union[Awaitable[None], None]]
+
+
+class CatalogEvents:
+  """One event per catalog write, used for cache invalidation.
+
+  ``emit`` bumps the shared catalog version counters in Redis (a global one
+  and one per affected store) and publishes the change on ``CHANNEL`` so
+  other workers can react. Local listeners run in the emitting worker only.
+  ``store_ids=None`` means the change affects every store; such changes also
+  bump the epoch, which store-scoped caches combine with the store version.
+  With read replicas the counters are bumped once more after
+  ``REPLICA_MAX_LAG_SECONDS``, so a response built from a replica that had
+  not replayed the write yet does not stay cached under the new version.
+  """
+
+  CHANNEL = "catalog:changes"
+  _listeners: List[Listener] = []
+  _pending: Set[asyncio.Task] = set()
+
+  @staticmethod
+  def subscribe(listener: Listener) -> Listener:
+    CatalogEvents._listeners.append(listener)
+    return listener
+
+  @staticmethod
+  def version_key(store_id: Optional[UUID] = None) -> str:
+    if store_id is None:
+      return redis_manager.key("catalog", "version")
+    return redis_manager.key("catalog", "version", store_id)
+
+  @staticmethod
+  def epoch_key() -> str:
+    return redis_manager.key("catalog", "epoch")
+
+  @staticmethod
+  async def get_version(store_id: Optional[UUID] = None) -> int:
+    async with redis_manager.timed("catalog_version") as client:
+      value = await client.get(CatalogEvents.version_key(store_id))
+    return int(value or 0)
+
+  @staticmethod
+  def _bump(pipe, change: CatalogChange) -> None:
+    pipe.incr(CatalogEvents.version_key())
+    if change.is_global:
+      pipe.incr(CatalogEvents.epoch_key())
+    for store_id in change.store_ids or []:
+      pipe.incr(CatalogEvents.version_key(store_id))
+
+  @staticmethod
+  async def _bump_after_replicas(change: CatalogChange) -> None:
+    await asyncio.sleep(settings.REPLICA_MAX_LAG_SECONDS)
+    try:
+      async with redis_manager.pipeline("catalog_replica_bump", transaction=True) as pipe:
+        CatalogEvents._bump(pipe, change)
+    except RedisError as e:
+      logger.error(f"Failed to bump catalog versions after replica lag: {e}")
+
+  @staticmethod
+  async def emit(change: CatalogChange) -> None:
+    try:
+      async with redis_manager.pipeline("catalog_emit", transaction=True) as pipe:
+        CatalogEvents._bump(pipe, change)
+        pipe.publish(redis_manager.key(CatalogEvents.CHANNEL), change.model_dump_json())
+    except RedisError as e:
+      logger.error(f"Failed to publish catalog change: {e}")
+    if replica_router.enabled:
+      task = asyncio.ensure_future(CatalogEvents._bump_after_replicas(change))
+      CatalogEvents._pending.add(task)
+      task.add_done_callback(CatalogEvents._pending.discard)
+
+    for listener in CatalogEvents._listeners:
+      try:
+        result = listener(change)
+        if inspect.isawaitable(result):
+          await result
+      except Exception as e:
+        logger.exception(f"Catalog listener failed: {e}")
+
+  @staticmethod
+  async def purge(reason: str, store_ids: Optional[Iterable[UUID]] = None, **ids: List[UUID]) -> None:
+    """Shortcut for write paths: emit a change after the transaction commits."""
+    await CatalogEvents.emit(CatalogChange(
+      reason=reason,
+      store_ids=None if store_ids is None else list(set(store_ids)),
+      **ids,
+    ))
@@ -0,0 +1,113 @@
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.bulk import update_from_values
+from app.db.models import Category, Product, ProductVariant, Ingredient
+from app.db.models.products import PizzaIngredient
+from app.schemas.catalog import CatalogBulkUpdate, CatalogBulkResult
+from app.services.catalog_events import CatalogEvents, CatalogChange
+
+
+class CatalogService:
+  @staticmethod
+  def _rows(changes: Iterable, field: str) -> list[dict]:
+    # last change wins when the same id is sent twice
+    return list({change.id: {"id": change.id, field: getattr(change, field)} for change in changes}.values())
+
+  @staticmethod
+  async def apply_bulk(db: AsyncSession, data: CatalogBulkUpdate) -> CatalogBulkResult:
+    """Apply a batch of stop-list and price changes in one transaction.
+
+    Each kind of change is one set-based UPDATE; the touched rows are
+    returned with their parent ids so a single catalog event can name the
+    affected stores.
+    """
+    result = CatalogBulkResult()
+    category_ids: set[UUID] = set()
+    product_ids: set[UUID] = set()
+    touches_all_stores = False
+
+    if data.categories:
+      table = Category.__table__
+      rows = await db.execute(
+        update_from_values(table, "id", CatalogService._rows(data.categories, "is_available"))
+        .returning(table.c.id)
+      )
+      result.category_ids = list(rows.scalars().all())
+      category_ids.update(result.category_ids)
+
+    if data.products or data.pizzas_by_ingredient:
+      table = Product.__table__
+      changed = {}
+      if data.products:
+        rows = await db.execute(
+          update_from_values(table, "id", CatalogService._rows(data.products, "is_available"))
+          .returning(table.c.id, table.c.category_id)
+        )
+        changed.update({row.id: row.category_id for row in rows})
+
+      for flag in (False, True):
+        ingredient_ids = [s.ingredient_id for s in data.pizzas_by_ingredient if s.is_available is flag]
+        if not ingredient_ids:
+          continue
+        pizzas = (
+          select(PizzaIngredient.pizza_id)
+          .where(PizzaIngredient.ingredient_id.in_(ingredient_ids), PizzaIngredient.is_deleted.is_(False))
+        )
+        rows = await db.execute(
+          update(table).where(table.c.id.in_(pizzas)).values(is_available=flag)
+          .returning(table.c.id, table.c.category_id)
+        )
+        changed.update({row.id: row.category_id for row in rows})
+
+      result.product_ids = list(changed)
+      category_ids.update(changed.values())
+
+    variant_rows = []
+    if data.variants:
+      variant_rows.append(("is_available", data.variants))
+    if data.variant_prices:
+      variant_rows.append(("price", data.variant_prices))
+    variant_ids = {}
+    for field, changes in variant_rows:
+      table = ProductVariant.__table__
+      rows = await db.execute(
+        update_from_values(table, "id", CatalogService._rows(changes, field))
+        .returning(table.c.id, table.c.product_id)
+      )
+      variant_ids.update({row.id: row.product_id for row in rows})
+    result.variant_ids = list(variant_ids)
+    product_ids.update(variant_ids.values())
+
+    if data.ingredient_prices:
+      table = Ingredient.__table__
+      rows = await db.execute(
+        update_from_values(table, "id", CatalogService._rows(data.ingredient_prices, "price"))
+        .returning(table.c.id)
+      )
+      result.ingredient_ids = list(rows.scalars().all())
+      touches_all_stores = bool(result.ingredient_ids)
+
+    store_ids = None
+    if not touches_all_stores:
+      parent_products = select(Product.category_id).where(Product.id.in_(product_ids))
+      stores = await db.execute(
+        select(Category.store_id).distinct()
+        .where(Category.id.in_(category_ids) | Category.id.in_(parent_products))
+      )
+      store_ids = [store_id for store_id in stores.scalars().all() if store_id is not None]
+
+    await db.commit()
+
+    await CatalogEvents.emit(CatalogChange(
+      reason="bulk_update",
+      store_ids=store_ids,
+      category_ids=result.category_ids,
+      product_ids=result.product_ids,
+      variant_ids=result.variant_ids,
+      ingredient_ids=result.ingredient_ids,
+    ))
+    return result
@@ -2,11 +2,14 @@ from typing import List
 import logging
 from fastapi import HTTPException
 from sqlalchemy.exc import NoResultFound, IntegrityError
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from app.db.bulk import update_from_values
 from app.db.models.categories import Category as CategoryModel
 from app.schemas.category import Category, UpdateCategory
+from app.services.catalog_events import CatalogEvents
+from app.services.position_service import PositionService
 from app.services.response_utils import ResponseUtils
 
 
@@ -14,25 +17,26 @@ class CategoryService:
   @staticmethod
   async def swap_categories_by_ids(db: AsyncSession, first_id: UUID, second_id: UUID) -> None:
     result = await db.execute(
-      select(CategoryModel).filter(CategoryModel.id.in_([first_id, second_id]))
+      select(CategoryModel.id, CategoryModel.store_id, CategoryModel.position)
+      .filter(CategoryModel.id.in_([first_id, second_id]))
     )
-    categories = result.scalars().all()
+    categories = result.all()
 
-    if len(categories) != 2:
+    if len(categories) != 2 or categories[0].store_id != categories[1].store_id:
       raise ValueError("Не удалось найти обе категории для обмена")
 
     category_1, category_2 = categories
-
-    pos1 = category_1.position
-    pos2 = category_2.position
-
-    category_1.position = -100
-    await db.flush()
-    category_2.position = pos1
-    await db.flush()
-
-    category_1.position = pos2
+    await db.execute(update_from_values(CategoryModel.__table__, "id", [
+      {"id": category_1.id, "position": category_2.position},
+      {"id": category_2.id, "position": category_1.position},
+    ]))
     await db.commit()
+    await CatalogEvents.purge("categories_swapped", [category_1.store_id], category_ids=[first_id, second_id])
+
+  @staticmethod
+  async def reorder_categories(db: AsyncSession, store_id: UUID, category_ids: List[UUID]) -> None:
+    await PositionService.reorder_categories(db, store_id, category_ids)
+    await CatalogEvents.purge("categories_reordered", [store_id], category_ids=category_ids)
 
   @staticmethod
   async def get_category_by_id(db: AsyncSession, category_id: UUID) -> CategoryModel:
@@ -59,44 +63,45 @@ class CategoryService:
 
   @staticmethod
   async def create_category(db: AsyncSession, category_data: Category) -> CategoryModel:
-    max_position_query = select(func.max(CategoryModel.position)).where(
-      CategoryModel.store_id == category_data.store_id
-    )
-    result = await db.execute(max_position_query)
-    max_position = result.scalar() or 0
+    position = await PositionService.next_category_position(db, category_data.store_id)
 
     new_category = CategoryModel(
       name = category_data.name,
       store_id = category_data.store_id,
       is_available = category_data.is_available,
       type = category_data.type,
-      position = max_position + 1,
+      position = position,
     )
     db.add(new_category)
     try:
       await db.commit()
-      await db.refresh(new_category)
     except IntegrityError:
       await db.rollback()
       raise ResponseUtils.error("Категория с такой позицией уже существует — попробуйте ещё раз")
 
+    await CatalogEvents.purge("category_created", [new_category.store_id], category_ids=[new_category.id])
     return new_category
 
   @staticmethod
   async def update_category(db: AsyncSession, category_data: UpdateCategory) -> CategoryModel:
     category = await CategoryService.get_category_by_id(db, category_data.id)
+    previous_store_id = category.store_id
 
+    if category.store_id != category_data.store_id:
+      category.position = await PositionService.next_category_position(db, category_data.store_id)
     category.name = category_data.name
     category.store_id = category_data.store_id
     category.is_available = category_data.is_available
     category.type = category_data.type
 
     await db.commit()
-    await db.refresh(category)
+    await CatalogEvents.purge("category_updated", [previous_store_id, category.store_id], category_ids=[category.id])
     return category
 
   @staticmethod
   async def delete_category(db: AsyncSession, category_id: UUID) -> None:
     category = await CategoryService.get_category_by_id(db, category_id)
+    store_id = category.store_id
     await db.delete(category)
-    await db.commit()
\ No newline at end of file
+    await db.commit()
+    await CatalogEvents.purge("category_deleted", [store_id], category_ids=[category_id])
\ No newline at end of file
@@ -1,39 +1,70 @@
-from typing import List, cast
+from typing import List
 from uuid import UUID
 
-from geoalchemy2.shape import from_shape
-from shapely.geometry import Point
-from sqlalchemy import select
+from sqlalchemy import select, func
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from shapely.wkb import loads as load_wkb
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
 from app.db.models.cities import City as CityModel, City
 from app.schemas.city import CreateCity, UpdateCity
+from app.services.catalog_events import CatalogEvents
+from app.services.http_client import http_manager
+from app.services.job_service import GEOCODE_CITY, JobService
 from app.services.response_utils import ResponseUtils
-import httpx
+from app.services.schedule_service import ScheduleService
 
 db: AsyncSession
 class CityService:
   @staticmethod
   async def get_city_coordinates(city_name: str) -> dict:
-    async with httpx.AsyncClient() as client:
-      response = await client.get(f"https://nominatim.openstreetmap.org/search", params={
-        "q": city_name,
-        "format": "json",
-        "addressdetails": 1,
-        "limit": 1,
-      })
+    response = await http_manager.client.get(f"https://nominatim.openstreetmap.org/search", params={
+      "q": city_name,
+      "format": "json",
+      "addressdetails": 1,
+      "limit": 1,
+    })
+
+    if response.status_code != 200:
+      raise Exception(f"Ошибка при получении координат для города {city_name}")
 
-      if response.status_code != 200:
-        raise Exception(f"Ошибка при получении координат для города {city_name}")
+    data = response.json()
+    if not data:
+      raise Exception(f"Город {city_name} не найден")
 
-      data = response.json()
-      if not data:
-        raise Exception(f"Город {city_name} не найден")
+    lat = float(data[0]["lat"])
+    lon = float(data[0]["lon"])
+    return {"lat": lat, "lon": lon}
 
-      lat = float(data[0]["lat"])
-      lon = float(data[0]["lon"])
-      return {"lat": lat, "lon": lon}
+  @staticmethod
+  def _response_query():
+    # coordinates come from PostGIS so no WKB is parsed in Python
+    return select(
+      CityModel.id, CityModel.name, CityModel.timezone,
+      func.ST_X(CityModel.point).label("x"), func.ST_Y(CityModel.point).label("y"),
+    )
+
+  @staticmethod
+  def _to_response(row) -> dict:
+    return {
+      "id": row.id,
+      "name": row.name,
+      "point": None if row.x is None else [row.x, row.y],
+      "timezone": row.timezone,
+    }
+
+  @staticmethod
+  async def list_city_responses(db: AsyncSession) -> List[dict]:
+    result = await db.execute(CityService._response_query())
+    return [CityService._to_response(row) for row in result.all()]
+
+  @staticmethod
+  async def get_city_response(db: AsyncSession, city_id: UUID) -> dict:
+    result = await db.execute(CityService._response_query().where(CityModel.id == city_id))
+    row = result.one_or_none()
+    if row is None:
+      raise NoResultFound(f"City with ID {city_id} not found")
+    return CityService._to_response(row)
 
   @staticmethod
   async def get_city_by_id(db: AsyncSession, city_id: UUID) -> CityModel:
@@ -65,27 +96,28 @@ class CityService:
     new_city = CityModel(
       name=city_data.name,
     )
+    if city_data.timezone:
+      new_city.timezone = city_data.timezone
     new_city.point = from_shape(point)
 
     db.add(new_city)
     await db.commit()
-    await db.refresh(new_city)
+    await CatalogEvents.purge("city_created")
 
     return new_city
 
   @staticmethod
   async def update_city(db: AsyncSession, city_data: UpdateCity) -> City:
     city = await CityService.get_city_by_id(db, city_data.id)
-    point = None
-    if city.point:
-      x, y = city.point
-      point = Point(x, y)
-    if not city:
-      raise ResponseUtils.error(message="Category with ID {category_data.id} not found")
+    if city.name != city_data.name:
+      # coordinates follow the new name, fetched in the background
+      JobService.enqueue(db, GEOCODE_CITY, {"city_id": str(city.id)})
     city.name = city_data.name
-    city.point = from_shape(point)
+    if city_data.timezone:
+      city.timezone = city_data.timezone
     await db.commit()
-    await db.refresh(city)
+    ScheduleService.invalidate(city.id)
+    await CatalogEvents.purge("city_updated")
     return city
 
   @staticmethod
@@ -95,10 +127,5 @@ class CityService:
       raise ResponseUtils.error(message="Category with ID {city_id} not found")
     await db.delete(city)
     await db.commit()
-
-  @staticmethod
-  async def convert_geometry(city_model):
-    if city_model.point:
-      point_geom = cast(Point, load_wkb(bytes(city_model.point.data)))
-      city_model.point = [point_geom.x, point_geom.y]
-    return city_model
\ No newline at end of file
+    ScheduleService.invalidate(city_id)
+    await CatalogEvents.purge("city_deleted")
\ No newline at end of file
@@ -0,0 +1,36 @@
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+  import httpx
+
+
+class HttpClientManager:
+  """Outgoing HTTP client shared by the whole process.
+
+  httpx is imported and the client created on first use, so workers that
+  never call external APIs do not pay for it; the lifespan shutdown closes it.
+  """
+
+  def __init__(self):
+    self._client: Optional["httpx.AsyncClient"] = None
+
+  @property
+  def client(self) -> "httpx.AsyncClient":
+    if self._client is None:
+      import httpx
+
+      self._client = httpx.AsyncClient(
+        timeout=settings.HTTP_CLIENT_TIMEOUT,
+        limits=httpx.Limits(max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS),
+      )
+    return self._client
+
+  async def close(self) -> None:
+    if self._client is not None:
+      await self._client.aclose()
+      self._client = None
+
+
+http_manager = HttpClientManager()
@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.services.cache_service import redis_manager
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+DONE = "done"
+
+
+class IdempotencyService:
+  """Replays the stored response of a request repeated with the same ``Idempotency-Key``.
+
+  Keys are scoped by endpoint and owner (the authenticated user), so two
+  users can never see each other's responses. The first request claims the
+  key with ``SET NX`` and runs; duplicates arriving meanwhile poll until the
+  response is stored. Only successful responses are kept; on an error or an
+  exception the claim is released so the client can retry. If Redis is
+  unavailable requests run without protection.
+  """
+
+  @staticmethod
+  def _key(scope: str, owner: Any, idempotency_key: str) -> str:
+    digest = hashlib.sha256(idempotency_key.encode()).hexdigest()
+    return redis_manager.key("idem", scope, owner, digest)
+
+  @staticmethod
+  def fingerprint(payload: Any) -> str:
+    encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+  @staticmethod
+  async def _wait(key: str, fingerprint: str) -> dict:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+    delay = 0.05
+    while loop.time() < deadline:
+      async with redis_manager.timed("idempotency_wait") as client:
+        raw = await client.get(key)
+      if raw is None:
+        # the first request failed and released the key
+        raise HTTPException(status_code=409, detail="The original request failed, retry with a new attempt")
+      entry = json.loads(raw)
+      if entry["fingerprint"] != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+      if entry["state"] == DONE:
+        return entry["response"]
+      await asyncio.sleep(delay)
+      delay = min(delay * 2, 0.5)
+    raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+
+  @staticmethod
+  async def run(
+      idempotency_key: Optional[str],
+      scope: str,
+      owner: Any,
+      handler: Callable[[], Awaitable[dict]],
+      payload: Any = None,
+  ) -> dict:
+    if not idempotency_key:
+      return await handler()
+
+    key = IdempotencyService._key(scope, owner, idempotency_key)
+    fingerprint = IdempotencyService.fingerprint(payload)
+    marker = json.dumps({"state": PENDING, "fingerprint": fingerprint})
+    try:
+      async with redis_manager.timed("idempotency_claim") as client:
+        claimed = await client.set(key, marker, nx=True, ex=settings.IDEMPOTENCY_LOCK_TTL)
+      if not claimed:
+        return await IdempotencyService._wait(key, fingerprint)
+    except RedisError as e:
+      logger.error(f"Idempotency store unavailable, running {scope} unprotected: {e}")
+      return await handler()
+
+    try:
+      response = await handler()
+    except BaseException:
+      await IdempotencyService._release(key)
+      raise
+
+    if not (isinstance(response, dict) and response.get("result") is True):
+      await IdempotencyService._release(key)
+      return response
+
+    encoded = jsonable_encoder(response)
+    try:
+      async with redis_manager.timed("idempotency_store") as client:
+        await client.set(
+          key,
+          json.dumps({"state": DONE, "fingerprint": fingerprint, "response": encoded}),
+          ex=settings.IDEMPOTENCY_TTL,
+        )
+    except RedisError as e:
+      logger.error(f"Failed to store idempotent response for {scope}: {e}")
+    return encoded
+
+  @staticmethod
+  async def _release(key: str) -> None:
+    try:
+      async with redis_manager.timed("idempotency_release") as client:
+        await client.delete(key)
+    except RedisError as e:
+      logger.error(f"Failed to release idempotency key: {e}")
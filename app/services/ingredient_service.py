@@ -1,4 +1,6 @@
 from app.db.models.ingredients import Ingredient
+from app.db.returning import update_returning
+from app.services.catalog_events import CatalogEvents
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from uuid import UUID
@@ -23,19 +25,15 @@ class IngredientService:
     db.add(ingredient)
 
     await db.commit()
-    await db.refresh(ingredient)
+    await CatalogEvents.purge("ingredient_created", ingredient_ids=[ingredient.id])
 
     return ingredient
 
   @staticmethod
   async def update(ingredient_id: UUID, update_data, db: AsyncSession):
-    result = await db.execute(select(Ingredient).where(Ingredient.id == ingredient_id))
-    ingredient = result.scalar_one_or_none()
-    for field, value in update_data.items():
-      setattr(ingredient, field, value)
-
+    ingredient = await update_returning(db, Ingredient, Ingredient.id == ingredient_id, **update_data)
     await db.commit()
-    await db.refresh(ingredient)
+    await CatalogEvents.purge("ingredient_updated", ingredient_ids=[ingredient_id])
 
     return ingredient
 
@@ -48,5 +46,6 @@ class IngredientService:
 
     await db.delete(ingredient)
     await db.commit()
+    await CatalogEvents.purge("ingredient_deleted", ingredient_ids=[ingredient_id])
 
     return ingredient
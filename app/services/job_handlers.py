@@ -0,0 +1,50 @@
+"""Handlers of the background job kinds, registered on import by the worker."""
+import asyncio
+import logging
+import os
+from typing import List
+from uuid import UUID
+
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+
+from app.services.catalog_events import CatalogEvents
+from app.services.city_service import CityService
+from app.services.job_service import GEOCODE_CITY, REMOVE_MEDIA, JobService
+
+logger = logging.getLogger(__name__)
+
+MEDIA_ROOT = "media"
+
+
+def _remove_files(paths: List[str]) -> None:
+  root = os.path.abspath(MEDIA_ROOT)
+  for path in paths:
+    local = os.path.abspath(path.lstrip("/"))
+    # payloads come from the database; never delete outside the media folder
+    if os.path.commonpath([root, local]) != root:
+      logger.warning(f"Refusing to remove {path}: outside of {MEDIA_ROOT}")
+      continue
+    if os.path.exists(local):
+      os.remove(local)
+
+
+@JobService.handler(REMOVE_MEDIA)
+async def remove_media(db: AsyncSession, payload: dict) -> None:
+  await asyncio.to_thread(_remove_files, payload["paths"])
+
+
+@JobService.handler(GEOCODE_CITY)
+async def geocode_city(db: AsyncSession, payload: dict) -> None:
+  try:
+    city = await CityService.get_city_by_id(db, UUID(payload["city_id"]))
+  except NoResultFound:
+    return  # deleted since the job was queued
+  # network errors raise and the job is retried with backoff
+  coordinates = await CityService.get_city_coordinates(city.name)
+  city.point = from_shape(Point(coordinates["lon"], coordinates["lat"]))
+  await db.commit()
+  await CatalogEvents.purge("city_geocoded")
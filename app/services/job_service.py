@@ -0,0 +1,204 @@
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, case, delete, func, literal_column, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[AsyncSession, dict], Awaitable[None]]
+
+# job kinds; handlers live in app.services.job_handlers
+REMOVE_MEDIA = "media.remove"
+GEOCODE_CITY = "city.geocode"
+
+
+def _queued():
+  # inlined rather than bound, so generic plans still match the partial index ix_jobs_queued_run_at
+  return Job.status == literal_column(f"'{JobStatus.QUEUED.value}'")
+
+
+@dataclass
+class ClaimedJob:
+  id: UUID
+  kind: str
+  payload: dict
+  attempts: int
+  max_attempts: int
+  locked_by: str
+
+
+class JobService:
+  """Durable background jobs stored in the ``jobs`` table.
+
+  ``enqueue`` only adds the row to the caller's session, so a job is queued
+  exactly when the caller's transaction commits: a product delete that rolls
+  back does not remove its images. Workers ``claim`` due jobs with
+  ``FOR UPDATE SKIP LOCKED``, so any number of them can poll the same table
+  without handing one job to two workers. Failed jobs are retried with
+  exponential backoff until ``max_attempts``.
+  """
+
+  _handlers: Dict[str, Handler] = {}
+
+  @staticmethod
+  def handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register the coroutine that runs jobs of ``kind``; it gets its own session and the payload."""
+    def register(fn: Handler) -> Handler:
+      JobService._handlers[kind] = fn
+      return fn
+    return register
+
+  @staticmethod
+  def get_handler(kind: str) -> Optional[Handler]:
+    return JobService._handlers.get(kind)
+
+  @staticmethod
+  def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: Optional[dict] = None,
+    delay: Optional[timedelta] = None,
+    run_at: Optional[datetime] = None,
+    max_attempts: Optional[int] = None,
+  ) -> Job:
+    """Queue a job in ``db``'s transaction; it runs after the caller commits."""
+    job = Job(
+      kind=kind,
+      payload=payload or {},
+      max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+    if delay is not None:
+      run_at = datetime.now(timezone.utc) + delay
+    if run_at is not None:
+      job.run_at = run_at
+    db.add(job)
+    return job
+
+  @staticmethod
+  async def claim(db: AsyncSession, worker: str, limit: int = 1) -> List[ClaimedJob]:
+    due = (
+      select(Job.id)
+      .where(_queued(), Job.run_at <= func.now())
+      .order_by(Job.run_at)
+      .limit(limit)
+      .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+      update(Job)
+      .where(Job.id.in_(due.scalar_subquery()))
+      .values(status=JobStatus.RUNNING.value, attempts=Job.attempts + 1, locked_at=func.now(), locked_by=worker)
+      .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts, Job.locked_by)
+    )
+    jobs = [ClaimedJob(*row) for row in result.all()]
+    await db.commit()
+    return jobs
+
+  @staticmethod
+  def backoff(attempts: int) -> float:
+    """Seconds before the next try: doubling from ``JOB_RETRY_BASE_DELAY``, capped, with jitter."""
+    delay = min(settings.JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_DELAY)
+    return delay * random.uniform(0.5, 1.0)
+
+  @staticmethod
+  def _owned(job: ClaimedJob):
+    # a job requeued as stale and claimed again belongs to its new worker; leave it alone
+    return and_(Job.id == job.id, Job.status == JobStatus.RUNNING.value, Job.locked_by == job.locked_by)
+
+  @staticmethod
+  async def _finish(db: AsyncSession, job: ClaimedJob, **values) -> None:
+    result = await db.execute(update(Job).where(JobService._owned(job)).values(**values))
+    await db.commit()
+    if not result.rowcount:
+      logger.warning(f"Job {job.kind} {job.id} is no longer held by {job.locked_by}, result dropped")
+
+  @staticmethod
+  async def complete(db: AsyncSession, job: ClaimedJob) -> None:
+    await JobService._finish(db, job, status=JobStatus.DONE.value, finished_at=func.now(), last_error=None)
+
+  @staticmethod
+  async def fail(db: AsyncSession, job: ClaimedJob, error: str) -> None:
+    if job.attempts < job.max_attempts:
+      delay = JobService.backoff(job.attempts)
+      values = {"status": JobStatus.QUEUED.value, "run_at": func.now() + timedelta(seconds=delay)}
+      logger.warning(f"Job {job.kind} {job.id} failed (attempt {job.attempts}), retrying in {delay:.0f}s: {error}")
+    else:
+      values = {"status": JobStatus.FAILED.value, "finished_at": func.now()}
+      logger.error(f"Job {job.kind} {job.id} failed after {job.attempts} attempts: {error}")
+    await JobService._finish(db, job, last_error=error[:2000], **values)
+
+  @staticmethod
+  async def requeue_stale(db: AsyncSession) -> int:
+    """Put back jobs whose worker died mid-run; the attempt still counts.
+
+    A live worker gives up on a handler after ``JOB_TIMEOUT``; the extra
+    ``JOB_STALE_MARGIN`` leaves it time to record the outcome first.
+    """
+    stale_after = timedelta(seconds=settings.JOB_TIMEOUT + settings.JOB_STALE_MARGIN)
+    result = await db.execute(
+      update(Job)
+      .where(
+        Job.status == JobStatus.RUNNING.value,
+        Job.locked_at < func.now() - stale_after,
+      )
+      .values(
+        status=case((Job.attempts < Job.max_attempts, JobStatus.QUEUED.value), else_=JobStatus.FAILED.value),
+        run_at=func.now(),
+        last_error="worker lost",
+      )
+    )
+    await db.commit()
+    return result.rowcount
+
+  @staticmethod
+  async def prune(db: AsyncSession) -> int:
+    """Drop finished jobs older than ``JOB_RETENTION_DAYS``; failed ones are kept for inspection."""
+    result = await db.execute(
+      delete(Job).where(
+        Job.status == JobStatus.DONE.value,
+        Job.finished_at < func.now() - timedelta(days=settings.JOB_RETENTION_DAYS),
+      )
+    )
+    await db.commit()
+    return result.rowcount
+
+  @staticmethod
+  async def stats(db: AsyncSession) -> dict:
+    """Queue depth per kind and status, plus wait and run times of the last hour."""
+    depth = (await db.execute(
+      select(Job.kind, Job.status, func.count())
+      .where(Job.status != JobStatus.DONE.value)
+      .group_by(Job.kind, Job.status)
+    )).all()
+    queue: Dict[str, Dict[str, int]] = {}
+    for kind, status, count in depth:
+      queue.setdefault(kind, {})[status] = count
+
+    oldest_due = (await db.execute(
+      select(func.extract("epoch", func.now() - func.min(Job.run_at)))
+      .where(_queued(), Job.run_at <= func.now())
+    )).scalar_one()
+    recent = (await db.execute(
+      select(
+        func.count(),
+        func.avg(func.extract("epoch", Job.locked_at - Job.run_at)),
+        func.avg(func.extract("epoch", Job.finished_at - Job.locked_at)),
+      )
+      .where(and_(Job.status == JobStatus.DONE.value, Job.finished_at >= func.now() - timedelta(hours=1)))
+    )).one()
+    return {
+      "queue": queue,
+      "oldest_due_seconds": None if oldest_due is None else float(oldest_due),
+      "last_hour": {
+        "done": recent[0],
+        "avg_wait_seconds": None if recent[1] is None else float(recent[1]),
+        "avg_run_seconds": None if recent[2] is None else float(recent[2]),
+      },
+    }
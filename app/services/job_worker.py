@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from typing import List, Optional
+
+from app.core.config import settings
+from app.db import async_session
+from app.services import job_handlers  # noqa: F401  registers the handlers
+from app.services.job_service import ClaimedJob, JobService
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+  """Pool of asyncio tasks that run jobs from the ``jobs`` table.
+
+  Each slot claims one due job at a time in its own short transaction and
+  runs the handler with a fresh session, so a slow job never holds a row
+  lock. Idle slots poll every ``JOB_POLL_INTERVAL`` seconds (with jitter, so
+  workers of several processes do not poll in step). One of them also
+  requeues jobs of dead workers and prunes old finished jobs every
+  ``JOB_MAINTENANCE_INTERVAL``. It runs inside the API process or on its
+  own via ``python -m app.commands.run_jobs``.
+  """
+
+  def __init__(self, concurrency: int, name: Optional[str] = None):
+    self.concurrency = max(1, concurrency)
+    self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+    self._tasks: List[asyncio.Task] = []
+    self._stopping = asyncio.Event()
+    self._maintained_at = 0.0
+
+  @property
+  def running(self) -> bool:
+    return bool(self._tasks)
+
+  def start(self) -> None:
+    if self.running:
+      return
+    self._stopping.clear()
+    self._tasks = [asyncio.ensure_future(self._slot(slot)) for slot in range(self.concurrency)]
+    logger.info(f"Job worker {self.name} started with {self.concurrency} slots")
+
+  async def stop(self, timeout: float = 10.0) -> None:
+    """Let running jobs finish for up to ``timeout`` seconds, then cancel them."""
+    if not self.running:
+      return
+    self._stopping.set()
+    done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+    for task in pending:
+      task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    self._tasks = []
+    logger.info(f"Job worker {self.name} stopped")
+
+  async def _idle(self) -> None:
+    interval = settings.JOB_POLL_INTERVAL * random.uniform(0.8, 1.2)
+    try:
+      await asyncio.wait_for(self._stopping.wait(), interval)
+    except asyncio.TimeoutError:
+      pass
+
+  async def _maintain(self) -> None:
+    if time.monotonic() - self._maintained_at < settings.JOB_MAINTENANCE_INTERVAL:
+      return
+    self._maintained_at = time.monotonic()
+    async with async_session() as session:
+      requeued = await JobService.requeue_stale(session)
+      pruned = await JobService.prune(session)
+    if requeued or pruned:
+      logger.info(f"Requeued {requeued} stale jobs, pruned {pruned} finished jobs")
+
+  async def _slot(self, slot: int) -> None:
+    while not self._stopping.is_set():
+      try:
+        if slot == 0:
+          await self._maintain()
+        async with async_session() as session:
+          jobs = await JobService.claim(session, self.name)
+        if not jobs:
+          await self._idle()
+          continue
+        for job in jobs:
+          await self._run(job)
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        # the database is unreachable or similar; back off like an idle poll
+        logger.error(f"Job worker {self.name} slot {slot} failed to poll: {e}")
+        await self._idle()
+
+  async def _run(self, job: ClaimedJob) -> None:
+    handler = JobService.get_handler(job.kind)
+    async with async_session() as session:
+      if handler is None:
+        await JobService.fail(session, job, f"no handler for job kind {job.kind}")
+        return
+      try:
+        await asyncio.wait_for(handler(session, job.payload), settings.JOB_TIMEOUT)
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        await session.rollback()
+        await JobService.fail(session, job, f"{type(e).__name__}: {e}")
+        return
+      await JobService.complete(session, job)
+
+
+job_worker = JobWorker(settings.JOB_WORKER_CONCURRENCY)
@@ -0,0 +1,102 @@
+import time
+from typing import Dict, Hashable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import City, Store
+from app.services.catalog_events import CatalogEvents
+from app.services.city_service import CityService
+from app.services.store_service import StoreService
+from app.utils.kdtree import KDTree
+
+
+def geography(point):
+  """The expression the GiST indexes are built on; queries must use the same one.
+
+  The SRID is inlined: as a bound parameter it would not match the index
+  expression once asyncpg switches a prepared statement to a generic plan.
+  """
+  return func.geography(func.ST_SetSRID(point, literal_column("4326")))
+
+
+class NearestService:
+  """The ``k`` closest cities or stores to a coordinate, with distances in meters.
+
+  With ``NEAREST_BACKEND="postgis"`` the database orders rows by the KNN
+  operator ``<->`` on ``geography(point)``, which walks the GiST index
+  instead of sorting every row, and ``ST_Distance`` gives the exact distance
+  of the few rows returned. ``"memory"`` answers from a KD-tree of the
+  rendered responses kept in this worker, rebuilt after ``NEAREST_INDEX_TTL``
+  or a catalog change in the same worker; it suits a single-node deployment
+  where the list is small and the lookup is hot.
+  """
+
+  _trees: Dict[Hashable, "tuple[float, KDTree[dict]]"] = {}
+
+  @staticmethod
+  def limit(k: int) -> int:
+    return max(1, min(k, settings.NEAREST_MAX_RESULTS))
+
+  @staticmethod
+  def invalidate() -> None:
+    NearestService._trees.clear()
+
+  @staticmethod
+  def _with_distance(response: dict, distance: float) -> dict:
+    return {**response, "distance": round(distance, 1)}
+
+  @staticmethod
+  async def _tree(db: AsyncSession, key: Hashable, load) -> KDTree:
+    entry = NearestService._trees.get(key)
+    if entry is not None and time.monotonic() - entry[0] < settings.NEAREST_INDEX_TTL:
+      return entry[1]
+    responses = await load(db)
+    tree = KDTree([(r["point"][0], r["point"][1], r) for r in responses if r["point"] is not None])
+    NearestService._trees[key] = (time.monotonic(), tree)
+    return tree
+
+  @staticmethod
+  async def nearest_cities(db: AsyncSession, lon: float, lat: float, k: int) -> List[dict]:
+    k = NearestService.limit(k)
+    if settings.NEAREST_BACKEND == "memory":
+      tree = await NearestService._tree(db, "cities", CityService.list_city_responses)
+      return [NearestService._with_distance(city, distance) for distance, city in tree.nearest(lon, lat, k)]
+
+    origin = geography(func.ST_MakePoint(lon, lat))
+    stmt = (
+      CityService._response_query()
+      .add_columns(func.ST_Distance(geography(City.point), origin).label("distance"))
+      .order_by(geography(City.point).op("<->")(origin))
+      .limit(k)
+    )
+    result = await db.execute(stmt)
+    return [NearestService._with_distance(CityService._to_response(row), row.distance) for row in result.all()]
+
+  @staticmethod
+  async def nearest_stores(
+    db: AsyncSession, lon: float, lat: float, k: int, city_id: Optional[UUID] = None
+  ) -> List[dict]:
+    k = NearestService.limit(k)
+    if settings.NEAREST_BACKEND == "memory":
+      tree = await NearestService._tree(
+        db, ("stores", city_id), lambda session: StoreService.list_store_responses(session, city_id)
+      )
+      return [NearestService._with_distance(store, distance) for distance, store in tree.nearest(lon, lat, k)]
+
+    origin = geography(func.ST_MakePoint(lon, lat))
+    stmt = (
+      StoreService._response_query()
+      .add_columns(func.ST_Distance(geography(Store.point), origin).label("distance"))
+      .order_by(geography(Store.point).op("<->")(origin))
+      .limit(k)
+    )
+    if city_id is not None:
+      stmt = stmt.where(Store.city_id == city_id)
+    result = await db.execute(stmt)
+    return [NearestService._with_distance(StoreService._to_response(row), row.distance) for row in result.all()]
+
+
+CatalogEvents.subscribe(lambda change: NearestService.invalidate())
@@ -0,0 +1,208 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+from datetime import date, datetime
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import select, text, func, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import OrderAddress, OrderArchive, OrderArchiveUser, OrderStatus
+from app.db.models.orders import PaymentMethod
+from app.db.models.products import Dough
+from app.schemas.order import OrderRead
+
+logger = logging.getLogger(__name__)
+
+# children first: a partition can only be detached once nothing references it
+PARTITIONED_TABLES = ("order_item_ingredients", "order_items", "orders")
+
+# one self-contained JSON document per order, shaped like OrderRead
+EXPORT_SQL = """
+SELECT o.user_id, jsonb_build_object(
+  'id', o.id, 'user_id', o.user_id, 'total_price', o.total_price, 'is_pickup', o.is_pickup,
+  'store_id', o.store_id, 'payment_method', o.payment_method, 'status', o.status, 'created_at', o.created_at,
+  'address', (
+    SELECT jsonb_build_object('street', a.street, 'house', a.house, 'apartment', a.apartment, 'comment', a.comment)
+    FROM order_addresses a WHERE a.order_id = o.id AND a.created_at = o.created_at LIMIT 1
+  ),
+  'items', coalesce((
+    SELECT jsonb_agg(jsonb_build_object(
+      'product_variant_id', i.product_variant_id, 'quantity', i.quantity, 'price_per_item', i.price_per_item,
+      'product_name', i.product_name, 'variant_size', i.variant_size, 'type', i.type, 'dough', i.dough,
+      'ingredients', coalesce((
+        SELECT jsonb_agg(jsonb_build_object(
+          'ingredient_id', c.ingredient_id, 'quantity', c.quantity, 'is_removed', c.is_removed,
+          'ingredient_name', g.name
+        ))
+        FROM order_item_ingredients c LEFT JOIN ingredients g ON g.id = c.ingredient_id
+        WHERE c.order_item_id = i.id AND c.created_at = i.created_at
+      ), '[]'::jsonb)
+    ))
+    FROM order_items i WHERE i.order_id = o.id AND i.created_at = o.created_at
+  ), '[]'::jsonb)
+)::text AS document
+FROM {partition} o
+ORDER BY o.created_at
+"""
+
+
+class OrderArchiveService:
+  """Monthly partitions of the order tables and their cold archive.
+
+  Partitions are named ``<table>_pYYYY_MM`` and created ahead of time by the
+  ``create_order_partitions`` SQL function. Months older than
+  ``ORDER_ARCHIVE_AFTER_MONTHS`` are exported to gzip NDJSON files under
+  ``ORDER_ARCHIVE_DIR``, then detached and dropped. Archived orders stay
+  readable per user through ``order_archive_users``.
+  """
+
+  @staticmethod
+  def _add_months(period: date, months: int) -> date:
+    index = period.year * 12 + period.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+  @staticmethod
+  def partition_name(table: str, period: date) -> str:
+    return f"{table}_p{period:%Y_%m}"
+
+  @staticmethod
+  def archive_path(period: date) -> str:
+    return os.path.join(settings.ORDER_ARCHIVE_DIR, f"orders_{period:%Y_%m}.ndjson.gz")
+
+  @staticmethod
+  async def ensure_partitions(db: AsyncSession, months_ahead: Optional[int] = None) -> None:
+    months_ahead = settings.ORDER_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    current = date.today().replace(day=1)
+    for offset in range(months_ahead + 1):
+      period = OrderArchiveService._add_months(current, offset)
+      await db.execute(select(func.create_order_partitions(period)))
+    await db.commit()
+
+  @staticmethod
+  async def list_partitions(db: AsyncSession) -> List[date]:
+    result = await db.execute(text("""
+      SELECT c.relname FROM pg_inherits i
+      JOIN pg_class c ON c.oid = i.inhrelid
+      JOIN pg_class p ON p.oid = i.inhparent
+      WHERE p.relname = 'orders'
+    """))
+    periods = []
+    for name in result.scalars().all():
+      try:
+        periods.append(datetime.strptime(name, "orders_p%Y_%m").date())
+      except ValueError:
+        continue  # the default partition
+    return sorted(periods)
+
+  @staticmethod
+  async def archive_due(db: AsyncSession) -> List[date]:
+    cutoff = OrderArchiveService._add_months(date.today().replace(day=1), -settings.ORDER_ARCHIVE_AFTER_MONTHS)
+    archived = []
+    for period in await OrderArchiveService.list_partitions(db):
+      if period >= cutoff:
+        break
+      await OrderArchiveService.archive_period(db, period)
+      archived.append(period)
+    return archived
+
+  @staticmethod
+  async def archive_period(db: AsyncSession, period: date) -> int:
+    """Export one monthly partition, record it and drop it from the database.
+
+    The file is written to a temporary name and renamed once complete, so a
+    failed run leaves either no archive or a full one; the partition is only
+    dropped after that, in a single transaction with the bookkeeping rows.
+    """
+    path = OrderArchiveService.archive_path(period)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partition = OrderArchiveService.partition_name("orders", period)
+
+    user_ids = set()
+    count = 0
+    tmp_path = path + ".tmp"
+    result = await db.stream(text(EXPORT_SQL.format(partition=f'"{partition}"')))
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as fh:
+      async for user_id, document in result:
+        fh.write(document)
+        fh.write("\n")
+        user_ids.add(user_id)
+        count += 1
+    os.replace(tmp_path, path)
+
+    start = datetime.combine(period, datetime.min.time())
+    end = datetime.combine(OrderArchiveService._add_months(period, 1), datetime.min.time())
+    await db.execute(
+      insert(OrderArchive)
+      .values(period=period, path=path, order_count=count, archived_at=datetime.utcnow())
+      .on_conflict_do_update(index_elements=["period"], set_={"path": path, "order_count": count})
+    )
+    if user_ids:
+      await db.execute(
+        insert(OrderArchiveUser)
+        .values([{"user_id": user_id, "period": period} for user_id in user_ids])
+        .on_conflict_do_nothing()
+      )
+    await db.execute(delete(OrderAddress).where(OrderAddress.created_at >= start, OrderAddress.created_at < end))
+    for table in PARTITIONED_TABLES:
+      name = OrderArchiveService.partition_name(table, period)
+      await db.execute(text(f'ALTER TABLE {table} DETACH PARTITION "{name}"'))
+      await db.execute(text(f'DROP TABLE "{name}"'))
+    await db.commit()
+
+    logger.info(f"Archived {count} orders of {period:%Y-%m} to {path}")
+    return count
+
+  @staticmethod
+  def _read_user_orders(path: str, user_id: str) -> List[dict]:
+    documents = []
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+      for line in fh:
+        # cheap substring check before parsing the line
+        if user_id not in line:
+          continue
+        document = json.loads(line)
+        if document["user_id"] == user_id:
+          documents.append(document)
+    return documents
+
+  @staticmethod
+  def _to_read(document: dict) -> OrderRead:
+    items = []
+    for item in document["items"]:
+      ingredients = item.pop("ingredients")
+      items.append({
+        **item,
+        "dough": Dough[item["dough"]] if item["dough"] else None,
+        "added_ingredients": [i for i in ingredients if not i["is_removed"]],
+        "removed_ingredients": [i for i in ingredients if i["is_removed"]],
+      })
+    return OrderRead(**{
+      **document,
+      "status": OrderStatus[document["status"]].value,
+      "payment_method": PaymentMethod[document["payment_method"]],
+      "items": items,
+    })
+
+  @staticmethod
+  async def list_user_orders(db: AsyncSession, user_id: UUID) -> List[OrderRead]:
+    result = await db.execute(
+      select(OrderArchive.path)
+      .join(OrderArchiveUser, OrderArchiveUser.period == OrderArchive.period)
+      .where(OrderArchiveUser.user_id == user_id)
+      .order_by(OrderArchive.period.desc())
+    )
+    orders = []
+    for path in result.scalars().all():
+      if not os.path.exists(path):
+        logger.error(f"Order archive {path} is missing")
+        continue
+      documents = await asyncio.to_thread(OrderArchiveService._read_user_orders, path, str(user_id))
+      orders.extend(OrderArchiveService._to_read(document) for document in documents)
+    orders.sort(key=lambda order: order.created_at, reverse=True)
+    return orders
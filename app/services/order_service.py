@@ -1,19 +1,37 @@
+from datetime import datetime
 from decimal import Decimal
-from typing import List
-from uuid import UUID
+from typing import List, Optional
+from uuid import UUID, uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select, or_, and_, update, delete, insert, values, column, cast, literal, func, case, Integer, String, DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from fastapi import HTTPException
 from sqlalchemy.orm import selectinload
 
-from app.db.models import (Order, OrderItem, OrderAddress, ProductVariant, Store)
+from app.db.models import (Order, OrderItem, OrderAddress, OrderStatus, ORDER_STATUS_TRANSITIONS, ProductVariant, Store,
+                           Product, Category, Ingredient, CartItem, PizzaCartItem, CartItemIngredient)
+from app.db import statements
 from app.db.models.orders import OrderItemIngredient
-from app.schemas.order import (OrderCreate, OrderRead, OrderAddressRead, OrderItemRead, OrderStatusUpdate, OrderItemIngredientRead)
+from app.schemas.order import (OrderCreate, OrderRead, OrderAddressRead, OrderItemRead, OrderStatusUpdate, OrderItemIngredientRead,
+                               OrderStatusBulkResult, OrderStatusChange, OrderStatusRejection, OrderCheckout)
+from app.services.rollup_service import RollupService
 
 class OrderService:
+  @staticmethod
+  def _created_between(stmt, date_from: Optional[datetime], date_to: Optional[datetime]):
+    # orders are partitioned by month on created_at; a bound lets Postgres skip partitions
+    if date_from is not None:
+      stmt = stmt.where(Order.created_at >= date_from)
+    if date_to is not None:
+      stmt = stmt.where(Order.created_at < date_to)
+    return stmt
+
+  @staticmethod
   async def list_orders_by_user(
       db: AsyncSession,
-      user_id: UUID
+      user_id: UUID,
+      date_from: Optional[datetime] = None,
+      date_to: Optional[datetime] = None,
   ) -> List[OrderRead]:
     stmt = (
       select(Order)
@@ -25,6 +43,7 @@ class OrderService:
       )
       .order_by(Order.created_at.desc())
     )
+    stmt = OrderService._created_between(stmt, date_from, date_to)
     result = await db.execute(stmt)
     orders = result.scalars().all()
     return [OrderService._to_read(o) for o in orders]
@@ -32,7 +51,9 @@ class OrderService:
   @staticmethod
   async def list_orders_by_store(
       db: AsyncSession,
-      store_id: UUID
+      store_id: UUID,
+      date_from: Optional[datetime] = None,
+      date_to: Optional[datetime] = None,
   ) -> List[OrderRead]:
     stmt = (
       select(Order)
@@ -44,6 +65,7 @@ class OrderService:
       )
       .order_by(Order.created_at.desc())
     )
+    stmt = OrderService._created_between(stmt, date_from, date_to)
     result = await db.execute(stmt)
     orders = result.scalars().all()
     return [OrderService._to_read(o) for o in orders]
@@ -52,10 +74,10 @@ class OrderService:
   async def list_orders_by_store_filter_statuses(
       db: AsyncSession,
       store_id: UUID,
-      status_values: List[int]
+      status_values: List[int],
+      date_from: Optional[datetime] = None,
+      date_to: Optional[datetime] = None,
   ) -> List[OrderRead]:
-    from app.db.models import OrderStatus
-
     include, exclude = [], []
     for code in status_values:
       try:
@@ -82,6 +104,7 @@ class OrderService:
       stmt = stmt.where(~Order.status.in_(exclude))
     elif include:
       stmt = stmt.where(Order.status.in_(include))
+    stmt = OrderService._created_between(stmt, date_from, date_to)
 
     result = await db.execute(stmt)
     orders = result.scalars().all()
@@ -116,24 +139,27 @@ class OrderService:
     if data.address and not data.is_pickup:
       addr = OrderAddress(
         order_id=order.id,
+        created_at=order.created_at,
         **data.address.dict()
       )
       db.add(addr)
 
     total = Decimal(0)
 
+    variant_ids = {item.product_variant_id for item in data.items}
+    variants = {
+      variant.id: variant
+      for variant in (await db.execute(statements.variants_with_products(variant_ids))).scalars().all()
+    }
+
     for item in data.items:
-      stmt = (
-        select(ProductVariant)
-        .where(ProductVariant.id == item.product_variant_id)
-        .options(selectinload(ProductVariant.product))
-      )
-      variant = (await db.execute(stmt)).scalar_one_or_none()
+      variant = variants.get(item.product_variant_id)
       if not variant:
         raise HTTPException(404, f"Variant {item.product_variant_id} not found")
       price = Decimal(variant.price)
       oi = OrderItem(
         order_id=order.id,
+        created_at=order.created_at,
         product_variant_id=variant.id,
         quantity=item.quantity,
         price_per_item=price,
@@ -148,6 +174,7 @@ class OrderService:
       for ci in item.added_ingredients + item.removed_ingredients:
         db.add(OrderItemIngredient(
           order_item_id=oi.id,
+          created_at=oi.created_at,
           ingredient_id=ci.ingredient_id,
           quantity=ci.quantity,
           is_removed=ci.is_removed
@@ -156,44 +183,249 @@ class OrderService:
       total += oi.price_per_item * oi.quantity
 
     order.total_price = float(total)
+    await db.flush()
+    await RollupService.record_orders_placed(db, [order.id])
     await db.commit()
-    await db.refresh(order)
 
+    return await OrderService._load_read(db, order.id)
 
-    stmt = (
-      select(Order)
-      .where(Order.id == order.id)
-      .options(
-        selectinload(Order.address),
-        selectinload(Order.items).selectinload(OrderItem.custom_ingredients)
+  @staticmethod
+  def _cart_lines(user_id: UUID, lock: bool = False):
+    """One row per cart item priced from current variant and ingredient prices."""
+    cart = select(CartItem.id).where(CartItem.user_id == user_id)
+    if lock:
+      cart = cart.with_for_update()
+    cart = cart.cte("cart")
+    pizza = PizzaCartItem.__table__
+    toppings = func.coalesce(
+      func.sum(Ingredient.price * CartItemIngredient.quantity).filter(CartItemIngredient.is_removed.is_(False)), 0
+    )
+    return (
+      select(
+        CartItem.id,
+        CartItem.type,
+        CartItem.quantity,
+        CartItem.product_variant_id,
+        (ProductVariant.price + toppings).label("unit_price"),
+        ProductVariant.size,
+        Product.name,
+        pizza.c.dough,
+        Category.store_id,
+        Store.min_order_price,
+        (
+          ProductVariant.is_available & Product.is_available & Category.is_available & Store.id.is_not(None)
+        ).label("is_available"),
+      )
+      .join(cart, cart.c.id == CartItem.id)
+      .join(ProductVariant, ProductVariant.id == CartItem.product_variant_id)
+      .join(Product, Product.id == ProductVariant.product_id)
+      .join(Category, Category.id == Product.category_id)
+      .outerjoin(Store, Store.id == Category.store_id)
+      .outerjoin(pizza, pizza.c.id == CartItem.id)
+      .outerjoin(CartItemIngredient, CartItemIngredient.cart_item_id == CartItem.id)
+      .outerjoin(Ingredient, Ingredient.id == CartItemIngredient.ingredient_id)
+      .group_by(
+        CartItem.id, CartItem.type, CartItem.quantity, CartItem.product_variant_id,
+        ProductVariant.price, ProductVariant.size, ProductVariant.is_available,
+        Product.name, Product.is_available, Category.is_available,
+        pizza.c.dough, Category.store_id, Store.id, Store.min_order_price,
       )
     )
-    fresh = (await db.execute(stmt)).scalars().one()
-    return OrderService._to_read(fresh)
 
   @staticmethod
-  async def update_order_status(
+  async def checkout(
       db: AsyncSession,
-      data: OrderStatusUpdate
+      data: OrderCheckout,
+      user
   ) -> OrderRead:
-    order = await db.get(Order, data.id_order)
-    if not order:
-      raise HTTPException(status_code=404, detail="Order not found")
-    order.status = data.status
+    """Turn the user's cart into an order inside the database.
+
+    The cart rows are locked and priced once; order items and their
+    ingredients are then copied with ``INSERT ... SELECT`` and the cart is
+    deleted, so the statement count does not depend on the cart size. Item
+    ids are derived from the order and cart item ids, which lets the
+    ingredient copy point at them without a round trip.
+    """
+    if not data.is_pickup and not data.address:
+      raise HTTPException(400, "address is required for delivery")
+
+    lines = (await db.execute(OrderService._cart_lines(user.id, lock=True))).all()
+    if not lines:
+      raise HTTPException(400, "Cart is empty")
+    if not all(line.is_available for line in lines):
+      raise HTTPException(409, "Some cart items are no longer available")
+    store_ids = {line.store_id for line in lines}
+    if len(store_ids) > 1:
+      raise HTTPException(400, "Cart contains items from several stores")
+    store_id = store_ids.pop()
+    if data.store_id is not None and data.store_id != store_id:
+      raise HTTPException(400, "Cart items belong to another store")
+
+    total = sum(Decimal(str(line.unit_price)) * line.quantity for line in lines)
+    min_order_price = lines[0].min_order_price or 0
+    if total < min_order_price:
+      raise HTTPException(400, f"Minimum order price is {min_order_price}")
+
+    order_id = uuid4()
+    created_at = datetime.utcnow()
+    await db.execute(insert(Order).values(
+      id=order_id,
+      user_id=user.id,
+      total_price=float(total),
+      is_pickup=data.is_pickup,
+      store_id=store_id,
+      payment_method=data.payment_method,
+      status=OrderStatus.PENDING,
+      version=1,
+      created_at=created_at,
+    ))
+    if data.address and not data.is_pickup:
+      await db.execute(insert(OrderAddress).values(
+        id=uuid4(), order_id=order_id, created_at=created_at, **data.address.model_dump()
+      ))
+
+    def item_id(cart_item_id):
+      return cast(func.md5(cast(literal(order_id), String) + cast(cart_item_id, String)), PG_UUID(as_uuid=True))
+
+    priced = OrderService._cart_lines(user.id).subquery("priced")
+    await db.execute(insert(OrderItem).from_select(
+      ["id", "order_id", "created_at", "product_variant_id", "quantity", "price_per_item",
+       "product_name", "variant_size", "type", "dough"],
+      select(
+        item_id(priced.c.id),
+        literal(order_id, PG_UUID(as_uuid=True)),
+        literal(created_at, DateTime),
+        priced.c.product_variant_id,
+        priced.c.quantity,
+        priced.c.unit_price,
+        priced.c.name,
+        priced.c.size,
+        case((priced.c.type == "pizza_cart_item", "pizza"), else_="simple"),
+        cast(priced.c.dough, OrderItem.__table__.c.dough.type),
+      ),
+    ))
+    await db.execute(insert(OrderItemIngredient).from_select(
+      ["id", "order_item_id", "created_at", "ingredient_id", "quantity", "is_removed"],
+      select(
+        item_id(CartItemIngredient.id),
+        item_id(CartItemIngredient.cart_item_id),
+        literal(created_at, DateTime),
+        CartItemIngredient.ingredient_id,
+        CartItemIngredient.quantity,
+        CartItemIngredient.is_removed,
+      )
+      .join(CartItem, CartItem.id == CartItemIngredient.cart_item_id)
+      .where(CartItem.user_id == user.id),
+    ))
+    await RollupService.record_orders_placed(db, [order_id])
+    await db.execute(delete(CartItem.__table__).where(CartItem.__table__.c.user_id == user.id))
     await db.commit()
-    await db.refresh(order)
 
+    return await OrderService._load_read(db, order_id)
+
+  @staticmethod
+  async def _load_read(db: AsyncSession, order_id: UUID) -> OrderRead:
     stmt = (
       select(Order)
-      .where(Order.id == order.id)
+      .where(Order.id == order_id)
       .options(
         selectinload(Order.address),
         selectinload(Order.items)
         .selectinload(OrderItem.custom_ingredients)
+        .selectinload(OrderItemIngredient.ingredient)
+      )
+    )
+    order = (await db.execute(stmt)).scalars().one()
+    return OrderService._to_read(order)
+
+  @staticmethod
+  async def transition_statuses(
+      db: AsyncSession,
+      updates: List[OrderStatusUpdate]
+  ) -> OrderStatusBulkResult:
+    """Apply many status changes in one ``UPDATE ... FROM (VALUES ...)``.
+
+    A row only changes when the transition is allowed from the order's
+    current status and, if a version was sent, the version still matches;
+    the previous status comes from a locking CTE so the rollups see exactly
+    what was replaced. Rows that did not change are reported with a reason.
+    """
+    # last update wins when an order is listed twice
+    updates = list({u.id_order: u for u in updates}.values())
+    table = Order.__table__
+    requested = (
+      values(
+        column("id", table.c.id.type), column("status", table.c.status.type), column("version", Integer),
+        name="v",
+      )
+      .data([(u.id_order, OrderStatus(u.status), u.version) for u in updates])
+    )
+    current = (
+      select(table.c.id, table.c.created_at, table.c.status)
+      .where(table.c.id.in_([u.id_order for u in updates]))
+      .with_for_update()
+      .cte("current")
+    )
+    allowed = or_(*(
+      and_(current.c.status == source, requested.c.status.in_(targets))
+      for source, targets in ORDER_STATUS_TRANSITIONS.items() if targets
+    ))
+    stmt = (
+      update(table)
+      .add_cte(current)
+      .where(
+        table.c.id == current.c.id,
+        table.c.created_at == current.c.created_at,
+        table.c.id == requested.c.id,
+        allowed,
+        # an all-NULL VALUES column is typed text, hence the cast
+        or_(requested.c.version.is_(None), table.c.version == cast(requested.c.version, Integer)),
       )
+      .values(status=requested.c.status, version=table.c.version + 1)
+      .returning(table.c.id, current.c.status.label("previous_status"), table.c.status, table.c.version)
     )
-    fresh = (await db.execute(stmt)).scalars().one()
-    return OrderService._to_read(fresh)
+    rows = (await db.execute(stmt)).all()
+
+    result = OrderStatusBulkResult(updated=[
+      OrderStatusChange(id=row.id, previous_status=row.previous_status.value, status=row.status.value, version=row.version)
+      for row in rows
+    ])
+    await RollupService.record_status_changes(db, [(row.id, row.previous_status, row.status) for row in rows])
+    await db.commit()
+
+    changed = {row.id for row in rows}
+    missed = [u for u in updates if u.id_order not in changed]
+    if missed:
+      found = await db.execute(
+        select(Order.id, Order.status, Order.version).where(Order.id.in_([u.id_order for u in missed]))
+      )
+      state = {row.id: row for row in found}
+      for u in missed:
+        row = state.get(u.id_order)
+        if row is None:
+          result.rejected.append(OrderStatusRejection(id=u.id_order, reason="not_found"))
+          continue
+        reason = "version_conflict" if u.version is not None and u.version != row.version else "invalid_transition"
+        result.rejected.append(OrderStatusRejection(
+          id=u.id_order, reason=reason, status=row.status.value, version=row.version,
+        ))
+    return result
+
+  @staticmethod
+  async def update_order_status(
+      db: AsyncSession,
+      data: OrderStatusUpdate
+  ) -> OrderRead:
+    result = await OrderService.transition_statuses(db, [data])
+    if result.rejected:
+      rejection = result.rejected[0]
+      if rejection.reason == "not_found":
+        raise HTTPException(status_code=404, detail="Order not found")
+      if rejection.reason == "version_conflict":
+        raise HTTPException(status_code=409, detail="Order was changed by another request")
+      raise HTTPException(status_code=400, detail="Status transition is not allowed")
+
+    return await OrderService._load_read(db, data.id_order)
 
   @staticmethod
   def _to_read(order: Order) -> OrderRead:
@@ -239,6 +471,7 @@ class OrderService:
       store_id=order.store_id,
       payment_method=order.payment_method,
       status=order.status.value,
+      version=order.version,
       created_at=order.created_at,
       address=addr,
       items=items,
@@ -0,0 +1,60 @@
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import select, func, Column
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.bulk import update_from_values
+from app.db.models import Category, Product
+
+
+class PositionService:
+  """Position bookkeeping for ordered lists (categories of a store, products of a category).
+
+  Both lists carry a deferrable unique constraint on (parent, position), so a
+  full reorder is a single UPDATE and allocation on create is serialised per
+  parent with a transaction-scoped advisory lock.
+  """
+
+  @staticmethod
+  async def lock_parent(db: AsyncSession, scope: str, parent_id: UUID) -> None:
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"{scope}:{parent_id}"))))
+
+  @staticmethod
+  async def _next_position(db: AsyncSession, scope: str, position: Column, parent: Column, parent_id: UUID) -> int:
+    await PositionService.lock_parent(db, scope, parent_id)
+    result = await db.execute(select(func.coalesce(func.max(position), 0)).where(parent == parent_id))
+    return result.scalar_one() + 1
+
+  @staticmethod
+  async def next_category_position(db: AsyncSession, store_id: UUID) -> int:
+    return await PositionService._next_position(db, "categories", Category.position, Category.store_id, store_id)
+
+  @staticmethod
+  async def next_product_position(db: AsyncSession, category_id: UUID) -> int:
+    return await PositionService._next_position(db, "products", Product.position, Product.category_id, category_id)
+
+  @staticmethod
+  async def _reorder(db: AsyncSession, scope: str, table, parent: str, parent_id: UUID, ordered_ids: List[UUID]) -> None:
+    if len(set(ordered_ids)) != len(ordered_ids):
+      raise ValueError("Список содержит повторяющиеся идентификаторы")
+
+    await PositionService.lock_parent(db, scope, parent_id)
+    result = await db.execute(select(table.c.id).where(table.c[parent] == parent_id))
+    existing = set(result.scalars().all())
+    if existing != set(ordered_ids):
+      raise ValueError("Список должен содержать все элементы ровно один раз")
+    if not ordered_ids:
+      return
+
+    rows = [{"id": item_id, "position": index} for index, item_id in enumerate(ordered_ids, start=1)]
+    await db.execute(update_from_values(table, "id", rows, table.c[parent] == parent_id))
+    await db.commit()
+
+  @staticmethod
+  async def reorder_categories(db: AsyncSession, store_id: UUID, category_ids: List[UUID]) -> None:
+    await PositionService._reorder(db, "categories", Category.__table__, "store_id", store_id, category_ids)
+
+  @staticmethod
+  async def reorder_products(db: AsyncSession, category_id: UUID, product_ids: List[UUID]) -> None:
+    await PositionService._reorder(db, "products", Product.__table__, "category_id", category_id, product_ids)
@@ -1,16 +1,22 @@
-import os
+import uuid
 from uuid import UUID
 
 from fastapi import HTTPException
 from pydantic import Field
-from sqlalchemy import select, func, delete, insert, update
+from sqlalchemy import select, func, delete, insert, update, exists
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, with_polymorphic
 
 from app.db.models import Product, Category, Ingredient
 from app.db.models.products import Type, Pizza, ProductVariant, PizzaIngredient, Dough
-from app.schemas.product import ProductCreate, PizzaCreate, ProductUpdate, PizzaUpdate, ProductResponse
-from typing import Union, cast, Annotated
+from app.db.bulk import update_from_values
+from app.schemas.category import CatalogCategory
+from app.schemas.product import ProductCreate, PizzaCreate, ProductUpdate, PizzaUpdate, ProductResponse, ProductVariantUpdate, \
+  ProductChanges
+from app.services.catalog_events import CatalogEvents, CatalogChange
+from app.services.job_service import REMOVE_MEDIA, JobService
+from app.services.position_service import PositionService
+from typing import Union, Annotated
 
 ProductUnionCreate = Union[ProductCreate, PizzaCreate]
 ProductUnionUpdate = Annotated[
@@ -18,6 +24,7 @@ ProductUnionUpdate = Annotated[
   Field(discriminator="type")
 ]
 class ProductService:
+  VARIANT_FIELDS = ("size", "price", "weight", "calories", "proteins", "fats", "carbohydrates", "is_available", "image")
 
   @staticmethod
   async def get_products_by_category(db: AsyncSession, category_id: UUID):
@@ -40,19 +47,68 @@ class ProductService:
   @staticmethod
   async def get_products_by_store(db: AsyncSession, store_id: UUID):
     result = await db.execute(
-      select(Product).join(Category)
+      select(Product).join(Category, Category.id == Product.category_id)
       .options(selectinload(Product.variants))
-      .where(Product.store_id == store_id)
+      .where(Category.store_id == store_id)
+      .order_by(Category.position, Product.position)
     )
     return result.scalars().all()
 
+  @staticmethod
+  async def get_store_catalog(db: AsyncSession, store_id: UUID) -> list[CatalogCategory]:
+    """Menu of a store grouped by category, in a fixed number of queries.
+
+    Only available categories, products and variants are returned; products
+    without a single available variant are skipped.
+    """
+    categories = (await db.execute(
+      select(Category)
+      .where(Category.store_id == store_id, Category.is_available.is_(True))
+      .order_by(Category.position)
+    )).scalars().all()
+    if not categories:
+      return []
+
+    available_variant = ProductVariant.is_available.is_(True)
+    products_union = with_polymorphic(Product, [Pizza])
+    products = (await db.execute(
+      select(products_union)
+      .join(Category, Category.id == products_union.category_id)
+      .where(
+        Category.store_id == store_id,
+        Category.is_available.is_(True),
+        products_union.is_available.is_(True),
+        exists().where(ProductVariant.product_id == products_union.id, available_variant),
+      )
+      .options(
+        selectinload(products_union.variants.and_(available_variant)),
+        selectinload(products_union.Pizza.pizza_ingredients).selectinload(PizzaIngredient.ingredient),
+      )
+      .order_by(Category.position, products_union.position)
+    )).scalars().all()
+
+    grouped: dict[UUID, list[ProductResponse]] = {category.id: [] for category in categories}
+    for product in products:
+      # the two statements see different snapshots: a category made available in between is not listed yet
+      category_products = grouped.get(product.category_id)
+      if category_products is None:
+        continue
+      category_products.append(ProductResponse.model_validate(product))
+
+    return [
+      CatalogCategory(
+        id=category.id,
+        name=category.name,
+        type=category.type,
+        position=category.position,
+        products=grouped[category.id],
+      )
+      for category in categories
+    ]
+
   @staticmethod
   async def create_product(db: AsyncSession, product_data: ProductUnionCreate) -> dict:
-    max_position_query = select(func.max(Product.position)).where(
-      Product.category_id == product_data.category_id
-    )
-    result = await db.execute(max_position_query)
-    max_position = result.scalar() or 0
+    position = await PositionService.next_product_position(db, product_data.category_id)
 
     if product_data.type == Type.PIZZA:
       assert isinstance(product_data, PizzaCreate)
@@ -60,7 +116,7 @@ class ProductService:
         category_id=product_data.category_id,
         name=product_data.name,
         description=product_data.description,
-        position=max_position + 1,
+        position=position,
         is_available=product_data.is_available,
         dough=Dough.THICK_DOUGH,
         type=Type.PIZZA,
@@ -83,7 +139,7 @@ class ProductService:
         category_id=product_data.category_id,
         name=product_data.name,
         description=product_data.description,
-        position=max_position + 1,
+        position=position,
         is_available=product_data.is_available,
         type=Type.GROUP,
       )
@@ -104,47 +160,106 @@ class ProductService:
         image=variant_data.image,
       )
       db.add(variant)
-      await db.refresh(obj, attribute_names=["variants"])
-
-      obj.variants = cast(list[ProductVariant], obj.variants)
 
+    store_id = (await db.execute(
+      select(Category.store_id).where(Category.id == product_data.category_id)
+    )).scalar_one()
     await db.commit()
+    await CatalogEvents.purge("product_created", [store_id], product_ids=[obj.id], category_ids=[product_data.category_id])
+    return await ProductService._load_response(db, obj.id, product_data.type)
 
-    if product_data.type == Type.PIZZA:
-      stmt = (
-        select(Pizza)
-        .where(Product.id == obj.id)
-        .options(
-          selectinload(Pizza.variants),
-          selectinload(Pizza.pizza_ingredients).selectinload(PizzaIngredient.ingredient),
-        )
-      )
-    else:
-      stmt = (
-        select(Product)
-        .where(Product.id == obj.id)
-        .options(
-          selectinload(Product.variants),
-        )
+  @staticmethod
+  async def _sync_variants(db: AsyncSession, product_id: UUID, variants: list[ProductVariantUpdate], changes: ProductChanges) -> None:
+    fields = ProductService.VARIANT_FIELDS
+    result = await db.execute(
+      select(ProductVariant.id, *(getattr(ProductVariant, f) for f in fields))
+      .where(ProductVariant.product_id == product_id)
+    )
+    existing = {row.id: row for row in result.all()}
+
+    to_insert, to_update, kept = [], [], set()
+    for v in variants:
+      values = {f: getattr(v, f) for f in fields}
+      if v.id is None:
+        variant_id = uuid.uuid4()
+        to_insert.append({"id": variant_id, "product_id": product_id, **values})
+        changes.created_variant_ids.append(variant_id)
+        continue
+      current = existing.get(v.id)
+      if current is None:
+        raise ValueError(f"Вариант {v.id} не принадлежит продукту")
+      kept.add(v.id)
+      if any(getattr(current, f) != values[f] for f in fields):
+        to_update.append({"id": v.id, **values})
+        changes.updated_variant_ids.append(v.id)
+
+    to_delete = [variant_id for variant_id in existing if variant_id not in kept]
+    changes.deleted_variant_ids.extend(to_delete)
+
+    if to_delete:
+      await db.execute(delete(ProductVariant).where(ProductVariant.id.in_(to_delete)))
+    if to_update:
+      await db.execute(update_from_values(ProductVariant.__table__, "id", to_update))
+    if to_insert:
+      await db.execute(insert(ProductVariant.__table__), to_insert)
+
+  @staticmethod
+  async def _sync_pizza_ingredients(db: AsyncSession, product_id: UUID, ingredients: list, changes: ProductChanges) -> None:
+    requested = {ing.ingredient_id: bool(ing.is_deleted) for ing in ingredients}
+    known = set((await db.execute(
+      select(Ingredient.id).where(Ingredient.id.in_(list(requested)))
+    )).scalars().all()) if requested else set()
+    incoming = {ingredient_id: flag for ingredient_id, flag in requested.items() if ingredient_id in known}
+
+    result = await db.execute(
+      select(PizzaIngredient.ingredient_id, PizzaIngredient.is_deleted)
+      .where(PizzaIngredient.pizza_id == product_id)
+    )
+    existing = {row.ingredient_id: row.is_deleted for row in result.all()}
+
+    to_insert = [
+      {"pizza_id": product_id, "ingredient_id": ingredient_id, "is_deleted": flag}
+      for ingredient_id, flag in incoming.items() if ingredient_id not in existing
+    ]
+    to_update = [
+      {"ingredient_id": ingredient_id, "is_deleted": flag}
+      for ingredient_id, flag in incoming.items()
+      if ingredient_id in existing and existing[ingredient_id] != flag
+    ]
+    to_delete = [ingredient_id for ingredient_id in existing if ingredient_id not in incoming]
+
+    if to_delete:
+      await db.execute(
+        delete(PizzaIngredient)
+        .where(PizzaIngredient.pizza_id == product_id, PizzaIngredient.ingredient_id.in_(to_delete))
       )
-    result = await db.execute(stmt)
-    full_obj = result.scalar_one()
-    try:
-      return ProductResponse.model_validate(full_obj).model_dump()
-    except Exception as e:
-      raise e
+    if to_update:
+      table = PizzaIngredient.__table__
+      await db.execute(update_from_values(table, "ingredient_id", to_update, table.c.pizza_id == product_id))
+    if to_insert:
+      await db.execute(insert(PizzaIngredient.__table__), to_insert)
+    changes.ingredients_changed = bool(to_insert or to_update or to_delete)
 
   @staticmethod
   async def update_product(
       db: AsyncSession,
       product_id: UUID,
       product_data: ProductUnionUpdate
-  ) -> Product:
+  ) -> tuple[dict, ProductChanges]:
+    """Apply an edit as a diff against the stored variants and ingredients.
+
+    Variants are matched by id, so untouched variants keep their ids and the
+    cart items that reference them survive the edit.
+    """
     stmt = select(Product).where(Product.id == product_id)
     product = (await db.execute(stmt)).scalar_one_or_none()
     if product is None:
       raise HTTPException(404, "Продукт не найден")
 
+    changes = ProductChanges()
+    previous_category_id = product.category_id
+    if product.category_id != product_data.category_id:
+      product.position = await PositionService.next_product_position(db, product_data.category_id)
     product.name = product_data.name
     product.description = product_data.description
     product.is_available = product_data.is_available
@@ -161,73 +276,72 @@ class ProductService:
           insert(Pizza.__table__)
           .values(id=product_id, dough=product_data.dough)
         )
-        await db.flush()
       else:
         await db.execute(
           update(Pizza.__table__)
           .where(Pizza.__table__.c.id == product_id)
           .values(dough=product_data.dough)
         )
-        await db.flush()
 
-      await db.execute(
-        delete(PizzaIngredient)
-        .where(PizzaIngredient.pizza_id == product_id)
-      )
-      await db.flush()
-
-      ids = [ing.ingredient_id for ing in product_data.ingredients]
-      res = await db.execute(
-        select(Ingredient).where(Ingredient.id.in_(ids))
-      )
-      ingr_map = {i.id: i for i in res.scalars()}
-
-      new_assocs = [
-        PizzaIngredient(
-          pizza_id=product_id,
-          ingredient_id=ing.ingredient_id,
-          is_deleted=ing.is_deleted
-        )
-        for ing in product_data.ingredients
-        if ing.ingredient_id in ingr_map
-      ]
-      db.add_all(new_assocs)
-      await db.flush()
+      await ProductService._sync_pizza_ingredients(db, product_id, product_data.ingredients, changes)
 
     else:
-      await db.execute(
+      result = await db.execute(
         delete(PizzaIngredient)
         .where(PizzaIngredient.pizza_id == product_id)
       )
+      changes.ingredients_changed = result.rowcount > 0
       await db.execute(
-        delete(Pizza).where(Pizza.id == product_id)
+        delete(Pizza.__table__).where(Pizza.__table__.c.id == product_id)
       )
-      await db.flush()
 
-    await db.execute(
-      delete(ProductVariant)
-      .where(ProductVariant.product_id == product_id)
+    await ProductService._sync_variants(db, product_id, product_data.variants, changes)
+    stores = await db.execute(
+      select(Category.store_id).distinct()
+      .where(Category.id.in_({previous_category_id, product_data.category_id}))
     )
-    await db.flush()
-
-    for v in product_data.variants:
-      db.add(ProductVariant(
-        product_id=product_id,
-        size=v.size,
-        price=v.price,
-        weight=v.weight,
-        calories=v.calories,
-        proteins=v.proteins,
-        fats=v.fats,
-        carbohydrates=v.carbohydrates,
-        is_available=v.is_available,
-        image=v.image,
-      ))
-    await db.flush()
+    store_ids = list(stores.scalars().all())
 
     await db.commit()
-    await db.refresh(product)
-    return product
+    db.expunge(product)
+    await CatalogEvents.emit(CatalogChange(
+      reason="product_updated",
+      store_ids=store_ids,
+      product_ids=[product_id],
+      variant_ids=changes.created_variant_ids + changes.updated_variant_ids + changes.deleted_variant_ids,
+    ))
+    return await ProductService._load_response(db, product_id, product_data.type), changes
+
+  @staticmethod
+  async def _load_response(db: AsyncSession, product_id: UUID, product_type: int) -> dict:
+    if product_type == Type.PIZZA:
+      stmt = (
+        select(Pizza)
+        .where(Product.id == product_id)
+        .options(
+          selectinload(Pizza.variants),
+          selectinload(Pizza.pizza_ingredients).selectinload(PizzaIngredient.ingredient),
+        )
+      )
+    else:
+      stmt = (
+        select(Product)
+        .where(Product.id == product_id)
+        .options(
+          selectinload(Product.variants),
+        )
+      )
+    result = await db.execute(stmt)
+    return ProductResponse.model_validate(result.scalar_one()).model_dump()
+
+  @staticmethod
+  async def reorder_products(db: AsyncSession, category_id: UUID, product_ids: list[UUID]) -> None:
+    await PositionService.reorder_products(db, category_id, product_ids)
+    store_id = (await db.execute(select(Category.store_id).where(Category.id == category_id))).scalar_one_or_none()
+    await CatalogEvents.purge(
+      "products_reordered", None if store_id is None else [store_id],
+      category_ids=[category_id], product_ids=product_ids,
+    )
 
   @staticmethod
   async def delete_product(db: AsyncSession, product_id: UUID) -> bool:
@@ -236,12 +350,18 @@ class ProductService:
     if not product:
       return False
 
-    for variant in product.variants:
-      if variant.image:
-        image_path = variant.image.lstrip("/")
-        if os.path.exists(image_path):
-          os.remove(image_path)
-
+    store_id = (await db.execute(
+      select(Category.store_id).where(Category.id == product.category_id)
+    )).scalar_one_or_none()
+    variant_ids = [variant.id for variant in product.variants]
+    images = [variant.image for variant in product.variants if variant.image]
     await db.delete(product)
+    if images:
+      # removed by a job once the delete commits, not before
+      JobService.enqueue(db, REMOVE_MEDIA, {"paths": images})
     await db.commit()
+    await CatalogEvents.purge(
+      "product_deleted", None if store_id is None else [store_id],
+      product_ids=[product_id], variant_ids=variant_ids,
+    )
     return True
\ No newline at end of file
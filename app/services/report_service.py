@@ -0,0 +1,85 @@
+from datetime import date, datetime, time, timedelta
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import select, func, cast, Date
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import SalesDailyRollup, SalesHourlyRollup, ProductVariant, Product
+
+
+class ReportService:
+  """Store reports answered from the sales rollup tables only."""
+
+  @staticmethod
+  def _hour_range(date_from: date, date_to: date) -> tuple[datetime, datetime]:
+    return datetime.combine(date_from, time.min), datetime.combine(date_to + timedelta(days=1), time.min)
+
+  @staticmethod
+  def _avg(revenue, orders):
+    return func.coalesce(revenue / func.nullif(orders, 0), 0)
+
+  @staticmethod
+  async def hourly(db: AsyncSession, store_id: UUID, date_from: date, date_to: date) -> List[dict]:
+    start, end = ReportService._hour_range(date_from, date_to)
+    r = SalesHourlyRollup
+    stmt = (
+      select(
+        r.hour, r.orders, r.revenue, r.completed_orders, r.completed_revenue,
+        r.cancelled_orders, r.cancelled_revenue,
+        ReportService._avg(r.completed_revenue, r.completed_orders).label("average_ticket"),
+      )
+      .where(r.store_id == store_id, r.hour >= start, r.hour < end)
+      .order_by(r.hour)
+    )
+    return [dict(row) for row in (await db.execute(stmt)).mappings().all()]
+
+  @staticmethod
+  async def daily(db: AsyncSession, store_id: UUID, date_from: date, date_to: date) -> List[dict]:
+    start, end = ReportService._hour_range(date_from, date_to)
+    r = SalesHourlyRollup
+    day = cast(r.hour, Date).label("day")
+    completed_orders = func.sum(r.completed_orders)
+    completed_revenue = func.sum(r.completed_revenue)
+    stmt = (
+      select(
+        day,
+        func.sum(r.orders).label("orders"),
+        func.sum(r.revenue).label("revenue"),
+        completed_orders.label("completed_orders"),
+        completed_revenue.label("completed_revenue"),
+        func.sum(r.cancelled_orders).label("cancelled_orders"),
+        func.sum(r.cancelled_revenue).label("cancelled_revenue"),
+        ReportService._avg(completed_revenue, completed_orders).label("average_ticket"),
+      )
+      .where(r.store_id == store_id, r.hour >= start, r.hour < end)
+      .group_by(day)
+      .order_by(day)
+    )
+    return [dict(row) for row in (await db.execute(stmt)).mappings().all()]
+
+  @staticmethod
+  async def top_variants(db: AsyncSession, store_id: UUID, date_from: date, date_to: date, limit: int) -> List[dict]:
+    r = SalesDailyRollup
+    net_quantity = (func.sum(r.quantity) - func.sum(r.cancelled_quantity)).label("net_quantity")
+    stmt = (
+      select(
+        r.product_variant_id,
+        Product.name.label("product_name"),
+        ProductVariant.size.label("variant_size"),
+        func.sum(r.quantity).label("quantity"),
+        func.sum(r.revenue).label("revenue"),
+        func.sum(r.order_count).label("order_count"),
+        func.sum(r.completed_quantity).label("completed_quantity"),
+        func.sum(r.completed_revenue).label("completed_revenue"),
+        func.sum(r.cancelled_quantity).label("cancelled_quantity"),
+        net_quantity,
+      )
+      .outerjoin(ProductVariant, ProductVariant.id == r.product_variant_id)
+      .outerjoin(Product, Product.id == ProductVariant.product_id)
+      .where(r.store_id == store_id, r.day >= date_from, r.day <= date_to)
+      .group_by(r.product_variant_id, Product.name, ProductVariant.size)
+      .order_by(net_quantity.desc())
+      .limit(limit)
+    )
+    return [dict(row) for row in (await db.execute(stmt)).mappings().all()]
@@ -0,0 +1,154 @@
+from collections import defaultdict
+from datetime import date, datetime, time
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import select, func, delete, cast, Date, Numeric, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Order, OrderItem, OrderStatus, SalesDailyRollup, SalesHourlyRollup
+
+# counter prefix per status bucket; placed orders use the unprefixed counters
+STATUS_BUCKETS = {
+  OrderStatus.COMPLETED: "completed_",
+  OrderStatus.CANCELLED: "cancelled_",
+}
+
+
+class RollupService:
+  """Incremental maintenance of the sales rollup tables.
+
+  All methods run inside the caller's transaction, so rollups commit or roll
+  back together with the order change that produced them.
+  """
+
+  @staticmethod
+  def _upsert(table, columns: list[str], keys: list[str], source):
+    stmt = insert(table).from_select(keys + columns, source)
+    return stmt.on_conflict_do_update(
+      index_elements=keys,
+      set_={column: table.c[column] + stmt.excluded[column] for column in columns},
+    )
+
+  @staticmethod
+  async def _apply(db: AsyncSession, order_ids: list[UUID], prefix: str, sign: int) -> None:
+    if not order_ids:
+      return
+    amount = literal(sign)
+    line_revenue = OrderItem.price_per_item * OrderItem.quantity
+    count_column = [] if prefix else ["order_count"]
+    daily = (
+      select(
+        Order.store_id,
+        cast(Order.created_at, Date),
+        OrderItem.product_variant_id,
+        func.sum(OrderItem.quantity) * amount,
+        cast(func.sum(line_revenue) * amount, Numeric(14, 2)),
+        *([func.count(func.distinct(Order.id)) * amount] if not prefix else []),
+      )
+      .join(OrderItem, (OrderItem.order_id == Order.id) & (OrderItem.created_at == Order.created_at))
+      .where(Order.id.in_(order_ids), Order.store_id.is_not(None))
+      .group_by(Order.store_id, cast(Order.created_at, Date), OrderItem.product_variant_id)
+    )
+    await db.execute(RollupService._upsert(
+      SalesDailyRollup.__table__,
+      [f"{prefix}quantity", f"{prefix}revenue", *count_column],
+      ["store_id", "day", "product_variant_id"],
+      daily,
+    ))
+
+    hour = func.date_trunc("hour", Order.created_at)
+    hourly = (
+      select(
+        Order.store_id,
+        hour,
+        func.count(Order.id) * amount,
+        cast(func.sum(Order.total_price) * amount, Numeric(14, 2)),
+      )
+      .where(Order.id.in_(order_ids), Order.store_id.is_not(None))
+      .group_by(Order.store_id, hour)
+    )
+    await db.execute(RollupService._upsert(
+      SalesHourlyRollup.__table__,
+      [f"{prefix}orders", f"{prefix}revenue"],
+      ["store_id", "hour"],
+      hourly,
+    ))
+
+  @staticmethod
+  async def record_orders_placed(db: AsyncSession, order_ids: list[UUID]) -> None:
+    await RollupService._apply(db, order_ids, "", 1)
+
+  @staticmethod
+  async def record_status_changes(db: AsyncSession, transitions: Iterable[tuple[UUID, OrderStatus, OrderStatus]]) -> None:
+    """Move orders between the completed/cancelled buckets.
+
+    ``transitions`` holds ``(order_id, old_status, new_status)``; statuses
+    without a bucket (pending, in progress) are ignored.
+    """
+    deltas: dict[tuple[str, int], list[UUID]] = defaultdict(list)
+    for order_id, old_status, new_status in transitions:
+      if old_status == new_status:
+        continue
+      if old_status in STATUS_BUCKETS:
+        deltas[(STATUS_BUCKETS[old_status], -1)].append(order_id)
+      if new_status in STATUS_BUCKETS:
+        deltas[(STATUS_BUCKETS[new_status], 1)].append(order_id)
+
+    for (prefix, sign), order_ids in deltas.items():
+      await RollupService._apply(db, order_ids, prefix, sign)
+
+  @staticmethod
+  async def rebuild(db: AsyncSession, since: Optional[date] = None) -> None:
+    """Recompute the rollups from the order tables (all time or from ``since``)."""
+    daily_table = SalesDailyRollup.__table__
+    hourly_table = SalesHourlyRollup.__table__
+    order_filter = [Order.store_id.is_not(None)]
+    if since is not None:
+      order_filter.append(Order.created_at >= datetime.combine(since, time.min))
+      await db.execute(delete(daily_table).where(daily_table.c.day >= since))
+      await db.execute(delete(hourly_table).where(hourly_table.c.hour >= datetime.combine(since, time.min)))
+    else:
+      await db.execute(delete(daily_table))
+      await db.execute(delete(hourly_table))
+
+    def by_status(expression, status: OrderStatus):
+      return func.coalesce(func.sum(expression).filter(Order.status == status), 0)
+
+    line_revenue = OrderItem.price_per_item * OrderItem.quantity
+    day = cast(Order.created_at, Date)
+    daily = (
+      select(
+        Order.store_id, day, OrderItem.product_variant_id,
+        func.sum(OrderItem.quantity), func.sum(line_revenue), func.count(func.distinct(Order.id)),
+        by_status(OrderItem.quantity, OrderStatus.COMPLETED), by_status(line_revenue, OrderStatus.COMPLETED),
+        by_status(OrderItem.quantity, OrderStatus.CANCELLED), by_status(line_revenue, OrderStatus.CANCELLED),
+      )
+      .join(OrderItem, (OrderItem.order_id == Order.id) & (OrderItem.created_at == Order.created_at))
+      .where(*order_filter)
+      .group_by(Order.store_id, day, OrderItem.product_variant_id)
+    )
+    await db.execute(insert(daily_table).from_select([
+      "store_id", "day", "product_variant_id", "quantity", "revenue", "order_count",
+      "completed_quantity", "completed_revenue", "cancelled_quantity", "cancelled_revenue",
+    ], daily))
+
+    def count_status(status: OrderStatus):
+      return func.count(Order.id).filter(Order.status == status)
+
+    hour = func.date_trunc("hour", Order.created_at)
+    hourly = (
+      select(
+        Order.store_id, hour,
+        func.count(Order.id), func.sum(Order.total_price),
+        count_status(OrderStatus.COMPLETED), by_status(Order.total_price, OrderStatus.COMPLETED),
+        count_status(OrderStatus.CANCELLED), by_status(Order.total_price, OrderStatus.CANCELLED),
+      )
+      .where(*order_filter)
+      .group_by(Order.store_id, hour)
+    )
+    await db.execute(insert(hourly_table).from_select([
+      "store_id", "hour", "orders", "revenue",
+      "completed_orders", "completed_revenue", "cancelled_orders", "cancelled_revenue",
+    ], hourly))
@@ -0,0 +1,181 @@
+import time as clock
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import City, Store
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _minute(value: time) -> int:
+  return value.hour * 60 + value.minute
+
+
+@dataclass(frozen=True)
+class Window:
+  """A daily time range; ``start > end`` wraps past midnight, ``start == end`` means all day."""
+  start: time
+  end: time
+
+  @property
+  def all_day(self) -> bool:
+    return self.start == self.end
+
+  def segments(self) -> List[Tuple[int, int]]:
+    start, end = _minute(self.start), _minute(self.end)
+    if start == end:
+      return [(0, MINUTES_PER_DAY)]
+    if start < end:
+      return [(start, end)]
+    return [(start, MINUTES_PER_DAY), (0, end)]
+
+  def next_start(self, local: datetime) -> datetime:
+    candidate = local.replace(hour=self.start.hour, minute=self.start.minute, second=0, microsecond=0)
+    return candidate if candidate > local else candidate + timedelta(days=1)
+
+  def current_end(self, local: datetime) -> datetime:
+    """End of the range that contains ``local``."""
+    candidate = local.replace(hour=self.end.hour, minute=self.end.minute, second=0, microsecond=0)
+    return candidate if candidate > local else candidate + timedelta(days=1)
+
+
+class _MinuteIndex:
+  """Which stores are inside their window at each minute of the day.
+
+  The day is cut at every window boundary; each slice stores the frozen set
+  of open stores, so a lookup is one bisect.
+  """
+
+  def __init__(self, windows: Dict[UUID, Window]):
+    boundaries = {0, MINUTES_PER_DAY}
+    for window in windows.values():
+      for start, end in window.segments():
+        boundaries.update((start, end))
+    self.starts = sorted(boundaries - {MINUTES_PER_DAY})
+    self.slices: List[FrozenSet[UUID]] = []
+    for slice_start in self.starts:
+      self.slices.append(frozenset(
+        store_id for store_id, window in windows.items()
+        if any(start <= slice_start < end for start, end in window.segments())
+      ))
+
+  def at(self, minute: int) -> FrozenSet[UUID]:
+    return self.slices[bisect_right(self.starts, minute) - 1]
+
+
+class ScheduleIndex:
+  """Working and delivery hours of every store of one city, in the city's timezone."""
+
+  def __init__(self, city_id: UUID, timezone: ZoneInfo, stores: List[Store]):
+    self.city_id = city_id
+    self.timezone = timezone
+    self.working = {s.id: Window(s.start_working_hours, s.end_working_hours) for s in stores}
+    self.delivery = {s.id: Window(s.start_delivery_time, s.end_delivery_time) for s in stores}
+    self._working_index = _MinuteIndex(self.working)
+    self._delivery_index = _MinuteIndex(self.delivery)
+    self.built_at = clock.monotonic()
+
+  def localize(self, moment: Optional[datetime]) -> datetime:
+    # naive datetimes are read as city-local time
+    if moment is None:
+      return datetime.now(self.timezone)
+    if moment.tzinfo is None:
+      return moment.replace(tzinfo=self.timezone)
+    return moment.astimezone(self.timezone)
+
+  def open_at(self, moment: Optional[datetime] = None) -> FrozenSet[UUID]:
+    local = self.localize(moment)
+    return self._working_index.at(local.hour * 60 + local.minute)
+
+  def delivering_at(self, moment: Optional[datetime] = None) -> FrozenSet[UUID]:
+    local = self.localize(moment)
+    return self._delivery_index.at(local.hour * 60 + local.minute)
+
+  def snapshot(self, moment: Optional[datetime] = None) -> dict:
+    local = self.localize(moment)
+    minute = local.hour * 60 + local.minute
+    open_ids = self._working_index.at(minute)
+    delivering_ids = self._delivery_index.at(minute)
+
+    stores = []
+    for store_id, working in self.working.items():
+      delivery = self.delivery[store_id]
+      is_open = store_id in open_ids
+      is_delivering = store_id in delivering_ids
+      stores.append({
+        "store_id": store_id,
+        "is_open": is_open,
+        "is_delivering": is_delivering,
+        "closes_at": None if not is_open or working.all_day else working.current_end(local),
+        "next_opening": None if is_open else working.next_start(local),
+        "delivery_ends_at": None if not is_delivering or delivery.all_day else delivery.current_end(local),
+        "next_delivery_start": None if is_delivering else delivery.next_start(local),
+      })
+    return {
+      "city_id": self.city_id,
+      "timezone": self.timezone.key,
+      "at": local,
+      "open_store_ids": sorted(open_ids, key=str),
+      "delivering_store_ids": sorted(delivering_ids, key=str),
+      "stores": stores,
+    }
+
+
+class ScheduleService:
+  """Per-city schedule indexes kept in process memory.
+
+  Indexes are built on first use, dropped by ``invalidate`` when stores or
+  cities change and rebuilt after ``SCHEDULE_INDEX_TTL`` seconds so that
+  changes made through other workers are picked up.
+  """
+
+  _indexes: Dict[UUID, ScheduleIndex] = {}
+
+  @staticmethod
+  def timezone_for(name: Optional[str]) -> ZoneInfo:
+    try:
+      return ZoneInfo(name or settings.DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+      return ZoneInfo(settings.DEFAULT_TIMEZONE)
+
+  @staticmethod
+  def invalidate(city_id: Optional[UUID] = None) -> None:
+    if city_id is None:
+      ScheduleService._indexes.clear()
+    else:
+      ScheduleService._indexes.pop(city_id, None)
+
+  @staticmethod
+  async def prebuild(db: AsyncSession) -> int:
+    """Build the index of every city, e.g. before a worker starts serving."""
+    city_ids = (await db.execute(select(City.id))).scalars().all()
+    for city_id in city_ids:
+      ScheduleService.invalidate(city_id)
+      await ScheduleService.get_index(db, city_id)
+    return len(city_ids)
+
+  @staticmethod
+  async def get_index(db: AsyncSession, city_id: UUID) -> Optional[ScheduleIndex]:
+    index = ScheduleService._indexes.get(city_id)
+    if index is not None and clock.monotonic() - index.built_at < settings.SCHEDULE_INDEX_TTL:
+      return index
+
+    timezone_name = (await db.execute(select(City.timezone).where(City.id == city_id))).scalar_one_or_none()
+    if timezone_name is None:
+      return None
+    stores = (await db.execute(
+      select(Store.id, Store.start_working_hours, Store.end_working_hours,
+             Store.start_delivery_time, Store.end_delivery_time)
+      .where(Store.city_id == city_id)
+    )).all()
+    index = ScheduleIndex(city_id, ScheduleService.timezone_for(timezone_name), stores)
+    ScheduleService._indexes[city_id] = index
+    return index
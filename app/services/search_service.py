@@ -0,0 +1,178 @@
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import Float, case, select, func, literal, or_, distinct
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Product, Category, Ingredient, Store
+from app.db.models.products import PizzaIngredient
+from app.services.catalog_events import CatalogEvents
+from app.utils.cache import TTLCache
+
+autocomplete_cache = TTLCache(
+  max_size=settings.SEARCH_AUTOCOMPLETE_CACHE_SIZE,
+  ttl=settings.SEARCH_AUTOCOMPLETE_TTL,
+)
+CatalogEvents.subscribe(lambda change: autocomplete_cache.clear())
+
+
+def escape_like(value: str) -> str:
+  """``value`` with LIKE wildcards escaped, for building prefix patterns."""
+  return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SearchService:
+  """Typo-tolerant catalog search backed by pg_trgm GIN indexes.
+
+  Every product query is scoped to a store or to all stores of a city and
+  only returns available products of available categories.
+  """
+
+  @staticmethod
+  def _scope(stmt, store_id: Optional[UUID], city_id: Optional[UUID]):
+    if store_id is None and city_id is None:
+      raise ValueError("Нужно указать магазин или город")
+    stmt = stmt.join(Category, Category.id == Product.category_id).where(
+      Category.is_available.is_(True),
+      Product.is_available.is_(True),
+    )
+    if store_id is not None:
+      return stmt.where(Category.store_id == store_id)
+    return stmt.join(Store, Store.id == Category.store_id).where(Store.city_id == city_id)
+
+  @staticmethod
+  async def search(
+      db: AsyncSession,
+      query: str,
+      store_id: Optional[UUID] = None,
+      city_id: Optional[UUID] = None,
+      limit: int = 20,
+  ) -> dict:
+    query = query.strip()
+    if not query:
+      return {"products": [], "ingredients": []}
+
+    q = literal(query)
+    description = func.coalesce(Product.description, "")
+    name_score = func.greatest(func.similarity(Product.name, q), func.word_similarity(q, Product.name))
+    score = func.greatest(name_score, func.word_similarity(q, description) * 0.5).label("score")
+
+    product_stmt = SearchService._scope(
+      select(
+        Product.id, Product.name, Product.description, Product.type,
+        Product.category_id, Category.store_id, score,
+      ),
+      store_id, city_id,
+    ).where(
+      or_(
+        Product.name.op("%")(q),
+        q.op("<%")(Product.name),
+        # bare column so ix_products_description_trgm applies; NULL descriptions are simply no match
+        q.op("<%")(Product.description),
+        Product.name.ilike(escape_like(query) + "%"),
+      )
+    ).order_by(score.desc(), Product.name).limit(limit)
+    products = [dict(row) for row in (await db.execute(product_stmt)).mappings().all()]
+
+    ingredient_score = func.greatest(
+      func.similarity(Ingredient.name, q), func.word_similarity(q, Ingredient.name)
+    ).label("score")
+    ingredient_stmt = (
+      select(Ingredient.id, Ingredient.name, Ingredient.image, Ingredient.price, ingredient_score)
+      .where(or_(Ingredient.name.op("%")(q), q.op("<%")(Ingredient.name)))
+      .order_by(ingredient_score.desc(), Ingredient.name)
+      .limit(limit)
+    )
+    ingredients = [dict(row) for row in (await db.execute(ingredient_stmt)).mappings().all()]
+
+    if ingredients:
+      pizzas = await SearchService.pizzas_by_ingredients(
+        db, [ing["id"] for ing in ingredients], store_id, city_id, match_all=False, limit=limit,
+        ingredient_scores={ing["id"]: ing["score"] for ing in ingredients},
+      )
+      # one ranked list: a pizza found both ways keeps its better score
+      merged = {p["id"]: p for p in products}
+      for pizza in pizzas:
+        if pizza["id"] not in merged or pizza["score"] > merged[pizza["id"]]["score"]:
+          merged[pizza["id"]] = pizza
+      products = sorted(merged.values(), key=lambda p: (-p["score"], p["name"]))[:limit]
+
+    return {"products": products, "ingredients": ingredients}
+
+  @staticmethod
+  async def autocomplete(
+      db: AsyncSession,
+      prefix: str,
+      store_id: Optional[UUID] = None,
+      city_id: Optional[UUID] = None,
+      limit: int = 10,
+  ) -> List[dict]:
+    prefix = prefix.strip()
+    if not prefix:
+      return []
+
+    key = (prefix.lower(), store_id, city_id, limit)
+    cached = autocomplete_cache.get(key)
+    if cached is not None:
+      return cached
+
+    stmt = SearchService._scope(
+      select(Product.id, Product.name, Product.type, Category.store_id),
+      store_id, city_id,
+    ).where(
+      Product.name.ilike(escape_like(prefix) + "%")
+    ).order_by(func.length(Product.name), Product.name).limit(limit)
+    suggestions = [dict(row) for row in (await db.execute(stmt)).mappings().all()]
+    autocomplete_cache.set(key, suggestions)
+    return suggestions
+
+  @staticmethod
+  async def pizzas_by_ingredients(
+      db: AsyncSession,
+      ingredient_ids: List[UUID],
+      store_id: Optional[UUID] = None,
+      city_id: Optional[UUID] = None,
+      match_all: bool = True,
+      limit: int = 50,
+      ingredient_scores: Optional[Dict[UUID, float]] = None,
+  ) -> List[dict]:
+    """Pizzas that include the given ingredients in their default recipe.
+
+    With ``ingredient_scores`` each pizza also gets a ``score``: the best
+    score among the ingredients it matched, and results are ranked by it.
+    """
+    ingredient_ids = list(set(ingredient_ids))
+    if not ingredient_ids:
+      return []
+
+    matched = func.count(distinct(PizzaIngredient.ingredient_id)).label("matched_ingredients")
+    columns = [
+      Product.id, Product.name, Product.description, Product.type,
+      Product.category_id, Category.store_id, matched,
+    ]
+    order = [matched.desc(), Product.name]
+    if ingredient_scores:
+      score = func.max(case(
+        {ingredient_id: literal(value, Float) for ingredient_id, value in ingredient_scores.items()},
+        value=PizzaIngredient.ingredient_id,
+        else_=literal(0.0, Float),
+      )).label("score")
+      columns.append(score)
+      order = [score.desc(), *order]
+
+    stmt = SearchService._scope(
+      select(*columns)
+      .join(PizzaIngredient, PizzaIngredient.pizza_id == Product.id),
+      store_id, city_id,
+    ).where(
+      PizzaIngredient.ingredient_id.in_(ingredient_ids),
+      PizzaIngredient.is_deleted.is_(False),
+    ).group_by(
+      Product.id, Product.name, Product.description, Product.type,
+      Product.category_id, Category.store_id,
+    ).order_by(*order).limit(limit)
+    if match_all:
+      stmt = stmt.having(matched == len(ingredient_ids))
+
+    return [dict(row) for row in (await db.execute(stmt)).mappings().all()]
@@ -1,5 +1,4 @@
 import os
-import httpx
 import random
 from typing import Optional
 from datetime import datetime, timedelta
@@ -8,6 +7,7 @@ import logger
 from dotenv import load_dotenv, find_dotenv
 
 from app.services.cache_service import ConnectRedis
+from app.services.http_client import http_manager
 
 load_dotenv(find_dotenv())
 connect = ConnectRedis()
@@ -25,13 +25,19 @@ class SmsService:
   API_URL = os.getenv("SMS_API_URL")
   API_KEY = os.getenv("SMS_API_KEY")
 
-  def __init__(self):
-      self.client = httpx.AsyncClient(headers={"Authorization": f"Bearer {self.API_KEY}"})
+  @property
+  def client(self):
+    # shared client from the lifespan; the API key is sent per request
+    return http_manager.client
+
+  @property
+  def headers(self) -> dict:
+    return {"Authorization": f"Bearer {self.API_KEY}"}
 
   async def send_sms(self, phone_number: str) -> Optional[dict]:
     verification_code = self.generate_verification_code()
 
-    success = await connect.set_data_with_expiry(phone_number, verification_code, 5)
+    success = await connect.store_sms_code(phone_number, verification_code, 5)
     if not success:
         return {"dev_bypass": True}
 
@@ -44,7 +50,7 @@ class SmsService:
     #   "text": message
     # }
     # try:
-    #   response = await self.client.post(self.API_URL, json=payload)
+    #   response = await self.client.post(self.API_URL, json=payload, headers=self.headers)
     #   print(response)
     #   response.raise_for_status()
     #   return response.json()
@@ -1,22 +1,82 @@
 from datetime import datetime
 from uuid import UUID
-from typing import List, cast
-from shapely.geometry import Point, Polygon
-from geoalchemy2.shape import from_shape
+from typing import List, Optional
+from sqlalchemy import Float, func
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, array
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point, Polygon
+from shapely.wkb import dumps as to_wkb
+from shapely.wkb import loads as load_wkb
+
 from app.db.models.stores import Store
 from app.db.models.stores import Store as StoreModel
 from app.schemas.store import CreateStore, UpdateStore
-from shapely.wkb import loads as load_wkb
-from shapely.wkb import dumps as to_wkb
+from app.services.catalog_events import CatalogEvents
 from app.services.response_utils import ResponseUtils
+from app.services.schedule_service import ScheduleService
 
 
 class StoreService:
+  RESPONSE_FIELDS = (
+    "id", "address", "start_working_hours", "end_working_hours", "start_delivery_time", "end_delivery_time",
+    "phone_number", "min_order_price", "city_id", "created_at", "updated_at",
+  )
+
+  @staticmethod
+  def _response_query():
+    """Store rows shaped like ``StoreResponse`` with coordinates rendered by PostGIS.
+
+    ``area`` is the exterior ring as ``[[x, y], ...]`` (closing point
+    included) and ``point`` is ``[x, y]``, so no WKB is parsed in Python.
+    """
+    ring = (
+      func.ST_DumpPoints(func.ST_ExteriorRing(StoreModel.area))
+      .table_valued("path", "geom")
+      .alias("ring")
+    )
+    area = (
+      select(func.array_agg(
+        aggregate_order_by(array([func.ST_X(ring.c.geom), func.ST_Y(ring.c.geom)]), ring.c.path),
+        type_=ARRAY(Float, dimensions=2),
+      ))
+      .select_from(ring)
+      .scalar_subquery()
+    )
+    return select(
+      *(getattr(StoreModel, field) for field in StoreService.RESPONSE_FIELDS),
+      area.label("area"),
+      func.ST_X(StoreModel.point).label("x"),
+      func.ST_Y(StoreModel.point).label("y"),
+    )
+
+  @staticmethod
+  def _to_response(row) -> dict:
+    response = {field: getattr(row, field) for field in StoreService.RESPONSE_FIELDS}
+    response["area"] = row.area
+    response["point"] = None if row.x is None else [row.x, row.y]
+    return response
+
+  @staticmethod
+  async def list_store_responses(db: AsyncSession, city_id: Optional[UUID] = None) -> List[dict]:
+    stmt = StoreService._response_query()
+    if city_id is not None:
+      stmt = stmt.where(StoreModel.city_id == city_id)
+    result = await db.execute(stmt)
+    return [StoreService._to_response(row) for row in result.all()]
+
+  @staticmethod
+  async def get_store_response(db: AsyncSession, store_id: UUID) -> dict:
+    result = await db.execute(StoreService._response_query().where(StoreModel.id == store_id))
+    row = result.one_or_none()
+    if row is None:
+      raise NoResultFound(f"Store with ID {store_id} not found")
+    return StoreService._to_response(row)
+
   @staticmethod
   async def validate_geometry(db: AsyncSession, point_data: bytes, area_data: bytes, store_id: UUID = None):
     point_geom = load_wkb(point_data)
@@ -108,7 +168,8 @@ class StoreService:
 
     db.add(new_store)
     await db.commit()
-    await db.refresh(new_store)
+    ScheduleService.invalidate(new_store.city_id)
+    await CatalogEvents.purge("store_created", [new_store.id])
 
     return new_store
 
@@ -142,21 +203,15 @@ class StoreService:
       store.point = from_shape(point)
 
     await db.commit()
-    await db.refresh(store)
+    ScheduleService.invalidate(store.city_id)
+    await CatalogEvents.purge("store_updated", [store.id])
     return store
 
   @staticmethod
   async def delete_store(db: AsyncSession, store_id: UUID) -> None:
     store = await StoreService.get_store_by_id(db, store_id)
+    city_id = store.city_id
     await db.delete(store)
     await db.commit()
-
-  @staticmethod
-  async def convert_geometry(store_model):
-    if store_model.point:
-      point_geom = cast(Point, load_wkb(bytes(store_model.point.data)))
-      store_model.point = [point_geom.x, point_geom.y]
-    if store_model.area:
-      area_geom = cast(Polygon, load_wkb(bytes(store_model.area.data)))
-      store_model.area = [list(coord) for coord in area_geom.exterior.coords]
-    return store_model
\ No newline at end of file
+    ScheduleService.invalidate(city_id)
+    await CatalogEvents.purge("store_deleted", [store_id])
\ No newline at end of file
@@ -1,5 +1,6 @@
+import re
 import uuid
-from typing import Type, List, Union, Any, Dict
+from typing import Type, List, Union, Any, Dict, Optional
 
 from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
@@ -9,11 +10,14 @@ from datetime import datetime, timezone
 
 from app.core.security import SecurityMiddleware
 from app.db.models.users import User, Roles
-from app.routers.user import UserPayload
-from app.schemas.user import UpdateUserForm
+from app.db.returning import update_returning
+from app.schemas.user import UpdateUserForm, UserPayload
 from app.services.response_utils import ResponseUtils
+from app.services.search_service import escape_like
 
 class UserService:
+  DIRECTORY_FIELDS = ("id", "phone_number", "name", "email", "role", "scores", "created_at")
+
   @staticmethod
   async def get_user_by_id(user_id: UUID, db: AsyncSession) -> User or None:
     query = select(User).where(User.id == user_id)
@@ -37,7 +41,6 @@ class UserService:
 
     db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
 
     return new_user
 
@@ -54,7 +57,6 @@ class UserService:
 
     db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
 
     return new_user
 
@@ -72,22 +74,19 @@ class UserService:
       setattr(user, field, value)
 
     await db.commit()
-    await db.refresh(user)
     return user
 
   @staticmethod
   async def update_user_for_admin(db: AsyncSession, user_data: UserPayload) -> Union[User, Dict[str, Any]]:
-    user = await UserService.get_user_by_id(user_data.id, db)
+    user = await update_returning(
+      db, User, User.id == user_data.id,
+      name=user_data.name, role=user_data.role, phone_number=user_data.phone_number,
+    )
 
     if not user:
       return ResponseUtils.error("Пользователя не существует!")
 
-    user.name = user_data.name
-    user.role = user_data.role
-    user.phone_number = user_data.phone_number
-
     await db.commit()
-    await db.refresh(user)
 
     return user
 
@@ -113,9 +112,7 @@ class UserService:
 
   @staticmethod
   async def check_users(db: AsyncSession):
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    return len(users) > 0
+    return await db.scalar(select(select(User.id).exists()))
 
   @staticmethod
   async def get_all_users(db: AsyncSession) -> List[User]:
@@ -124,6 +121,41 @@ class UserService:
     users = list(result.scalars().all())
     return users
 
+  @staticmethod
+  async def directory(
+      db: AsyncSession,
+      limit: int,
+      after: Optional[str] = None,
+      role: Optional[Roles] = None,
+      phone: Optional[str] = None,
+      name: Optional[str] = None,
+  ) -> dict:
+    """One page of users ordered by phone number, for the admin UI.
+
+    Keyset pagination: ``after`` is the ``next_cursor`` of the previous page
+    (the last phone number on it), so every page is an index range scan no
+    matter how deep. ``phone`` and ``name`` are prefixes; phone prefixes use
+    the ``text_pattern_ops`` index, case-insensitive name prefixes the
+    trigram index, and a role filter the ``(role, phone_number)`` index.
+    """
+    stmt = select(*(getattr(User, field) for field in UserService.DIRECTORY_FIELDS))
+    if role is not None:
+      stmt = stmt.where(User.role == role)
+    if phone:
+      prefix = re.sub(r"[\s()\-]", "", phone)
+      stmt = stmt.where(User.phone_number.like(escape_like(prefix) + "%"))
+    if name:
+      stmt = stmt.where(User.name.ilike(escape_like(name.strip()) + "%"))
+    if after is not None:
+      stmt = stmt.where(User.phone_number > after)
+    # one extra row tells whether another page exists
+    rows = (await db.execute(stmt.order_by(User.phone_number).limit(limit + 1))).mappings().all()
+    users = [dict(row) for row in rows[:limit]]
+    return {
+      "users": users,
+      "next_cursor": users[-1]["phone_number"] if len(rows) > limit else None,
+    }
+
   @staticmethod
   async def get_user_by_phone(db: AsyncSession, phone: str):
     result = await db.execute(select(User).where(User.phone_number == phone))
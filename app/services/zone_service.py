@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import math
+from typing import Dict, List
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import Float, Integer, bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Store
+from app.services.cache_service import redis_manager
+from app.services.catalog_events import CatalogEvents
+
+logger = logging.getLogger(__name__)
+
+# one FeatureCollection per zoom level, built entirely in PostGIS
+ZONES_SQL = text("""
+  SELECT z.zoom, json_build_object(
+    'type', 'FeatureCollection',
+    'features', coalesce(json_agg(json_build_object(
+      'type', 'Feature',
+      'id', s.id,
+      'geometry', ST_AsGeoJSON(ST_SimplifyPreserveTopology(s.area, z.tolerance), z.decimals)::json,
+      'properties', json_build_object('store_id', s.id, 'address', s.address)
+    ) ORDER BY s.id) FILTER (WHERE s.id IS NOT NULL), '[]'::json)
+  )::text AS collection
+  FROM unnest(:zooms, :tolerances, :decimals) AS z(zoom, tolerance, decimals)
+  LEFT JOIN stores s ON s.city_id = :city_id AND s.area IS NOT NULL
+  GROUP BY z.zoom
+""").bindparams(
+  bindparam("zooms", type_=ARRAY(Integer)),
+  bindparam("tolerances", type_=ARRAY(Float)),
+  bindparam("decimals", type_=ARRAY(Integer)),
+  bindparam("city_id", type_=PG_UUID(as_uuid=True)),
+)
+
+
+class ZoneService:
+  """Delivery zones of a city as GeoJSON, simplified for map zoom levels.
+
+  Every level in ``ZONE_ZOOM_LEVELS`` is simplified to about one pixel at
+  that zoom, with coordinates trimmed to the matching number of decimals.
+  All levels of a city are built in one query and cached in Redis under a
+  key derived from the city's store versions, so any store write yields a
+  fresh key and stale entries just expire.
+  """
+
+  @staticmethod
+  def levels() -> List[int]:
+    return sorted(settings.ZONE_ZOOM_LEVELS)
+
+  @staticmethod
+  def snap(zoom: int) -> int:
+    """Closest precomputed level at or below ``zoom`` (the lowest one below the range)."""
+    levels = ZoneService.levels()
+    return max((level for level in levels if level <= zoom), default=levels[0])
+
+  @staticmethod
+  def tolerance(zoom: int) -> float:
+    # degrees covered by one pixel of a 256px tile at this zoom
+    return 360.0 / (256 * 2 ** zoom)
+
+  @staticmethod
+  def decimals(zoom: int) -> int:
+    return max(3, math.ceil(-math.log10(ZoneService.tolerance(zoom))))
+
+  @staticmethod
+  async def _cache_key(db: AsyncSession, city_id: UUID) -> str:
+    store_ids = (await db.execute(
+      select(Store.id).where(Store.city_id == city_id).order_by(Store.id)
+    )).scalars().all()
+    versions = []
+    if store_ids:
+      async with redis_manager.timed("zones_versions") as client:
+        versions = await client.mget([CatalogEvents.version_key(store_id) for store_id in store_ids])
+    digest = hashlib.sha1("|".join(
+      f"{store_id}:{version or 0}" for store_id, version in zip(store_ids, versions)
+    ).encode()).hexdigest()
+    return redis_manager.key("zones", city_id, digest)
+
+  @staticmethod
+  async def build(db: AsyncSession, city_id: UUID) -> Dict[int, str]:
+    levels = ZoneService.levels()
+    result = await db.execute(ZONES_SQL, {
+      "zooms": levels,
+      "tolerances": [ZoneService.tolerance(zoom) for zoom in levels],
+      "decimals": [ZoneService.decimals(zoom) for zoom in levels],
+      "city_id": city_id,
+    })
+    return {zoom: collection for zoom, collection in result.all()}
+
+  @staticmethod
+  async def city_zones(db: AsyncSession, city_id: UUID, zoom: int) -> str:
+    """GeoJSON FeatureCollection text of the city's delivery zones at ``zoom``."""
+    level = ZoneService.snap(zoom)
+    try:
+      key = await ZoneService._cache_key(db, city_id)
+      async with redis_manager.timed("zones_get") as client:
+        cached = await client.hget(key, str(level))
+      if cached is not None:
+        return cached
+    except RedisError as e:
+      logger.error(f"Zone cache unavailable: {e}")
+      return (await ZoneService.build(db, city_id))[level]
+
+    collections = await ZoneService.build(db, city_id)
+    try:
+      async with redis_manager.pipeline("zones_store") as pipe:
+        pipe.hset(key, mapping={str(z): collection for z, collection in collections.items()})
+        pipe.expire(key, settings.ZONE_CACHE_TTL)
+    except RedisError as e:
+      logger.error(f"Failed to cache delivery zones: {e}")
+    return collections[level]
@@ -0,0 +1,38 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+  """Small in-process LRU cache with a per-entry time to live.
+
+  Not shared between workers; use it only for data that may be briefly stale.
+  """
+
+  def __init__(self, max_size: int = 1024, ttl: float = 30.0):
+    self.max_size = max_size
+    self.ttl = ttl
+    self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    entry = self._data.get(key)
+    if entry is None:
+      return default
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+      del self._data[key]
+      return default
+    self._data.move_to_end(key)
+    return value
+
+  def set(self, key: Hashable, value: Any) -> None:
+    self._data[key] = (time.monotonic() + self.ttl, value)
+    self._data.move_to_end(key)
+    while len(self._data) > self.max_size:
+      self._data.popitem(last=False)
+
+  def clear(self) -> None:
+    self._data.clear()
+
+  def __len__(self) -> int:
+    return len(self._data)
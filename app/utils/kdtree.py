@@ -0,0 +1,85 @@
+"""A small static KD-tree for nearest-neighbour lookups on the globe.
+
+Longitude/latitude pairs are stored as 3D unit vectors, so the straight-line
+(chord) distance between two entries orders them exactly like the great
+circle distance, with no special cases at the poles or the antimeridian.
+"""
+import heapq
+import math
+from typing import Any, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+EARTH_RADIUS_M = 6371008.8
+
+T = TypeVar("T")
+
+Vector = Tuple[float, float, float]
+
+
+def to_unit(lon: float, lat: float) -> Vector:
+  lon, lat = math.radians(lon), math.radians(lat)
+  return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def chord_to_meters(chord: float) -> float:
+  return 2 * EARTH_RADIUS_M * math.asin(min(chord / 2, 1.0))
+
+
+class _Node:
+  __slots__ = ("vector", "item", "axis", "left", "right")
+
+  def __init__(self, vector: Vector, item: Any, axis: int, left: "Optional[_Node]", right: "Optional[_Node]"):
+    self.vector = vector
+    self.item = item
+    self.axis = axis
+    self.left = left
+    self.right = right
+
+
+class KDTree(Generic[T]):
+  """Immutable tree over ``(lon, lat, item)`` entries; rebuild it to change the set."""
+
+  def __init__(self, entries: Sequence[Tuple[float, float, T]]):
+    self.size = len(entries)
+    self._root = self._build([(to_unit(lon, lat), item) for lon, lat, item in entries], 0)
+
+  def _build(self, points: List[Tuple[Vector, T]], depth: int) -> Optional[_Node]:
+    if not points:
+      return None
+    axis = depth % 3
+    points.sort(key=lambda point: point[0][axis])
+    middle = len(points) // 2
+    vector, item = points[middle]
+    return _Node(
+      vector, item, axis,
+      self._build(points[:middle], depth + 1),
+      self._build(points[middle + 1:], depth + 1),
+    )
+
+  def nearest(self, lon: float, lat: float, k: int = 1) -> List[Tuple[float, T]]:
+    """Up to ``k`` ``(distance_m, item)`` pairs, closest first."""
+    if k <= 0 or self._root is None:
+      return []
+    target = to_unit(lon, lat)
+    # max-heap of the best k by squared chord length; the counter breaks ties
+    best: List[Tuple[float, int, T]] = []
+    # (node, squared distance to the splitting plane that separates it from the target)
+    stack: List[Tuple[Optional[_Node], float]] = [(self._root, 0.0)]
+    counter = 0
+    while stack:
+      node, plane = stack.pop()
+      if node is None or (len(best) == k and plane >= -best[0][0]):
+        continue
+      squared = sum((a - b) ** 2 for a, b in zip(node.vector, target))
+      if len(best) < k:
+        heapq.heappush(best, (-squared, counter, node.item))
+      elif squared < -best[0][0]:
+        heapq.heapreplace(best, (-squared, counter, node.item))
+      counter += 1
+
+      delta = target[node.axis] - node.vector[node.axis]
+      near, far = (node.left, node.right) if delta < 0 else (node.right, node.left)
+      # the far side can only hold a closer entry if the splitting plane is within reach
+      stack.append((far, delta * delta))
+      stack.append((near, plane))
+    ranked = sorted((-negative, order, item) for negative, order, item in best)
+    return [(chord_to_meters(math.sqrt(squared)), item) for squared, _, item in ranked]
@@ -1,24 +1,90 @@
+from app.core.startup import startup_report
+
 import logging
-import uvicorn
-from dotenv import load_dotenv, find_dotenv
-from fastapi import FastAPI
-from fastapi.responses import ORJSONResponse
-from starlette.middleware.cors import CORSMiddleware
-from starlette.staticfiles import StaticFiles
-
-from app.core.config import settings
-from app.db.session import SessionLocal
-from app.routers import main_router
-from app.utils import create_admin
-from app.webhook import router as webhook_router
+from contextlib import asynccontextmanager
+
+with startup_report.importing("framework"):
+    from dotenv import load_dotenv, find_dotenv
+    from fastapi import FastAPI
+    from fastapi.responses import ORJSONResponse
+    from starlette.middleware.cors import CORSMiddleware
+    from starlette.staticfiles import StaticFiles
+
+with startup_report.importing("core"):
+    from app.core.config import settings
+    from app.core.compression import CompressionMiddleware
+    from app.core.http_cache import HTTPCacheMiddleware
+    from app.core.warmup import warm_store_catalogs
+    from app.db import async_session, engine, replica_router, warm_up
+
+with startup_report.importing("routers"):
+    from app.routers import main_router
+    from app.webhook import router as webhook_router
+
+with startup_report.importing("services"):
+    from app.services.cache_service import redis_manager
+    from app.services.http_client import http_manager
+    from app.services.job_worker import job_worker
+    from app.services.order_archive_service import OrderArchiveService
+    from app.services.schedule_service import ScheduleService
+    from app.utils import create_admin
+
 load_dotenv(find_dotenv())
 logging.basicConfig(filename="logs/app.log", level=logging.INFO, format="%(asctime)s:%(levelname)s:%(message)s")
 logger = logging.getLogger(__name__)
 
-app = FastAPI(default_response_class=ORJSONResponse)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # runs before uvicorn starts accepting connections on this worker
+    with startup_report.phase("bootstrap"):
+        async with async_session() as session:
+            await create_admin(session)
+            try:
+                await OrderArchiveService.ensure_partitions(session)
+            except Exception as e:
+                logger.error(f"Failed to create order partitions: {e}")
+
+    with startup_report.phase("db_pool"):
+        try:
+            await warm_up(settings.DB_WARMUP_CONNECTIONS)
+        except Exception as e:
+            logger.error(f"Failed to warm up the database pool: {e}")
+
+    with startup_report.phase("redis"):
+        health = await redis_manager.health()
+        if not health["ok"]:
+            logger.warning("Redis is unavailable at startup")
+
+    if settings.STARTUP_PREBUILD_CACHES:
+        with startup_report.phase("caches"):
+            async with async_session() as session:
+                await ScheduleService.prebuild(session)
+            try:
+                await warm_store_catalogs(app)
+            except Exception as e:
+                logger.error(f"Failed to warm store catalogs: {e}")
+
+    if settings.JOB_WORKER_IN_PROCESS:
+        job_worker.start()
+
+    startup_report.mark_ready()
+    yield
+
+    await job_worker.stop()
+    await http_manager.close()
+    await redis_manager.close()
+    await replica_router.dispose()
+    await engine.dispose()
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 origins = ["http://localhost", "http://localhost:3000", "http://31.129.45.84:3000"]
 
+# innermost first: compression sees the catalog ETag, CORS wraps 304 responses too
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(HTTPCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -34,10 +100,6 @@ app.mount("/media", StaticFiles(directory="media"), name="media")
 def read_root():
     return {"message": "This is a backend service for Yummy Yummy!"}
 
-@app.on_event("startup")
-async def startup_event():
-    async with SessionLocal() as session:
-        await create_admin(session)
-
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="127.0.0.1", port=8000, log_level="info", reload=True)
\ No newline at end of file
+    from app.core.server import run
+    run()
@@ -0,0 +1,48 @@
+"""deferrable position constraints
+
+Revision ID: 3b1e7c9d2a40
+Revises: 8b84f7434341
+Create Date: 2026-10-19 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b1e7c9d2a40'
+down_revision: Union[str, None] = '8b84f7434341'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_constraint('uix_store_position', 'categories', type_='unique')
+    op.create_unique_constraint(
+        'uix_store_position', 'categories', ['store_id', 'position'],
+        deferrable=True, initially='IMMEDIATE',
+    )
+    # positions were allocated with max()+1 without locking, so duplicates may exist
+    op.execute("""
+        UPDATE products AS p
+        SET position = ranked.rn
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY category_id ORDER BY position, name, id) AS rn
+            FROM products
+        ) AS ranked
+        WHERE p.id = ranked.id AND p.position IS DISTINCT FROM ranked.rn
+    """)
+    op.create_unique_constraint(
+        'uix_category_position', 'products', ['category_id', 'position'],
+        deferrable=True, initially='IMMEDIATE',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uix_category_position', 'products', type_='unique')
+    op.drop_constraint('uix_store_position', 'categories', type_='unique')
+    op.create_unique_constraint('uix_store_position', 'categories', ['store_id', 'position'])
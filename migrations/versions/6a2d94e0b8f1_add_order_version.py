@@ -0,0 +1,28 @@
+"""add order version
+
+Revision ID: 6a2d94e0b8f1
+Revises: e41b7d2c9a05
+Create Date: 2026-10-19 13:41:20.562034
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a2d94e0b8f1'
+down_revision: Union[str, None] = 'e41b7d2c9a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('orders', 'version')
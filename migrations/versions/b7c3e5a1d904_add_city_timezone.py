@@ -0,0 +1,28 @@
+"""add city timezone
+
+Revision ID: b7c3e5a1d904
+Revises: 6a2d94e0b8f1
+Create Date: 2026-10-19 14:20:09.384716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c3e5a1d904'
+down_revision: Union[str, None] = '6a2d94e0b8f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cities', sa.Column('timezone', sa.String(length=64), nullable=False, server_default='Europe/Moscow'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('cities', 'timezone')
@@ -0,0 +1,31 @@
+"""add point geography indexes
+
+Revision ID: c4a8f2d6e913
+Revises: b7c3e5a1d904
+Create Date: 2026-10-19 16:42:27.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8f2d6e913'
+down_revision: Union[str, None] = 'b7c3e5a1d904'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # must match app.services.nearest_service.geography() for the planner to use them
+    op.execute("CREATE INDEX ix_cities_point_geography ON cities USING gist (geography(ST_SetSRID(point, 4326)))")
+    op.execute("CREATE INDEX ix_stores_point_geography ON stores USING gist (geography(ST_SetSRID(point, 4326)))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stores_point_geography', table_name='stores')
+    op.drop_index('ix_cities_point_geography', table_name='cities')
@@ -0,0 +1,78 @@
+"""add sales rollups
+
+Revision ID: c5a81e3f6d27
+Revises: 9d4f2b7e1c53
+Create Date: 2026-10-19 12:26:05.731904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a81e3f6d27'
+down_revision: Union[str, None] = '9d4f2b7e1c53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sales_daily_rollups',
+    sa.Column('store_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_variant_id', sa.UUID(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+    sa.Column('order_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('completed_quantity', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('completed_revenue', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+    sa.Column('cancelled_quantity', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('cancelled_revenue', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+    sa.PrimaryKeyConstraint('store_id', 'day', 'product_variant_id')
+    )
+    op.create_table('sales_hourly_rollups',
+    sa.Column('store_id', sa.UUID(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+    sa.Column('completed_orders', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('completed_revenue', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+    sa.Column('cancelled_orders', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('cancelled_revenue', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+    sa.PrimaryKeyConstraint('store_id', 'hour')
+    )
+    # populate from existing orders; later changes are applied incrementally
+    op.execute("""
+        INSERT INTO sales_daily_rollups (store_id, day, product_variant_id, quantity, revenue, order_count,
+                                         completed_quantity, completed_revenue, cancelled_quantity, cancelled_revenue)
+        SELECT o.store_id, o.created_at::date, oi.product_variant_id,
+               sum(oi.quantity), sum(oi.price_per_item * oi.quantity), count(DISTINCT o.id),
+               coalesce(sum(oi.quantity) FILTER (WHERE o.status = 'COMPLETED'), 0),
+               coalesce(sum(oi.price_per_item * oi.quantity) FILTER (WHERE o.status = 'COMPLETED'), 0),
+               coalesce(sum(oi.quantity) FILTER (WHERE o.status = 'CANCELLED'), 0),
+               coalesce(sum(oi.price_per_item * oi.quantity) FILTER (WHERE o.status = 'CANCELLED'), 0)
+        FROM orders o JOIN order_items oi ON oi.order_id = o.id
+        WHERE o.store_id IS NOT NULL
+        GROUP BY o.store_id, o.created_at::date, oi.product_variant_id
+    """)
+    op.execute("""
+        INSERT INTO sales_hourly_rollups (store_id, hour, orders, revenue, completed_orders, completed_revenue,
+                                          cancelled_orders, cancelled_revenue)
+        SELECT o.store_id, date_trunc('hour', o.created_at), count(o.id), sum(o.total_price),
+               count(o.id) FILTER (WHERE o.status = 'COMPLETED'),
+               coalesce(sum(o.total_price) FILTER (WHERE o.status = 'COMPLETED'), 0),
+               count(o.id) FILTER (WHERE o.status = 'CANCELLED'),
+               coalesce(sum(o.total_price) FILTER (WHERE o.status = 'CANCELLED'), 0)
+        FROM orders o
+        WHERE o.store_id IS NOT NULL
+        GROUP BY o.store_id, date_trunc('hour', o.created_at)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sales_hourly_rollups')
+    op.drop_table('sales_daily_rollups')
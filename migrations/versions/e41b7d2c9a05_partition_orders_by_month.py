@@ -0,0 +1,133 @@
+"""partition orders by month
+
+Revision ID: e41b7d2c9a05
+Revises: c5a81e3f6d27
+Create Date: 2026-10-19 13:02:47.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41b7d2c9a05'
+down_revision: Union[str, None] = 'c5a81e3f6d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONED_TABLES = ('orders', 'order_items', 'order_item_ingredients')
+
+CREATE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_order_partitions(period date) RETURNS void AS $$
+DECLARE
+    start_at timestamp := date_trunc('month', period);
+    end_at timestamp := date_trunc('month', period) + interval '1 month';
+    parent text;
+BEGIN
+    FOREACH parent IN ARRAY ARRAY['orders', 'order_items', 'order_item_ingredients'] LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            parent || to_char(start_at, '"_p"YYYY_MM'), parent, start_at, end_at
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # child rows carry the order's created_at so they share its monthly partition
+    op.execute("UPDATE orders SET created_at = now() WHERE created_at IS NULL")
+    for table in ('order_items', 'order_item_ingredients', 'order_addresses'):
+        op.add_column(table, sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE order_items i SET created_at = o.created_at FROM orders o WHERE o.id = i.order_id")
+    op.execute("UPDATE order_item_ingredients c SET created_at = i.created_at "
+               "FROM order_items i WHERE i.id = c.order_item_id")
+    op.execute("UPDATE order_addresses a SET created_at = o.created_at FROM orders o WHERE o.id = a.order_id")
+    op.execute("ALTER TABLE order_addresses DROP CONSTRAINT IF EXISTS order_addresses_order_id_fkey")
+
+    for table in PARTITIONED_TABLES:
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned")
+        op.execute(f"ALTER TABLE {table}_unpartitioned RENAME CONSTRAINT {table}_pkey TO {table}_unpartitioned_pkey")
+        op.execute(f"CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS) "
+                   f"PARTITION BY RANGE (created_at)")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL")
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)")
+
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+    op.execute("""
+        SELECT create_order_partitions(period::date)
+        FROM generate_series(
+            date_trunc('month', coalesce((SELECT min(created_at) FROM orders_unpartitioned), now())),
+            date_trunc('month', now()) + interval '3 months',
+            interval '1 month'
+        ) AS period
+    """)
+    # catches rows outside the prepared months instead of failing the insert
+    for table in PARTITIONED_TABLES:
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_unpartitioned")
+
+    op.create_foreign_key(None, 'orders', 'users', ['user_id'], ['id'])
+    op.create_foreign_key(None, 'orders', 'stores', ['store_id'], ['id'])
+    op.create_foreign_key(None, 'order_items', 'orders', ['order_id', 'created_at'], ['id', 'created_at'])
+    op.create_foreign_key(None, 'order_items', 'product_variants', ['product_variant_id'], ['id'])
+    op.create_foreign_key(None, 'order_item_ingredients', 'order_items',
+                          ['order_item_id', 'created_at'], ['id', 'created_at'], ondelete='CASCADE')
+    op.create_foreign_key(None, 'order_item_ingredients', 'ingredients', ['ingredient_id'], ['id'])
+    op.alter_column('order_addresses', 'created_at', nullable=False)
+    op.create_foreign_key(None, 'order_addresses', 'orders', ['order_id', 'created_at'], ['id', 'created_at'])
+
+    op.create_index('ix_orders_user_created', 'orders', ['user_id', 'created_at'])
+    op.create_index('ix_orders_store_created', 'orders', ['store_id', 'created_at'])
+    op.create_index('ix_order_items_order', 'order_items', ['order_id', 'created_at'])
+    op.create_index('ix_order_item_ingredients_item', 'order_item_ingredients', ['order_item_id', 'created_at'])
+    op.create_index(op.f('ix_order_addresses_order_id'), 'order_addresses', ['order_id'])
+
+    op.execute("DROP TABLE order_item_ingredients_unpartitioned, order_items_unpartitioned, orders_unpartitioned")
+
+    op.create_table('order_archives',
+    sa.Column('period', sa.Date(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('period')
+    )
+    op.create_table('order_archive_users',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('period', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['period'], ['order_archives.period'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'period')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # orders already moved to archive files are not restored
+    op.drop_table('order_archive_users')
+    op.drop_table('order_archives')
+    op.drop_index(op.f('ix_order_addresses_order_id'), table_name='order_addresses')
+    op.execute("ALTER TABLE order_addresses DROP CONSTRAINT IF EXISTS order_addresses_order_id_created_at_fkey")
+
+    for table in PARTITIONED_TABLES:
+        op.execute(f"CREATE TABLE {table}_unpartitioned (LIKE {table} INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {table}_unpartitioned SELECT * FROM {table}")
+    op.execute("DROP TABLE order_item_ingredients, order_items, orders")
+    op.execute("DROP FUNCTION create_order_partitions(date)")
+
+    for table in PARTITIONED_TABLES:
+        op.execute(f"ALTER TABLE {table}_unpartitioned RENAME TO {table}")
+        op.create_primary_key(f'{table}_pkey', table, ['id'])
+    op.alter_column('orders', 'created_at', nullable=True)
+    op.create_foreign_key(None, 'orders', 'users', ['user_id'], ['id'])
+    op.create_foreign_key(None, 'orders', 'stores', ['store_id'], ['id'])
+    op.create_foreign_key(None, 'order_items', 'orders', ['order_id'], ['id'])
+    op.create_foreign_key(None, 'order_items', 'product_variants', ['product_variant_id'], ['id'])
+    op.create_foreign_key(None, 'order_item_ingredients', 'order_items', ['order_item_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key(None, 'order_item_ingredients', 'ingredients', ['ingredient_id'], ['id'])
+    op.create_foreign_key(None, 'order_addresses', 'orders', ['order_id'], ['id'])
+    for table in ('order_addresses', 'order_item_ingredients', 'order_items'):
+        op.drop_column(table, 'created_at')
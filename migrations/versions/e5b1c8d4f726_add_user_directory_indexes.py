@@ -0,0 +1,39 @@
+"""add user directory indexes
+
+Revision ID: e5b1c8d4f726
+Revises: d2f7a9c3b158
+Create Date: 2026-10-19 18:21:06.743190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b1c8d4f726'
+down_revision: Union[str, None] = 'd2f7a9c3b158'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_users_phone_pattern', 'users', ['phone_number'],
+        postgresql_ops={'phone_number': 'text_pattern_ops'},
+    )
+    op.create_index('ix_users_role_phone', 'users', ['role', 'phone_number'])
+    op.create_index(
+        'ix_users_name_trgm', 'users', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_name_trgm', table_name='users')
+    op.drop_index('ix_users_role_phone', table_name='users')
+    op.drop_index('ix_users_phone_pattern', table_name='users')
@@ -0,0 +1,133 @@
+"""Create and update services must not read back the row they just wrote.
+
+Sessions keep written values (``expire_on_commit=False``), server defaults
+come back through ``RETURNING`` and updates go through
+``app.db.returning.update_returning``, so a SELECT on the written table
+after the write is a leftover ``refresh``.
+"""
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+
+from app.db.models import Ingredient, User
+from app.db.models.users import Roles
+from app.schemas.user import UserPayload, UserPayloadWithId
+from app.services.ingredient_service import IngredientService
+from app.services.response_utils import ResponseUtils
+from app.services.user_service import UserService
+
+USER_KEYS = {"id", "phone_number", "email", "name", "created_at", "date_of_birth", "role", "image_url", "scores"}
+INGREDIENT_KEYS = {"id", "name", "image", "overlay_image", "price"}
+
+
+def response_keys(**payload) -> set:
+  """Keys of the single object in a rendered ``ResponseUtils.success`` body."""
+  body = jsonable_encoder(ResponseUtils.success(**payload))
+  (value,) = (v for k, v in body.items() if k != "result")
+  return set(value)
+
+
+def assert_no_read_back(log, table: str) -> None:
+  assert log.writes_to(table), f"no write to {table} was sent"
+  last_write = max(i for i, sql in enumerate(log.statements) if sql in log.writes_to(table))
+  after = log.statements[last_write + 1:]
+  assert not [sql for sql in after if sql in log.selects_from(table)], f"{table} was read back after the write"
+
+
+def test_create_new_user(database, run):
+  sessions, log = database
+
+  async def scenario():
+    async with sessions() as db:
+      return await UserService.create_new_user(db, "79990000001")
+
+  user = run(scenario())
+  assert_no_read_back(log, "users")
+  assert response_keys(user=user) == USER_KEYS
+
+
+def test_create_user_for_admin(database, run):
+  sessions, log = database
+
+  async def scenario():
+    async with sessions() as db:
+      return await UserService.create_for_admin(db, UserPayload(phone_number="79990000002", name="Анна", role=Roles.MANAGER))
+
+  user = run(scenario())
+  assert_no_read_back(log, "users")
+  body = jsonable_encoder(ResponseUtils.success(user=user))["user"]
+  assert set(body) == USER_KEYS
+  assert body["email"] is None and body["date_of_birth"] is None and body["image_url"] is None
+
+
+def test_update_user_for_admin(database, run):
+  sessions, log = database
+
+  async def scenario():
+    async with sessions() as db:
+      created = await UserService.create_new_user(db, "79990000003")
+    log.clear()
+    async with sessions() as db:
+      return await UserService.update_user_for_admin(
+        db, UserPayloadWithId(id=created.id, phone_number="79990000004", name="Борис", role=Roles.COOK)
+      )
+
+  user = run(scenario())
+  assert_no_read_back(log, "users")
+  assert len(log.statements) == 1, "update_returning should be a single statement"
+  assert (user.phone_number, user.name, user.role) == ("79990000004", "Борис", Roles.COOK)
+  assert response_keys(user=user) == USER_KEYS
+
+
+def test_update_missing_user_for_admin(database, run):
+  sessions, log = database
+
+  async def scenario():
+    async with sessions() as db:
+      return await UserService.update_user_for_admin(
+        db, UserPayloadWithId(id=uuid.uuid4(), phone_number="79990000005", name="Вера", role=Roles.USER)
+      )
+
+  assert run(scenario()) == ResponseUtils.error("Пользователя не существует!")
+
+
+def test_create_ingredient(database, run):
+  sessions, log = database
+
+  async def scenario():
+    async with sessions() as db:
+      # no image uploaded: the nullable column is left out by the router
+      return await IngredientService.create({"name": "Сыр", "overlay_image": "/media/o.png", "price": 50}, db)
+
+  ingredient = run(scenario())
+  assert_no_read_back(log, "ingredients")
+  body = jsonable_encoder(ResponseUtils.success(ingredients=ingredient))["ingredients"]
+  assert set(body) == INGREDIENT_KEYS
+  assert body["image"] is None
+
+
+def test_update_ingredient(database, run):
+  sessions, log = database
+
+  async def scenario():
+    async with sessions() as db:
+      created = await IngredientService.create({"name": "Сыр", "overlay_image": "/media/o.png", "price": 50}, db)
+    log.clear()
+    async with sessions() as db:
+      return await IngredientService.update(created.id, {"price": 70}, db)
+
+  ingredient = run(scenario())
+  assert_no_read_back(log, "ingredients")
+  assert ingredient.price == 70
+  assert response_keys(ingredient=ingredient) == INGREDIENT_KEYS
+
+
+def test_unset_nullable_columns_start_as_none():
+  user = User(phone_number="79990000006")
+  assert {key: user.__dict__[key] for key in ("email", "name", "date_of_birth", "image_url")} == dict.fromkeys(
+    ("email", "name", "date_of_birth", "image_url")
+  )
+  # explicit values and columns with defaults are left alone
+  assert User(phone_number="79990000007", name="Галя").name == "Галя"
+  assert "scores" not in User(phone_number="79990000008").__dict__
+  assert "image" in Ingredient(name="Сыр").__dict__